@@ -6,26 +6,73 @@
 import random
 from typing import Dict, List
 
+from config.constants import AI_PLANNING_BUDGET_MS
+from ai.mcts import MCTSPlanner
+from ai.policy_table import default_policy
+from ai.scoring import DEFAULT_SCORER, state_bucket
+
+# Dificultades que planifican las etapas siguientes (necesitan el horizonte)
+PLANNING_DIFFICULTIES = ('maestro', 'experto')
+
 class AIPlayer:
     """IA mejorada que controla personajes no seleccionados"""
     
-    def __init__(self, character_type: str, difficulty: str):
+    def __init__(self, character_type: str, difficulty: str, rng=None,
+                 seat: str = None, name: str = None, kind: str = 'ai'):
         self.character_type = character_type
         self.difficulty = difficulty
+        # Identificador del asiento en la partida y nombre visible (opcional)
+        self.seat = seat or character_type
+        self.name = name
+        self.rng = rng or random
         self.progress = 0
         self.errors = 0
+        # Acciones resueltas (en tiempo real cada IA lleva su propia cuenta)
+        self.actions = 0
         self.completed = False
         self.conservative_turns = 0
+        # kind: perfil de reglas con que se resuelven sus acciones ('ai' o 'player')
+        # Política precompilada para su perfil de reglas (se carga una vez por
+        # proceso); mientras no esté compilada, experto planifica como maestro
+        self.policy = default_policy(kind) if difficulty == 'experto' else None
+        plans = difficulty == 'maestro' or (difficulty == 'experto' and self.policy is None)
+        self.planner = MCTSPlanner(budget_ms=AI_PLANNING_BUDGET_MS, kind=kind) if plans else None
+    
+    @property
+    def plans_ahead(self) -> bool:
+        return self.difficulty in PLANNING_DIFFICULTIES
+        
+    def make_decision(self, options: List[Dict], current_state: Dict = None,
+                      horizon: List[List[Dict]] = None, effect_modifier: int = 0,
+                      base_scores: List[float] = None, rng=None) -> Dict:
+        """La IA toma decisiones inteligentes según su personaje, dificultad y estado actual.
         
-    def make_decision(self, options: List[Dict], current_state: Dict = None) -> Dict:
-        """La IA toma decisiones inteligentes según su personaje, dificultad y estado actual"""
+        horizon son las opciones de las etapas siguientes; solo lo usan las
+        dificultades que planifican (maestro y experto). base_scores son las
+        puntuaciones ya calculadas en lote (OptionScorer.score_matrix). rng
+        reemplaza al generador de la IA solo para esta decisión.
+        """
+        rng = rng or self.rng
         
-        # Evaluar opciones con pesos estratégicos
-        scored_options = []
+        if self.policy is not None and current_state is not None:
+            choice = self.policy.choose(self.character_type, options, horizon or (),
+                                        self.progress, current_state, effect_modifier)
+            if choice is not None:
+                return choice
         
-        for option in options:
-            score = self._evaluate_option(option, current_state)
-            scored_options.append((option, score))
+        if self.planner is not None and current_state is not None:
+            # Semilla propia por decisión: el rng de la partida avanza igual
+            # sin importar cuántas simulaciones quepan en el presupuesto
+            planner_rng = random.Random(rng.getrandbits(32))
+            return self.planner.choose(options, horizon or [], self.progress,
+                                       current_state, effect_modifier, planner_rng)
+        
+        # Evaluar opciones con pesos estratégicos (base en caché + variación)
+        if base_scores is None:
+            base_scores = DEFAULT_SCORER.score_options(self.character_type, options, current_state)
+        uniform = rng.uniform
+        scored_options = [(option, score * uniform(0.95, 1.05))
+                          for option, score in zip(options, base_scores)]
         
         # Ordenar por mejor puntuación
         scored_options.sort(key=lambda x: x[1], reverse=True)
@@ -34,92 +81,45 @@ class AIPlayer:
         if self.difficulty == 'facil':
             # Siempre elige la opción más segura entre las top 3
             safe_options = [opt for opt, score in scored_options[:3] if opt['risk'] == 'bajo']
-            return random.choice(safe_options) if safe_options else scored_options[0][0]
+            return rng.choice(safe_options) if safe_options else scored_options[0][0]
             
         elif self.difficulty == 'medio':
             # Balance estratégico - prefiere opciones balanceadas
             if current_state and current_state['detection'] > 60:
                 # Si la detección es alta, ser más conservador
                 safe_options = [opt for opt, score in scored_options[:3] if opt['risk'] in ['bajo', 'medio']]
-                return random.choice(safe_options) if safe_options else scored_options[0][0]
+                return rng.choice(safe_options) if safe_options else scored_options[0][0]
             else:
                 # Tomar riesgos calculados
                 return scored_options[0][0]
                 
-        else:  # dificil
+        else:  # dificil (y maestro sin estado)
             # Estrategia agresiva pero inteligente
             if current_state and current_state['health'] < 40:
                 # Si la salud es baja, ser más conservador
                 safe_options = [opt for opt, score in scored_options[:2] if opt['risk'] != 'alto']
-                return random.choice(safe_options) if safe_options else scored_options[0][0]
+                return rng.choice(safe_options) if safe_options else scored_options[0][0]
             else:
                 # Buscar la opción con mejor relación riesgo/recompensa
                 high_risk_high_reward = [opt for opt, score in scored_options if opt['risk'] == 'alto' and opt['success'] >= 70]
-                if high_risk_high_reward and random.random() < 0.7:
-                    return random.choice(high_risk_high_reward)
+                if high_risk_high_reward and rng.random() < 0.7:
+                    return rng.choice(high_risk_high_reward)
                 return scored_options[0][0]
     
-    def _evaluate_option(self, option: Dict, current_state: Dict = None) -> float:
-        """Evalúa y puntúa una opción basándose en múltiples factores"""
-        base_score = option['success']
-        
-        # Modificadores basados en riesgo
-        risk_modifiers = {'bajo': 1.2, 'medio': 1.0, 'alto': 0.8}
-        base_score *= risk_modifiers.get(option['risk'], 1.0)
-        
-        # Modificadores basados en el personaje
-        char_modifiers = {
-            'usuario': {'bajo': 1.3, 'medio': 1.0, 'alto': 0.6},
-            'hacker': {'bajo': 1.0, 'medio': 1.2, 'alto': 1.0},
-            'cyberdelincuente': {'bajo': 0.8, 'medio': 1.0, 'alto': 1.3}
-        }
-        char_mod = char_modifiers.get(self.character_type, {}).get(option['risk'], 1.0)
-        base_score *= char_mod
-        
-        # Modificadores basados en estado actual (si está disponible)
-        if current_state:
-            # Si la detección es alta, evitar riesgos
-            if current_state['detection'] > 70 and option['risk'] == 'alto':
-                base_score *= 0.5
-            elif current_state['detection'] > 70 and option['risk'] == 'bajo':
-                base_score *= 1.3
-            
-            # Si los recursos son bajos, evitar opciones que consuman mucho tiempo
-            if current_state['resources'] < 30 and option['time'] > 2:
-                base_score *= 0.8
-            
-            # Si la salud es baja, ser conservador
-            if current_state['health'] < 40 and option['risk'] == 'alto':
-                base_score *= 0.6
-        
-        # Pequeña variación aleatoria para evitar patrones predecibles
-        variation = random.uniform(0.95, 1.05)
-        base_score *= variation
-        
-        return base_score
-    
-    def update_progress(self, success: bool, time_taken: int):
-        """Actualiza el progreso de la IA - MEJORADO"""
-        if success:
-            progress_gain = random.randint(15, 25)
-            # Bonus por dificultad
-            if self.difficulty == 'dificil':
-                progress_gain += random.randint(5, 10)
-            self.progress += progress_gain
-        else:
-            self.errors += 1
-            self.progress += random.randint(5, 10)
-        
-        self.progress = min(100, self.progress)
-        
-        if self.progress >= 100:
-            self.completed = True
+    def decision_key(self, state: Dict, effect_modifier: int = 0):
+        """Resumen del estado del que depende la decisión: si no cambia, una
+        decisión ya calculada sigue siendo válida"""
+        if self.plans_ahead:
+            return (self.progress, state['health'], state['detection'], state['resources'], effect_modifier)
+        return (state_bucket(state), state['detection'] > 60)
     
     def get_decision_info(self) -> str:
         """Retorna información sobre la estrategia de la IA"""
         strategies = {
             'facil': "Estrategia conservadora - Minimizar riesgos",
             'medio': "Estrategia balanceada - Riesgos calculados", 
-            'dificil': "Estrategia agresiva - Maximizar eficiencia"
+            'dificil': "Estrategia agresiva - Maximizar eficiencia",
+            'maestro': "Estrategia planificada - Simula las etapas restantes",
+            'experto': "Estrategia óptima - Política precalculada por estado"
         }
         return f"IA {self.character_type} ({self.difficulty}): {strategies[self.difficulty]}"
\ No newline at end of file
@@ -0,0 +1,183 @@
+# ============================================================================
+# ARCHIVO: ai/mcts.py
+# DESCRIPCIÓN: Planificador Monte Carlo Tree Search para la IA. Simula las
+#              etapas que quedan con las reglas de turno compiladas sobre
+#              copias del estado (tuplas inmutables) y respeta un presupuesto
+#              de tiempo estricto por decisión.
+# ============================================================================
+
+import math
+import random
+import time
+from typing import Dict, List, Sequence
+
+from game.rules import RULES, RISK_INDEX, STAT_FIELDS, STAT_MIN, STAT_MAX, SUCCESS_BOUNDS, CompiledRules
+
+# Presupuesto por decisión y tope de iteraciones (lo que se alcance primero)
+DEFAULT_BUDGET_MS = 5.0
+DEFAULT_MAX_ITERATIONS = 2000
+# Margen: no empezar una iteración si faltan menos de tantas duraciones medias
+HEADROOM_ITERATIONS = 2
+EXPLORATION = 0.5
+
+# Recompensa: terminar siempre vale más que no terminar, y antes vale más
+FINISH_REWARD = 0.6
+SPEED_REWARD = 0.4
+PROGRESS_REWARD = 0.5
+
+# Posición de cada estadística en la instantánea (progreso, salud, detección, recursos)
+_FIELD_SLOT = {field: i + 1 for i, field in enumerate(STAT_FIELDS)}
+
+
+class _Node:
+    """Nodo de bucle abierto: estadísticas por opción en una profundidad dada"""
+
+    __slots__ = ('visits', 'counts', 'totals', 'children')
+
+    def __init__(self, n_options: int):
+        self.visits = 0
+        self.counts = [0] * n_options
+        self.totals = [0.0] * n_options
+        self.children = [None] * n_options
+
+
+class MCTSPlanner:
+    """Elige la opción de la etapa actual con UCT sobre las etapas restantes.
+
+    El árbol es de bucle abierto (los nodos son secuencias de opciones) porque
+    cada turno es aleatorio: en cada iteración se vuelve a tirar el resultado
+    desde la instantánea inicial. El estado nunca se modifica en el sitio;
+    cada paso crea una tupla nueva, así que todas las ramas comparten la
+    instantánea de partida sin copiarla.
+    """
+
+    def __init__(self, rules: CompiledRules = RULES, budget_ms: float = DEFAULT_BUDGET_MS,
+                 max_iterations: int = DEFAULT_MAX_ITERATIONS, kind: str = 'ai'):
+        self.rules = rules
+        self.budget = budget_ms / 1000.0
+        self.max_iterations = max_iterations
+        self.kind = kind
+        self.last_iterations = 0
+        # El jugador pierde con salud a 0 o detección a 100; las IAs no
+        self._mortal = kind == 'player'
+
+        self._tables = rules.state_tables[kind]
+        self._progress = rules.progress[kind]
+        # deltas[riesgo][éxito] con la posición de la estadística ya resuelta
+        self._deltas = tuple(
+            tuple(tuple((_FIELD_SLOT[field], low, high) for field, low, high in by_outcome)
+                  for by_outcome in by_risk)
+            for by_risk in rules.deltas
+        )
+
+    def choose(self, options: List[Dict], horizon: Sequence[List[Dict]], progress: int,
+               state: Dict, effect_modifier: int = 0, rng=None) -> Dict:
+        """Mejor opción de options; horizon son las opciones de las etapas siguientes"""
+        start = time.perf_counter()
+        deadline = start + self.budget
+        rng = rng or random
+        turns = [options] + list(horizon)
+        snapshot = (progress, state['health'], state['detection'], state['resources'])
+        root = _Node(len(options))
+        # Política por defecto de las simulaciones: la opción más segura de cada etapa
+        rollout = [max(turn, key=lambda option: option['success']) for turn in turns]
+
+        iterations = 0
+        loop_start = time.perf_counter()
+        while iterations < self.max_iterations:
+            # No empezar una iteración que, con margen, terminaría fuera del presupuesto
+            now = time.perf_counter()
+            if now >= deadline or (iterations and now + HEADROOM_ITERATIONS * (now - loop_start) / iterations > deadline):
+                break
+            if not self._iterate(root, turns, rollout, snapshot, effect_modifier, rng, deadline):
+                break
+            iterations += 1
+        self.last_iterations = iterations
+
+        if iterations == 0:
+            return max(options, key=lambda option: option['success'])
+        best = max(range(len(options)), key=lambda a: (root.counts[a], root.totals[a]))
+        return options[best]
+
+    # ------------------------------------------------------------------------
+    # Búsqueda
+    # ------------------------------------------------------------------------
+
+    def _iterate(self, root: _Node, turns: List[List[Dict]], rollout: List[Dict],
+                 snapshot: tuple, modifier: int, rng, deadline: float) -> bool:
+        """Una iteración completa; False (sin actualizar el árbol) si se agota el tiempo"""
+        node, depth, path = root, 0, []
+        clock = time.perf_counter
+        total = len(turns)
+        expanded = False
+
+        # Selección y expansión
+        while True:
+            action = self._select(node)
+            path.append((node, action))
+            snapshot = self._step(snapshot, turns[depth][action], modifier, rng)
+            depth += 1
+            if snapshot[0] >= 100 or depth == total or expanded or self._lost(snapshot):
+                break
+            child = node.children[action]
+            if child is None:
+                child = node.children[action] = _Node(len(turns[depth]))
+                expanded = True
+            node = child
+            if clock() >= deadline:
+                return False
+
+        # Simulación hasta el final del horizonte con la política por defecto
+        while snapshot[0] < 100 and depth < total and not self._lost(snapshot):
+            if clock() >= deadline:
+                return False
+            snapshot = self._step(snapshot, rollout[depth], modifier, rng)
+            depth += 1
+
+        reward = 0.0 if self._lost(snapshot) else self._reward(snapshot[0], depth, total)
+        for node, action in path:
+            node.visits += 1
+            node.counts[action] += 1
+            node.totals[action] += reward
+        return True
+
+    @staticmethod
+    def _select(node: _Node) -> int:
+        counts = node.counts
+        for action, count in enumerate(counts):
+            if count == 0:
+                return action
+        log_visits = math.log(node.visits)
+        totals = node.totals
+        best, best_score = 0, -1.0
+        for action, count in enumerate(counts):
+            score = totals[action] / count + EXPLORATION * math.sqrt(log_visits / count)
+            if score > best_score:
+                best, best_score = action, score
+        return best
+
+    def _lost(self, snapshot: tuple) -> bool:
+        return self._mortal and snapshot[0] < 100 and (snapshot[1] <= STAT_MIN or snapshot[2] >= STAT_MAX)
+
+    @staticmethod
+    def _reward(progress: int, turns_used: int, total: int) -> float:
+        if progress >= 100:
+            return FINISH_REWARD + SPEED_REWARD * (total - turns_used) / total
+        return PROGRESS_REWARD * progress / 100
+
+    def _step(self, snapshot: tuple, option: Dict, modifier: int, rng) -> tuple:
+        """Un turno con las reglas compiladas; retorna una instantánea nueva"""
+        progress, health, detection, resources = snapshot
+        health_table, detection_table, resources_table = self._tables
+        chance = (option['success'] + modifier + health_table[health]
+                  + detection_table[detection] + resources_table[resources])
+        low, high = SUCCESS_BOUNDS
+        chance = low if chance < low else high if chance > high else chance
+        success = int(rng.random() * 100) < chance
+
+        low, high = self._progress[success]
+        values = [progress + low + int(rng.random() * (high - low + 1)), health, detection, resources]
+        for slot, low, high in self._deltas[RISK_INDEX[option['risk']]][success]:
+            value = values[slot] + low + int(rng.random() * (high - low + 1))
+            values[slot] = STAT_MIN if value < STAT_MIN else STAT_MAX if value > STAT_MAX else value
+        return tuple(values)
@@ -0,0 +1,307 @@
+# ============================================================================
+# ARCHIVO: ai/policy_table.py
+# DESCRIPCIÓN: Tablas de política de la IA resueltas fuera de partida. Un paso
+#              de compilación discretiza (etapa, progreso, salud, detección,
+#              recursos, modificador de éxito) y resuelve la mejor opción de
+#              cada estado con iteración de valores sobre las reglas de turno.
+#              El resultado es un arreglo de bytes: decidir en partida es un
+#              único acceso por índice.
+#              Compilar requiere numpy (opcional): pip install numpy
+# ============================================================================
+
+import hashlib
+import json
+import os
+import struct
+import zlib
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from config.constants import MIN_STAGES, MAX_STAGES, MAX_PROGRESS, CONTENT_CACHE_DIR
+from game.rules import RULES, RISK_LEVELS, STAT_FIELDS, STAT_MAX, SUCCESS_BOUNDS, CompiledRules
+from models.character import CHARACTERS_BY_TYPE
+from models.story import stage_phases, default_option_catalog
+from utils.content_pack import ROOT_DIR, default_pack
+
+try:
+    import numpy as np
+except ImportError:  # numpy solo es necesario para compilar las tablas
+    np = None
+
+# Discretización del estado
+PROGRESS_BUCKET = 5
+STAT_BUCKET = 10
+# Modificadores de éxito (efectos, accesorios) representados en la tabla; en
+# partida se usa el nivel más cercano
+MODIFIER_LEVELS = (-20, -10, -5, 0, 10, 20)
+
+# Formato del archivo: MAGIC, versión (u16), largo de la cabecera JSON (u32),
+# cabecera JSON (dimensiones y ranuras) y la política comprimida con zlib
+MAGIC = b'CQPT'
+FORMAT_VERSION = 1
+_HEADER = struct.Struct('<4sHI')
+
+
+def _bucket_deltas(dist: Dict[int, float], size: int) -> Dict[int, float]:
+    """Deltas en unidades de cubo con redondeo estocástico (conserva la media)"""
+    out = {}
+    for delta, p in dist.items():
+        q, r = divmod(delta, size)
+        out[q] = out.get(q, 0.0) + p * (1 - r / size)
+        if r:
+            out[q + 1] = out.get(q + 1, 0.0) + p * r / size
+    return out
+
+
+def _uniform_sum(ranges: Sequence[Tuple[int, int]]) -> Dict[int, float]:
+    """Distribución de la suma de enteros uniformes independientes"""
+    dist = {0: 1.0}
+    for low, high in ranges:
+        p = 1.0 / (high - low + 1)
+        step = {}
+        for x, px in dist.items():
+            for y in range(low, high + 1):
+                step[x + y] = step.get(x + y, 0.0) + px * p
+        dist = step
+    return dist
+
+
+class _ValueGrid:
+    """Operadores de transición sobre el arreglo de valores (M, P, H, D, R)"""
+
+    def __init__(self, rules: CompiledRules, kind: str):
+        self.levels = np.array(MODIFIER_LEVELS, dtype=float)
+        self.n_progress = MAX_PROGRESS // PROGRESS_BUCKET
+        self.n_stat = STAT_MAX // STAT_BUCKET + 1
+        self.shape = (len(MODIFIER_LEVELS), self.n_progress, self.n_stat, self.n_stat, self.n_stat)
+
+        # Probabilidad base por estado: nivel de modificador + modificadores por estadística
+        values = np.arange(self.n_stat) * STAT_BUCKET
+        health, detection, resources = (np.array(table)[values] for table in rules.state_tables[kind])
+        self.base = (self.levels[:, None, None, None, None] + health[None, None, :, None, None]
+                     + detection[None, None, None, :, None] + resources[None, None, None, None, :])
+
+        # Progreso: matriz de transición sin llegar a la meta y probabilidad de llegar
+        self.progress = {}
+        for success in (False, True):
+            low, high = rules.progress[kind][success]
+            matrix = np.zeros((self.n_progress, self.n_progress))
+            win = np.zeros(self.n_progress)
+            for gain, p in _bucket_deltas(_uniform_sum([(low, high)]), PROGRESS_BUCKET).items():
+                for b in range(self.n_progress):
+                    if b + gain >= self.n_progress:
+                        win[b] += p
+                    else:
+                        matrix[b, b + gain] += p
+            self.progress[success] = (matrix, win[None, :, None, None, None])
+
+        # Estadísticas: una matriz por (riesgo, resultado, campo)
+        self.stats = {}
+        for risk in range(len(RISK_LEVELS)):
+            for success in (False, True):
+                ranges = {field: [] for field in STAT_FIELDS}
+                for field, low, high in rules.deltas[risk][success]:
+                    ranges[field].append((low, high))
+                self.stats[risk, success] = [self._shift_matrix(_uniform_sum(ranges[field]))
+                                             for field in STAT_FIELDS]
+
+        # Evento global antes de la siguiente decisión (resultado del jugador desconocido)
+        chance = sum(rules.global_event_chance) / 2
+        total_weight = sum(weight for _, weight, _, _ in rules.global_events)
+        self.events = [(chance * weight / total_weight, delta and (STAT_FIELDS.index(delta[0]) + 2,
+                                                                   self._shift_matrix({delta[1]: 1.0})))
+                       for _, weight, _, delta in rules.global_events]
+        self.no_event = 1.0 - chance
+
+    def _shift_matrix(self, dist: Dict[int, float]):
+        matrix = np.zeros((self.n_stat, self.n_stat))
+        top = self.n_stat - 1
+        for delta, p in _bucket_deltas(dist, STAT_BUCKET).items():
+            for b in range(self.n_stat):
+                matrix[b, min(top, max(0, b + delta))] += p
+        return matrix
+
+    @staticmethod
+    def _along(matrix, values, axis: int):
+        return np.moveaxis(np.tensordot(matrix, values, axes=([1], [axis])), 0, axis)
+
+    def _after_event(self, values):
+        out = self.no_event * values
+        for p, delta in self.events:
+            out = out + p * (self._along(delta[1], values, delta[0]) if delta else values)
+        return out
+
+    def solve_stage(self, options: Sequence[Dict], tail):
+        """Valor y política de una etapa dadas las opciones y el valor de las siguientes"""
+        following = self._after_event(tail)
+        low, high = SUCCESS_BOUNDS
+        q_values = []
+        for option in options:
+            risk = RISK_LEVELS.index(option['risk'])
+            p_success = np.clip(option['success'] + self.base, low, high) / 100.0
+            q = 0.0
+            for success, p_outcome in ((True, p_success), (False, 1.0 - p_success)):
+                matrix, win = self.progress[success]
+                cont = self._along(matrix, following, 1)
+                for axis, stat_matrix in enumerate(self.stats[risk, success], start=2):
+                    cont = self._along(stat_matrix, cont, axis)
+                q = q + p_outcome * (win + cont)
+            q_values.append(np.broadcast_to(q, self.shape))
+        q_values = np.stack(q_values)
+        return q_values.max(axis=0), q_values.argmax(axis=0).astype(np.uint8)
+
+
+def build_policy(rules: CompiledRules = RULES, catalog=None, kind: str = 'ai') -> Tuple[Dict, bytes]:
+    """Resuelve la política de todos los personajes y longitudes de historia.
+
+    Se recorre cada historia desde la última etapa hacia la primera (iteración
+    de valores con horizonte finito): el valor de una etapa es la probabilidad
+    de llegar a la meta antes de que se acaben las etapas. Las secuencias de
+    fases que se repiten entre longitudes comparten ranura.
+    """
+    if np is None:
+        raise ImportError("numpy no instalado - Instalar con: pip install numpy")
+    catalog = catalog or default_option_catalog()
+    grid = _ValueGrid(rules, kind)
+
+    slots, blocks = [], []
+    for character in CHARACTERS_BY_TYPE:
+        values = {(): np.zeros(grid.shape)}
+        for total in range(MIN_STAGES, MAX_STAGES + 1):
+            phases = stage_phases(total)
+            for layer in range(total - 1, -1, -1):
+                key = phases[layer:]
+                if key in values:
+                    continue
+                values[key], policy = grid.solve_stage(catalog.for_phase(character, key[0]), values[key[1:]])
+                slots.append([character, list(key)])
+                blocks.append(policy.tobytes())
+
+    header = {'kind': kind, 'levels': list(MODIFIER_LEVELS), 'shape': list(grid.shape),
+              'progress_bucket': PROGRESS_BUCKET, 'stat_bucket': STAT_BUCKET, 'slots': slots}
+    return header, b''.join(blocks)
+
+
+def write_policy(path: str, header: Dict, data: bytes):
+    encoded = json.dumps(header, separators=(',', ':')).encode('utf-8')
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, len(encoded)))
+        f.write(encoded)
+        f.write(zlib.compress(data, 9))
+    os.replace(tmp_path, path)
+
+
+def read_policy(path: str) -> 'PolicyTable':
+    with open(path, 'rb') as f:
+        magic, version, header_len = _HEADER.unpack(f.read(_HEADER.size))
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"Tabla de política inválida: {path}")
+        header = json.loads(f.read(header_len).decode('utf-8'))
+        data = zlib.decompress(f.read())
+    return PolicyTable(header, data)
+
+
+class PolicyTable:
+    """Política compilada: opción por estado discretizado, un byte por estado"""
+
+    def __init__(self, header: Dict, data: bytes):
+        self.kind = header['kind']
+        self.levels = tuple(header['levels'])
+        n_levels, self.n_progress, self.n_stat, _, _ = header['shape']
+        self.progress_bucket = header['progress_bucket']
+        self.stat_bucket = header['stat_bucket']
+        self._data = data
+        self._slot_size = n_levels * self.n_progress * self.n_stat ** 3
+        self._slots = {(character, tuple(phases)): i for i, (character, phases) in enumerate(header['slots'])}
+
+        # Nivel más cercano para cada modificador entero del rango cubierto
+        self._level_offset = min(self.levels) - 10
+        self._level_index = [min(range(n_levels), key=lambda i: abs(self.levels[i] - m))
+                             for m in range(self._level_offset, max(self.levels) + 11)]
+
+    def slot(self, character: str, options: Sequence[Dict], horizon: Sequence[Sequence[Dict]]) -> Optional[int]:
+        """Ranura de la etapa según las fases que quedan (tomadas de los ids de opción)"""
+        try:
+            phases = (options[0]['id'].split('.')[1],) + tuple(o[0]['id'].split('.')[1] for o in horizon)
+        except (KeyError, IndexError):
+            return None
+        return self._slots.get((character, phases))
+
+    def choose(self, character: str, options: Sequence[Dict], horizon: Sequence[Sequence[Dict]],
+               progress: int, state: Dict, modifier: int = 0) -> Optional[Dict]:
+        """Opción de la política para el estado, o None si la etapa no está en la tabla"""
+        slot = self.slot(character, options, horizon)
+        if slot is None:
+            return None
+        n_stat = self.n_stat
+        level = self._level_index[min(len(self._level_index) - 1, max(0, modifier - self._level_offset))]
+        index = (slot * self._slot_size
+                 + (((level * self.n_progress + min(self.n_progress - 1, round(progress / self.progress_bucket)))
+                     * n_stat + round(state['health'] / self.stat_bucket))
+                    * n_stat + round(state['detection'] / self.stat_bucket))
+                 * n_stat + round(state['resources'] / self.stat_bucket))
+        choice = self._data[index]
+        return options[choice] if choice < len(options) else None
+
+
+def policy_fingerprint(rules: CompiledRules = RULES, kind: str = 'ai') -> str:
+    """Hash de todo lo que determina la política (reglas, contenido y discretización)"""
+    parts = (kind, rules.progress, rules.state_tables[kind], rules.deltas, rules.global_event_chance,
+             [(weight, delta) for _, weight, _, delta in rules.global_events], SUCCESS_BOUNDS,
+             MODIFIER_LEVELS, PROGRESS_BUCKET, STAT_BUCKET, MIN_STAGES, MAX_STAGES, FORMAT_VERSION,
+             default_pack().content_hash)
+    return hashlib.sha256(repr(parts).encode('utf-8')).hexdigest()
+
+
+def policy_path(kind: str = 'ai') -> str:
+    """Ruta en el caché de la tabla del perfil de reglas kind"""
+    return os.path.join(ROOT_DIR, CONTENT_CACHE_DIR, f"ai_policy-{policy_fingerprint(kind=kind)[:16]}.cqpt")
+
+
+# Tablas ya leídas del caché por perfil de reglas (una vez por proceso)
+_LOADED = {}
+
+
+def ensure_policy(kind: str = 'ai') -> Optional[str]:
+    """Compila la tabla del perfil kind si falta en el caché; retorna su ruta.
+
+    Es un paso explícito (juego al arrancar, en segundo plano; torneo antes
+    de crear los procesos): crear una IA nunca compila. Sin numpy retorna
+    None. La escritura es atómica, así que lectores concurrentes solo ven
+    el archivo completo.
+    """
+    path = policy_path(kind)
+    if not os.path.exists(path):
+        if np is None:
+            return None
+        write_policy(path, *build_policy(kind=kind))
+        print(f"🧠 Tabla de política compilada: {path}")
+    return path
+
+
+def default_policy(kind: str = 'ai') -> Optional[PolicyTable]:
+    """Política de la dificultad experto para el perfil de reglas kind ('ai' o
+    'player'); None si todavía no está compilada (ver ensure_policy)"""
+    table = _LOADED.get(kind)
+    if table is None:
+        path = policy_path(kind)
+        if not os.path.exists(path):
+            return None
+        table = _LOADED[kind] = read_policy(path)
+    return table
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compila la tabla de política de la IA experto")
+    parser.add_argument('--output', default=None, help="Ruta del archivo (por defecto, el caché)")
+    parser.add_argument('--kind', default='ai', choices=['ai', 'player'],
+                        help="Perfil de reglas: IAs rivales o protagonista pilotado por IA")
+    args = parser.parse_args()
+
+    output = args.output or policy_path(args.kind)
+    header, data = build_policy(kind=args.kind)
+    write_policy(output, header, data)
+    print(f"✅ Política guardada en {output} ({len(header['slots'])} etapas, {len(data)} estados)")
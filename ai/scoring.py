@@ -0,0 +1,96 @@
+# ============================================================================
+# ARCHIVO: ai/scoring.py
+# DESCRIPCIÓN: Puntuación de opciones para las IAs con caché. La parte
+#              determinista de la puntuación solo depende del personaje, la
+#              opción y tres umbrales del estado, así que se calcula una vez
+#              por clave y se reutiliza entre turnos y entre asientos.
+# ============================================================================
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Pesos por nivel de riesgo y por personaje
+RISK_SCORE = {'bajo': 1.2, 'medio': 1.0, 'alto': 0.8}
+CHARACTER_SCORE = {
+    'usuario': {'bajo': 1.3, 'medio': 1.0, 'alto': 0.6},
+    'hacker': {'bajo': 1.0, 'medio': 1.2, 'alto': 1.0},
+    'cyberdelincuente': {'bajo': 0.8, 'medio': 1.0, 'alto': 1.3}
+}
+
+# Umbrales del estado que cambian la puntuación (un bit cada uno)
+HIGH_DETECTION = 70
+LOW_RESOURCES = 30
+LOW_HEALTH = 40
+_DETECTION_BIT, _RESOURCES_BIT, _HEALTH_BIT = 1, 2, 4
+
+
+def state_bucket(state: Optional[Dict]) -> int:
+    """Resume el estado en los umbrales que usa la puntuación (0-7, -1 sin estado)"""
+    if not state:
+        return -1
+    return ((_DETECTION_BIT if state['detection'] > HIGH_DETECTION else 0)
+            | (_RESOURCES_BIT if state['resources'] < LOW_RESOURCES else 0)
+            | (_HEALTH_BIT if state['health'] < LOW_HEALTH else 0))
+
+
+class OptionScorer:
+    """Puntuación base (sin variación aleatoria) memoizada por
+    (personaje, éxito, riesgo, tiempo, cubo de estado).
+
+    La clave usa los valores de la opción y no su id: el caché se comparte
+    entre catálogos que reutilizan ids con otros valores.
+    """
+
+    def __init__(self):
+        self._cache = {}
+
+    def score(self, character: str, option: Dict, bucket: int) -> float:
+        key = (character, option['success'], option['risk'], option['time'], bucket)
+        score = self._cache.get(key)
+        if score is None:
+            score = self._cache[key] = self._compute(character, option, bucket)
+        return score
+
+    @staticmethod
+    def _compute(character: str, option: Dict, bucket: int) -> float:
+        risk = option['risk']
+        score = option['success']
+        score *= RISK_SCORE.get(risk, 1.0)
+        score *= CHARACTER_SCORE.get(character, {}).get(risk, 1.0)
+
+        if bucket >= 0:
+            # Si la detección es alta, evitar riesgos
+            if bucket & _DETECTION_BIT and risk == 'alto':
+                score *= 0.5
+            elif bucket & _DETECTION_BIT and risk == 'bajo':
+                score *= 1.3
+            # Si los recursos son bajos, evitar opciones que consuman mucho tiempo
+            if bucket & _RESOURCES_BIT and option['time'] > 2:
+                score *= 0.8
+            # Si la salud es baja, ser conservador
+            if bucket & _HEALTH_BIT and risk == 'alto':
+                score *= 0.6
+        return score
+
+    def score_options(self, character: str, options: Sequence[Dict], state: Optional[Dict]) -> List[float]:
+        bucket = state_bucket(state)
+        return [self.score(character, option, bucket) for option in options]
+
+    def score_matrix(self, seats: Sequence[Tuple[str, Sequence[Dict], Optional[Dict]]]) -> List[List[float]]:
+        """Puntúa en una pasada las opciones de varios asientos.
+
+        seats es una lista de (personaje, opciones, estado); retorna una fila
+        por asiento. Los asientos con el mismo personaje, opciones y cubo de
+        estado comparten la fila.
+        """
+        rows, matrix = {}, []
+        for character, options, state in seats:
+            key = (character, id(options), state_bucket(state))
+            row = rows.get(key)
+            if row is None:
+                row = rows[key] = [self.score(character, option, key[2]) for option in options]
+            matrix.append(row)
+        return matrix
+
+
+# Caché compartido por todas las IAs del proceso
+DEFAULT_SCORER = OptionScorer()
@@ -13,9 +13,47 @@ WINDOW_TITLE = "CYBER QUEST RPG - by RBSC"
 MIN_STAGES = 4
 MAX_STAGES = 6
 MAX_PROGRESS = 100
+# Etapas generadas con cadenas de Markov aprendidas del paquete de contenido
+PROCEDURAL_STORIES = True
+# Historias ramificadas: nodos por capa y probabilidad de que una opción salte una capa
+STORY_BRANCH_WIDTH = 2
+STORY_SKIP_CHANCE = 0.15
+
+# Asientos por arquetipo en una partida (el jugador ocupa uno del suyo)
+AI_SEATS_PER_ARCHETYPE = 1
+# Competidores IA que se dibujan en el panel lateral; el resto se resume
+VISIBLE_AI_SEATS = 4
+# Tiempo máximo (ms) que la IA maestro dedica a planificar cada decisión
+AI_PLANNING_BUDGET_MS = 5
+# Nivel de las IAs rivales que elige el jugador: None deja la dificultad por
+# personaje del motor (facil/medio/dificil); el resto la fija para todos
+RIVAL_LEVELS = {'clasico': None, 'maestro': 'maestro', 'experto': 'experto'}
+DEFAULT_RIVAL_LEVEL = 'clasico'
+
+# Modo carrera en tiempo real: un único tick de Tk mueve la rueda de temporizadores
+REALTIME_TICK_MS = 50
+# Milisegundos entre acciones de cada dificultad de IA (con ±20% de variación)
+REALTIME_AI_CADENCE_MS = {'facil': 9000, 'medio': 7500, 'dificil': 6000,
+                          'maestro': 5500, 'experto': 5500}
+# Duración en tiempo real de un "turno" de efecto
+REALTIME_EFFECT_PERIOD_MS = 5000
+# Intervalo (mínimo, máximo) entre eventos globales
+REALTIME_EVENT_INTERVAL_MS = (15000, 30000)
 
 # Archivos de datos
 RANKING_FILE = 'data/ranking.json'
+# Autoguardado de la partida en curso (instantánea + un delta por turno) y
+# cuántos deltas se acumulan antes de reescribir la instantánea
+AUTOSAVE_FILE = 'data/autosave.cqsv'
+AUTOSAVE_COMPACT_AFTER = 32
+# Repeticiones: carpeta, pasos entre fotogramas clave y pausa máxima a 1x (ms)
+REPLAY_DIR = 'data/replays'
+REPLAY_KEYFRAME_INTERVAL = 8
+REPLAY_MAX_GAP_MS = 4000
+
+# Paquete de contenido base y carpeta del caché compilado (relativos a la raíz)
+CONTENT_PACK = 'content/base.json'
+CONTENT_CACHE_DIR = 'data/cache'
 
 # Información del juego
 GAME_VERSION = "1.0.0"
@@ -0,0 +1,425 @@
+# ============================================================================
+# ARCHIVO: game/balance_simulator.py
+# DESCRIPCIÓN: Simulador Monte Carlo vectorizado con NumPy. Juega millones de
+#              partidas completas a la vez (una fila por partida) aplicando las
+#              mismas reglas que GameEngine como operaciones sobre arreglos.
+#              Cada partida recorre un grafo de etapas (StoryGraph) del mismo
+#              StoryGenerator que usa el juego, con sus ramas que saltan capas.
+#              Requiere numpy (opcional): pip install numpy
+# ============================================================================
+
+import random
+from typing import Dict, Iterable, List
+
+from ai import scoring
+from config.constants import MIN_STAGES, MAX_STAGES, MAX_PROGRESS
+from game.engine import CHARACTER_TYPES, AI_DIFFICULTIES
+from game.rules import RULES, RISK_LEVELS, STAT_FIELDS, SUCCESS_BOUNDS, CompiledRules
+from models.story import PHASES, StoryGenerator, game_story_generator
+from utils.customization_system import ACCESSORIES, compile_accessory_modifiers
+
+try:
+    import numpy as np
+except ImportError:  # numpy solo es necesario para el simulador
+    np = None
+
+BAJO, MEDIO, ALTO = 0, 1, 2
+HEALTH, DETECTION, RESOURCES = 0, 1, 2  # mismo orden que STAT_FIELDS
+
+# Códigos de resultado por partida
+OUTCOMES = ['victoria'] + CHARACTER_TYPES + ['system_failure', 'detected', 'time_out']
+WIN = 0
+SYSTEM_FAILURE = 1 + len(CHARACTER_TYPES)
+DETECTED = SYSTEM_FAILURE + 1
+TIME_OUT = DETECTED + 1
+
+# Pesos de OptionScorer (ai/scoring.py), indexados por nivel de riesgo
+RISK_SCORE = [scoring.RISK_SCORE[risk] for risk in RISK_LEVELS]
+CHAR_SCORE = {character: [weights[risk] for risk in RISK_LEVELS]
+              for character, weights in scoring.CHARACTER_SCORE.items()}
+
+DEFAULT_CHUNK = 250_000
+# Grafos de historia sorteados por personaje; cada partida usa uno al azar.
+# La tasa de victoria varía mucho de un grafo a otro: con pocos grafos la
+# muestra fija sesga el resultado (1024 grafos desvían ~1,5 puntos)
+GRAPH_POOL = 16384
+GRAPH_SEED = 0
+
+# Grafos ya sorteados por (personaje, forma de historia, opciones por fase, tamaño)
+_GRAPH_POOLS = {}
+
+
+class BalanceSimulator:
+    """Simula lotes de partidas en paralelo de datos para estimar tasas de victoria.
+
+    Por defecto usa el StoryGenerator del juego (game_story_generator): la
+    longitud de cada partida sale del grafo de etapas y de las opciones
+    elegidas, igual que en GameEngine.check_outcome. Los grafos se sortean
+    una vez por forma de historia (semilla fija, GRAPH_POOL grafos) y los
+    comparten todos los simuladores del proceso, así el ajuste de balance no
+    los vuelve a sortear con cada catálogo candidato.
+    """
+
+    def __init__(self, story_generator: StoryGenerator = None, seed: int = None,
+                 chunk_size: int = DEFAULT_CHUNK, rules: CompiledRules = None,
+                 graph_pool: int = GRAPH_POOL):
+        if np is None:
+            raise ImportError("numpy no instalado - Instalar con: pip install numpy")
+        self.story_generator = story_generator or game_story_generator()
+        self.rng = np.random.default_rng(seed)
+        self.chunk_size = chunk_size
+        self.graph_pool = graph_pool
+        self._option_tables = {char: self._build_option_table(char) for char in CHARACTER_TYPES}
+        self._compile_rules(rules or RULES)
+
+    def _compile_rules(self, rules: CompiledRules):
+        """Convierte las tablas de reglas compiladas en arreglos de NumPy"""
+        self.rules = rules
+        # Tablas de modificador por valor de estadística, en el orden de STAT_FIELDS
+        self._state_tables = {kind: np.array(tables, dtype=np.int16)
+                              for kind, tables in rules.state_tables.items()}
+        # Solo se siguen los efectos con modificador de éxito; el resto no cambia la simulación
+        self._effect_types = [t for t, mod in rules.effect_modifiers.items() if mod]
+        self._effect_mods = np.array([rules.effect_modifiers[t] for t in self._effect_types], dtype=np.int16)
+        self._effect_span = 1 + max(rules.effect_definitions[t]['duration'] for t in self._effect_types)
+        weights = np.array([weight for _, weight, _, _ in rules.global_events], dtype=np.float64)
+        self._event_weights = weights / weights.sum()
+
+    def _build_option_table(self, character: str):
+        """Convierte las opciones del StoryGenerator en arreglos [etapas totales, etapa, opción]"""
+        n_totals = MAX_STAGES - MIN_STAGES + 1
+        n_options = max(
+            len(self.story_generator.options.for_stage(character, i, total))
+            for total in range(MIN_STAGES, MAX_STAGES + 1) for i in range(total)
+        )
+        success = np.zeros((n_totals, MAX_STAGES, n_options), dtype=np.int16)
+        risk = np.zeros((n_totals, MAX_STAGES, n_options), dtype=np.int8)
+        duration = np.zeros((n_totals, MAX_STAGES, n_options), dtype=np.int8)
+        valid = np.zeros((n_totals, MAX_STAGES, n_options), dtype=bool)
+
+        for t, total in enumerate(range(MIN_STAGES, MAX_STAGES + 1)):
+            for i in range(total):
+                for j, option in enumerate(self.story_generator.options.for_stage(character, i, total)):
+                    success[t, i, j] = option['success']
+                    risk[t, i, j] = RISK_LEVELS.index(option['risk'])
+                    duration[t, i, j] = option['time']
+                    valid[t, i, j] = True
+
+        return {'success': success, 'risk': risk, 'time': duration, 'valid': valid}
+
+    def _graph_pool(self, character: str) -> Dict:
+        """Grafos de historia del personaje como arreglos [grafo, nodo(, opción)]"""
+        generator = self.story_generator
+        counts = tuple(len(generator.options.for_phase(character, phase)) for phase in PHASES)
+        key = (character, generator.branch_width, generator.skip_chance, counts, self.graph_pool)
+        pool = _GRAPH_POOLS.get(key)
+        if pool is None:
+            pool = _GRAPH_POOLS[key] = self._build_graph_pool(character, self.graph_pool)
+        return pool
+
+    def _build_graph_pool(self, character: str, size: int) -> Dict:
+        rng = random.Random(GRAPH_SEED)
+        graphs = [self.story_generator.build_graph(character, rng) for _ in range(size)]
+        n_nodes = max(len(graph) for graph in graphs)
+        n_options = self._option_tables[character]['valid'].shape[2]
+        pad_edges = (-1,) * n_options
+        node_layer, edges = [], []
+        for graph in graphs:
+            padding = n_nodes - len(graph)
+            node_layer.append(graph.node_layer + (0,) * padding)
+            edges.append([targets + pad_edges[len(targets):] for targets in graph.edges]
+                         + [pad_edges] * padding)
+        return {'layers': np.array([graph.num_layers for graph in graphs], dtype=np.int16),
+                'node_layer': np.array(node_layer, dtype=np.int16),
+                'edges': np.array(edges, dtype=np.int16)}
+
+    # ------------------------------------------------------------------------
+    # API pública
+    # ------------------------------------------------------------------------
+
+    def simulate(self, character: str, n_matches: int, player_policy: str = 'random',
+                 accessories: Iterable[str] = ()) -> Dict:
+        """Simula n_matches partidas del personaje contra las IAs por defecto.
+
+        player_policy: 'random' (elección uniforme) o una dificultad de AIPlayer
+        ('facil', 'medio', 'dificil') usada como perfil del jugador.
+        accessories son los ids de los accesorios equipados por el jugador.
+        """
+        accessories = list(accessories)
+        modifiers = compile_accessory_modifiers(accessories)
+        outcome_counts = np.zeros(len(OUTCOMES), dtype=np.int64)
+        total_turns = 0
+        total_errors = 0
+
+        remaining = n_matches
+        while remaining > 0:
+            n = min(self.chunk_size, remaining)
+            outcome, turns, errors = self._simulate_chunk(character, n, player_policy, modifiers)
+            outcome_counts += np.bincount(outcome, minlength=len(OUTCOMES))
+            total_turns += int(turns.sum())
+            total_errors += int(errors.sum())
+            remaining -= n
+
+        return {
+            'character': character,
+            'player_policy': player_policy,
+            'accessories': accessories,
+            'matches': n_matches,
+            'win_rate': float(outcome_counts[WIN] / max(1, n_matches)),
+            'outcomes': {name: int(count) for name, count in zip(OUTCOMES, outcome_counts)},
+            'mean_turns': total_turns / max(1, n_matches),
+            'mean_errors': total_errors / max(1, n_matches)
+        }
+
+    def simulate_all(self, n_matches: int, policies: List[str] = None,
+                     accessories: Iterable[str] = ()) -> List[Dict]:
+        """Simula todos los personajes contra todos los perfiles de jugador indicados.
+
+        De accessories, cada personaje equipa los que son suyos.
+        """
+        policies = policies or ['random', 'facil', 'medio', 'dificil']
+        accessories = set(accessories)
+        results = []
+        for char in CHARACTER_TYPES:
+            equipped = [acc['id'] for acc in ACCESSORIES[char] if acc['id'] in accessories]
+            results.extend(self.simulate(char, n_matches, policy, equipped) for policy in policies)
+        return results
+
+    # ------------------------------------------------------------------------
+    # Núcleo vectorizado
+    # ------------------------------------------------------------------------
+
+    def _simulate_chunk(self, character: str, n: int, player_policy: str, accessories):
+        rng = self.rng
+        rows = np.arange(n)
+        player = CHARACTER_TYPES.index(character)
+        ais = [c for c in range(len(CHARACTER_TYPES)) if c != player]
+        table = self._option_tables[character]
+        graphs = self._graph_pool(character)
+
+        graph = rng.integers(len(graphs['layers']), size=n)
+        total_idx = graphs['layers'][graph] - MIN_STAGES
+
+        states = np.empty((n, len(CHARACTER_TYPES), len(STAT_FIELDS)), dtype=np.int16)
+        states[:, :, HEALTH] = 100
+        states[:, :, DETECTION] = 0
+        states[:, :, RESOURCES] = 50
+
+        progress = np.zeros((n, len(CHARACTER_TYPES)), dtype=np.int16)
+        errors = np.zeros(n, dtype=np.int16)
+        turns = np.zeros(n, dtype=np.int16)
+        node = np.zeros(n, dtype=np.int16)
+        outcome = np.full(n, -1, dtype=np.int8)
+        # Efectos del jugador: instancias por tipo y turnos en que aún aplican
+        effects = np.zeros((n, len(self._effect_types), self._effect_span), dtype=np.int8)
+
+        active = np.ones(n, dtype=bool)
+        while active.any():
+            idx = rows[active]
+            m = len(idx)
+            g_idx, n_idx = graph[idx], node[idx]
+            t_idx, s_idx = total_idx[idx], graphs['node_layer'][g_idx, n_idx]
+            opt_success = table['success'][t_idx, s_idx]
+            opt_risk = table['risk'][t_idx, s_idx]
+            opt_time = table['time'][t_idx, s_idx]
+            opt_valid = table['valid'][t_idx, s_idx]
+            turns[idx] += 1
+
+            # --- Acción del jugador ---
+            if player_policy == 'random':
+                keys = np.where(opt_valid, rng.random(opt_valid.shape), -1.0)
+                choice = keys.argmax(axis=1)
+            else:
+                choice = self._ai_decisions(character, player_policy, opt_success, opt_risk,
+                                            opt_time, opt_valid, states[idx, player])
+            effect_mod = (effects[idx].sum(axis=2) * self._effect_mods).sum(axis=1) + accessories.success
+            success, gain, risk = self._resolve(states, idx, player, 'player',
+                                                opt_success, opt_risk, choice, effect_mod)
+            gain = gain + np.where(success, accessories.progress[True], accessories.progress[False])
+            progress[idx, player] = np.minimum(MAX_PROGRESS, progress[idx, player] + gain)
+            errors[idx] += ~success
+            self._apply_accessories(states, idx, player, success, accessories)
+            self._apply_effects(effects, idx, success, risk)
+            self._global_events(states, idx, success)
+
+            # --- Turno de las IAs (cada una con las opciones de su personaje) ---
+            for ai in ais:
+                running = progress[idx, ai] < MAX_PROGRESS
+                if not running.any():
+                    continue
+                sub = idx[running]
+                ai_table = self._option_tables[CHARACTER_TYPES[ai]]
+                a_t, a_s = t_idx[running], s_idx[running]
+                ai_success = ai_table['success'][a_t, a_s]
+                ai_risk = ai_table['risk'][a_t, a_s]
+                decision = self._ai_decisions(
+                    CHARACTER_TYPES[ai], AI_DIFFICULTIES[CHARACTER_TYPES[ai]],
+                    ai_success, ai_risk, ai_table['time'][a_t, a_s],
+                    ai_table['valid'][a_t, a_s], states[sub, ai]
+                )
+                _, ai_gain, _ = self._resolve(states, sub, ai, 'ai', ai_success,
+                                              ai_risk, decision, accessories.ai_success)
+                progress[sub, ai] = np.minimum(MAX_PROGRESS, progress[sub, ai] + ai_gain)
+
+            # --- Condiciones de fin (mismo orden que GameEngine.check_outcome) ---
+            result = np.full(m, -1, dtype=np.int8)
+            result[progress[idx, player] >= MAX_PROGRESS] = WIN
+            for ai in ais:
+                result[(result < 0) & (progress[idx, ai] >= MAX_PROGRESS)] = 1 + ai
+            player_state = states[idx, player]
+            result[(result < 0) & (player_state[:, HEALTH] <= 0)] = SYSTEM_FAILURE
+            result[(result < 0) & (player_state[:, DETECTION] >= 100)] = DETECTED
+            # Avanzar por la rama de la opción elegida; al salir del grafo se acaba el tiempo
+            next_node = graphs['edges'][g_idx, n_idx, choice]
+            result[(result < 0) & (next_node < 0)] = TIME_OUT
+
+            outcome[idx] = result
+            node[idx] = np.where(result < 0, next_node, n_idx)
+            active[idx] = result < 0
+
+        return outcome, turns, errors
+
+    def _resolve(self, states, idx, char, kind, opt_success, opt_risk, choice, effect_mod):
+        """Versión vectorizada de CompiledRules.resolve_action para un asiento"""
+        rng = self.rng
+        k = len(idx)
+        picked = np.arange(k)
+        st = states[idx, char].astype(np.int16)
+
+        tables = self._state_tables[kind]
+        chance = (opt_success[picked, choice] + effect_mod
+                  + tables[HEALTH][st[:, HEALTH]]
+                  + tables[DETECTION][st[:, DETECTION]]
+                  + tables[RESOURCES][st[:, RESOURCES]])
+        success = rng.integers(1, 101, size=k) <= np.clip(chance, *SUCCESS_BOUNDS)
+
+        (fail_low, fail_high), (ok_low, ok_high) = self.rules.progress[kind]
+        gain = np.where(success, rng.integers(ok_low, ok_high + 1, size=k),
+                        rng.integers(fail_low, fail_high + 1, size=k))
+
+        risk = opt_risk[picked, choice]
+        for r in range(len(RISK_LEVELS)):
+            for outcome in (False, True):
+                rows = np.nonzero((risk == r) & (success == outcome))[0]
+                if len(rows) == 0:
+                    continue
+                for field, low, high in self.rules.deltas[r][outcome]:
+                    f = STAT_FIELDS.index(field)
+                    delta = rng.integers(low, high + 1, size=len(rows))
+                    st[rows, f] = np.clip(st[rows, f] + delta, 0, 100)
+
+        states[idx, char] = st
+        return success, gain, risk
+
+    def _apply_accessories(self, states, idx, char, success, accessories):
+        """Cambios de estado de los accesorios del jugador por resultado"""
+        for outcome in (False, True):
+            deltas = accessories.state[outcome]
+            if not deltas:
+                continue
+            rows = idx[success == outcome]
+            for field, delta in deltas:
+                f = STAT_FIELDS.index(field)
+                states[rows, char, f] = np.clip(states[rows, char, f] + delta, 0, 100)
+
+    def _apply_effects(self, effects, idx, success, risk):
+        """Envejece los efectos activos y aplica los nuevos según riesgo y resultado"""
+        k = len(idx)
+        eff = effects[idx]
+        eff[:, :, :-1] = eff[:, :, 1:]
+        eff[:, :, -1] = 0
+
+        roll = self.rng.random(k)
+        rows = np.arange(k)
+        for r in range(len(RISK_LEVELS)):
+            for outcome in (False, True):
+                proc = self.rules.procs[r][outcome]
+                if proc is None or proc[1] not in self._effect_types:
+                    continue
+                chance, effect_type = proc
+                mask = (risk == r) & (success == outcome) & (roll < chance)
+                # Un efecto de duración d afecta a los d+1 turnos siguientes
+                duration = self.rules.effect_definitions[effect_type]['duration']
+                eff[rows[mask], self._effect_types.index(effect_type), duration] += 1
+
+        effects[idx] = eff
+
+    def _global_events(self, states, idx, success):
+        """Versión vectorizada de GameEngine.create_global_event"""
+        rng = self.rng
+        k = len(idx)
+        chance_fail, chance_ok = self.rules.global_event_chance
+        fires = rng.random(k) < np.where(success, chance_ok, chance_fail)
+        kind = rng.choice(len(self._event_weights), size=k, p=self._event_weights)
+
+        for e, (_, _, _, delta) in enumerate(self.rules.global_events):
+            if not delta:
+                continue
+            field, amount = delta
+            f = STAT_FIELDS.index(field)
+            hit = idx[fires & (kind == e)]
+            states[hit, :, f] = np.clip(states[hit, :, f] + amount, 0, 100)
+
+    def _ai_decisions(self, character: str, difficulty: str, success, risk, duration, valid, state):
+        """Versión vectorizada de AIPlayer.make_decision; retorna el índice elegido por fila"""
+        rng = self.rng
+        k, n_opt = success.shape
+        det = state[:, DETECTION][:, None]
+        res = state[:, RESOURCES][:, None]
+        hp = state[:, HEALTH][:, None]
+
+        score = success * np.take(RISK_SCORE, risk) * np.take(CHAR_SCORE[character], risk)
+        score = score * np.where((det > 70) & (risk == ALTO), 0.5, 1.0)
+        score = score * np.where((det > 70) & (risk == BAJO), 1.3, 1.0)
+        score = score * np.where((res < 30) & (duration > 2), 0.8, 1.0)
+        score = score * np.where((hp < 40) & (risk == ALTO), 0.6, 1.0)
+        score = score * rng.uniform(0.95, 1.05, size=score.shape)
+        score = np.where(valid, score, -np.inf)
+
+        order = np.argsort(-score, axis=1)
+        rank = np.empty_like(order)
+        np.put_along_axis(rank, order, np.arange(n_opt)[None, :].repeat(k, axis=0), axis=1)
+        best = order[:, 0]
+
+        def pick(mask):
+            """Elige uniformemente entre las opciones marcadas; -1 si no hay ninguna"""
+            keys = np.where(mask & valid, rng.random(mask.shape), -1.0)
+            return np.where(keys.max(axis=1) >= 0, keys.argmax(axis=1), -1)
+
+        if difficulty == 'facil':
+            chosen = pick((rank < 3) & (risk == BAJO))
+        elif difficulty == 'medio':
+            cautious = pick((rank < 3) & (risk != ALTO))
+            chosen = np.where(state[:, DETECTION] > 60, cautious, best)
+        else:
+            cautious = pick((rank < 2) & (risk != ALTO))
+            gamble = pick((risk == ALTO) & (success >= 70))
+            gamble = np.where(rng.random(k) < 0.7, gamble, best)
+            chosen = np.where(state[:, HEALTH] < 40, cautious, gamble)
+
+        return np.where(chosen >= 0, chosen, best)
+
+
+def format_report(results: List[Dict]) -> str:
+    """Formatea los resultados del simulador como tabla de texto"""
+    lines = [f"{'Personaje':<18}{'Perfil':<10}{'Partidas':>10}{'Victoria':>10}{'Turnos':>8}{'Errores':>9}"]
+    for r in results:
+        lines.append(
+            f"{r['character']:<18}{r['player_policy']:<10}{r['matches']:>10}"
+            f"{r['win_rate'] * 100:>9.2f}%{r['mean_turns']:>8.2f}{r['mean_errors']:>9.2f}"
+        )
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Simulador de balance de Cyber Quest")
+    parser.add_argument('--matches', type=int, default=1_000_000, help="Partidas por combinación")
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--accessory', action='append', default=[],
+                        help="Accesorio equipado por el personaje que lo tenga (repetible)")
+    args = parser.parse_args()
+
+    simulator = BalanceSimulator(seed=args.seed)
+    print(format_report(simulator.simulate_all(args.matches, accessories=args.accessory)))
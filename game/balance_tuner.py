@@ -0,0 +1,251 @@
+# ============================================================================
+# ARCHIVO: game/balance_tuner.py
+# DESCRIPCIÓN: Ajuste automático del balance de opciones. Busca valores de
+#              success/risk/time del catálogo de StoryGenerator que lleven la
+#              tasa de victoria de cada personaje a su objetivo, evaluando cada
+#              candidato con una prueba estadística secuencial que solo simula
+#              las partidas necesarias para decidir.
+# ============================================================================
+
+import copy
+import json
+import math
+import random
+from typing import Callable, Dict, List, Tuple
+
+from game.engine import GameEngine, CHARACTER_TYPES
+from game.tournament import play_match
+from game.balance_simulator import BalanceSimulator, np
+from models.story import game_story_generator, load_options_db
+
+RISK_ORDER = ['bajo', 'medio', 'alto']
+
+# Tasas de victoria objetivo por personaje (usuario fácil, cyberdelincuente difícil)
+DEFAULT_TARGETS = {'usuario': 0.55, 'hacker': 0.40, 'cyberdelincuente': 0.25}
+DEFAULT_TOLERANCE = 0.04
+
+SUCCESS_BOUNDS = (10, 95)
+TIME_BOUNDS = (1, 3)
+
+
+class SequentialWinRateTest:
+    """Prueba secuencial de tres salidas sobre una tasa de victoria.
+
+    Simula lotes hasta que el intervalo de confianza de Wilson queda por
+    debajo de la banda objetivo ('low'), por encima ('high') o dentro de ella
+    ('in_band'). Si se alcanza max_matches decide por la estimación puntual.
+    """
+
+    def __init__(self, target: float, tolerance: float, batch: int = 200,
+                 max_matches: int = 20000, z: float = 2.8):
+        self.low = target - tolerance
+        self.high = target + tolerance
+        self.batch = batch
+        self.max_matches = max_matches
+        # z conservador para compensar que se mira el intervalo tras cada lote
+        self.z = z
+
+    def interval(self, wins: int, n: int) -> Tuple[float, float]:
+        """Intervalo de Wilson para wins/n"""
+        p = wins / n
+        z2 = self.z * self.z
+        center = (p + z2 / (2 * n)) / (1 + z2 / n)
+        half = self.z * math.sqrt(p * (1 - p) / n + z2 / (4 * n * n)) / (1 + z2 / n)
+        return center - half, center + half
+
+    def run(self, simulate_batch: Callable[[int], int]) -> Dict:
+        wins = n = 0
+        verdict = None
+        while n < self.max_matches:
+            size = min(self.batch, self.max_matches - n)
+            wins += simulate_batch(size)
+            n += size
+            lower, upper = self.interval(wins, n)
+            if upper < self.low:
+                verdict = 'low'
+            elif lower > self.high:
+                verdict = 'high'
+            elif lower >= self.low and upper <= self.high:
+                verdict = 'in_band'
+            if verdict:
+                break
+
+        p = wins / max(1, n)
+        if verdict is None:
+            verdict = 'low' if p < self.low else 'high' if p > self.high else 'in_band'
+        return {'verdict': verdict, 'win_rate': p, 'matches': n}
+
+
+class BalanceTuner:
+    """Búsqueda local sobre el catálogo de opciones guiada por simulación"""
+
+    def __init__(self, targets: Dict = None, tolerance: float = DEFAULT_TOLERANCE,
+                 player_policy: str = 'medio', backend: str = 'auto', seed: int = None,
+                 batch: int = None, max_matches: int = 20000, max_iterations: int = 30):
+        self.targets = targets or DEFAULT_TARGETS
+        self.tolerance = tolerance
+        self.player_policy = player_policy
+        self.rng = random.Random(seed)
+        self.max_iterations = max_iterations
+        self.max_matches = max_matches
+
+        if backend == 'auto':
+            backend = 'numpy' if np is not None else 'engine'
+        if backend == 'numpy' and np is None:
+            raise ImportError("numpy no instalado - Instalar con: pip install numpy")
+        self.backend = backend
+        # Con numpy los lotes grandes cuestan casi lo mismo que los pequeños
+        self.batch = batch or (2000 if backend == 'numpy' else 200)
+        self.simulated_matches = 0
+
+    # ------------------------------------------------------------------------
+    # Simulación
+    # ------------------------------------------------------------------------
+
+    def _batch_simulator(self, character: str, options_db: Dict) -> Callable[[int], int]:
+        """Crea una función que simula n partidas con el catálogo dado y retorna las victorias.
+
+        Las historias tienen la forma de las del juego (game_story_generator).
+        """
+        story_generator = game_story_generator(options_db)
+
+        if self.backend == 'numpy':
+            simulator = BalanceSimulator(story_generator, seed=self.rng.getrandbits(64))
+
+            def simulate(n):
+                self.simulated_matches += n
+                return simulator.simulate(character, n, self.player_policy)['outcomes']['victoria']
+        else:
+            engine = GameEngine(story_generator, rng=random.Random(self.rng.getrandbits(64)))
+
+            def simulate(n):
+                self.simulated_matches += n
+                return sum(bool(play_match(engine, character, self.player_policy).completed)
+                           for _ in range(n))
+
+        return simulate
+
+    def evaluate(self, character: str, options_db: Dict) -> Dict:
+        test = SequentialWinRateTest(self.targets[character], self.tolerance,
+                                     self.batch, self.max_matches)
+        return test.run(self._batch_simulator(character, options_db))
+
+    # ------------------------------------------------------------------------
+    # Búsqueda
+    # ------------------------------------------------------------------------
+
+    @staticmethod
+    def _candidates(options_db: Dict, character: str, easier: bool) -> List[Tuple[str, Dict]]:
+        """Movimientos vecinos que hacen al personaje más fácil (o más difícil).
+
+        Primero desplazamientos globales de éxito (mayor efecto), luego cambios
+        por opción en success, risk y time.
+        """
+        sign = 1 if easier else -1
+        candidates = []
+
+        for step in (8, 4, 2):
+            table = copy.deepcopy(options_db)
+            for options in table[character].values():
+                for option in options:
+                    option['success'] = _clamp(option['success'] + sign * step, *SUCCESS_BOUNDS)
+            candidates.append((f"success {sign * step:+d} en todas las opciones", table))
+
+        for phase, options in options_db[character].items():
+            for i, option in enumerate(options):
+                label = f"{phase}[{i}] '{option['text']}'"
+
+                success = _clamp(option['success'] + sign * 5, *SUCCESS_BOUNDS)
+                if success != option['success']:
+                    table = copy.deepcopy(options_db)
+                    table[character][phase][i]['success'] = success
+                    candidates.append((f"{label} success -> {success}", table))
+
+                risk_index = RISK_ORDER.index(option['risk']) - sign
+                if 0 <= risk_index < len(RISK_ORDER):
+                    table = copy.deepcopy(options_db)
+                    table[character][phase][i]['risk'] = RISK_ORDER[risk_index]
+                    candidates.append((f"{label} risk -> {RISK_ORDER[risk_index]}", table))
+
+                time_value = _clamp(option['time'] - sign, *TIME_BOUNDS)
+                if time_value != option['time']:
+                    table = copy.deepcopy(options_db)
+                    table[character][phase][i]['time'] = time_value
+                    candidates.append((f"{label} time -> {time_value}", table))
+
+        return candidates
+
+    def tune_character(self, character: str, options_db: Dict) -> Dict:
+        """Ajusta las opciones de un personaje; retorna el catálogo y el historial"""
+        current = self.evaluate(character, options_db)
+        history = [('inicial', current)]
+        print(f"🎯 {character}: objetivo {self.targets[character]:.2f}, "
+              f"inicial {current['win_rate']:.3f} ({current['matches']} partidas)")
+
+        for _ in range(self.max_iterations):
+            if current['verdict'] == 'in_band':
+                break
+            easier = current['verdict'] == 'low'
+            accepted = False
+            for label, table in self._candidates(options_db, character, easier):
+                result = self.evaluate(character, table)
+                improves = (result['win_rate'] > current['win_rate']) if easier else \
+                           (result['win_rate'] < current['win_rate'])
+                if result['verdict'] == 'in_band' or (result['verdict'] == current['verdict'] and improves):
+                    options_db, current = table, result
+                    history.append((label, result))
+                    print(f"   ✅ {label}: {result['win_rate']:.3f} ({result['matches']} partidas)")
+                    accepted = True
+                    break
+            if not accepted:
+                print(f"   ⚠️ Sin movimientos que acerquen {character} al objetivo")
+                break
+
+        return {'options_db': options_db, 'history': history, 'final': current}
+
+    def tune(self, options_db: Dict = None) -> Dict:
+        """Ajusta todos los personajes con objetivo y retorna el catálogo ajustado"""
+        options_db = copy.deepcopy(options_db or load_options_db())
+        report = {}
+        for character in CHARACTER_TYPES:
+            if character not in self.targets:
+                continue
+            tuned = self.tune_character(character, options_db)
+            options_db = tuned['options_db']
+            report[character] = tuned['final']
+        return {'options_db': options_db, 'report': report,
+                'simulated_matches': self.simulated_matches}
+
+
+def _clamp(value: int, low: int, high: int) -> int:
+    return max(low, min(high, value))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Ajuste automático del balance de opciones")
+    parser.add_argument('--output', default='data/tuned_options.json')
+    parser.add_argument('--target', action='append', default=[],
+                        help="personaje=tasa, p. ej. usuario=0.6 (repetible)")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument('--policy', default='medio', help="Perfil del jugador simulado")
+    parser.add_argument('--backend', default='auto', choices=['auto', 'numpy', 'engine'])
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    targets = dict(DEFAULT_TARGETS)
+    for item in args.target:
+        char, rate = item.split('=')
+        targets[char] = float(rate)
+
+    tuner = BalanceTuner(targets, args.tolerance, args.policy, args.backend, args.seed)
+    result = tuner.tune()
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(result['options_db'], f, indent=2, ensure_ascii=False)
+
+    for char, final in result['report'].items():
+        print(f"📊 {char}: {final['win_rate']:.3f} ({final['verdict']})")
+    print(f"✅ Catálogo ajustado guardado en {args.output} "
+          f"({result['simulated_matches']} partidas simuladas)")
@@ -0,0 +1,597 @@
+# ============================================================================
+# ARCHIVO: game/engine.py
+# DESCRIPCIÓN: Motor de juego sin interfaz. Mantiene el estado de la partida
+#              y resuelve cada turno como una llamada de función que retorna
+#              un TurnResult. La capa Tk (CyberQuestGame) solo lo observa.
+# ============================================================================
+
+import time
+import random
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Callable
+
+from config.constants import RIVAL_LEVELS
+from models.story import StoryGenerator, stage_phases
+from ai.ai_player import AIPlayer
+from ai.scoring import DEFAULT_SCORER
+from game.odds import OddsCalculator
+from game.rules import RULES, STAT_MIN, STAT_MAX, CompiledRules
+from game.state_store import CharacterStateStore
+from utils.effects_system import EffectRegistry, EffectDefinition
+from utils.customization_system import compile_accessory_modifiers, NO_ACCESSORIES
+
+CHARACTER_TYPES = ['usuario', 'hacker', 'cyberdelincuente']
+PLAYER_SEAT = 'player'
+AI_DIFFICULTIES = {'usuario': 'facil', 'hacker': 'medio', 'cyberdelincuente': 'dificil'}
+
+
+def rival_difficulties(level: str) -> Dict[str, str]:
+    """Dificultad de las IAs por personaje para un nivel de RIVAL_LEVELS"""
+    difficulty = RIVAL_LEVELS[level]
+    return dict(AI_DIFFICULTIES) if difficulty is None else dict.fromkeys(CHARACTER_TYPES, difficulty)
+
+
+def option_position(options, option: Dict) -> int:
+    """Posición de option en options (por identidad; si no, por igualdad)"""
+    for i, candidate in enumerate(options):
+        if candidate is option:
+            return i
+    return options.index(option)
+
+
+class TurnResult:
+    """Resultado de un turno completo (jugador + IAs)"""
+
+    def __init__(self, option: Dict, success: bool, progress_gain: int):
+        self.option = option
+        self.success = success
+        self.progress_gain = progress_gain
+        self.new_effect = None
+        self.global_event = None
+        self.ai_completed = []
+        # Posición de la opción elegida por cada IA (índice de asiento -> posición)
+        self.ai_decisions = {}
+        self.finished = False
+        self.completed = False
+        self.winner = None
+
+    def __repr__(self):
+        return (f"TurnResult(success={self.success}, gain={self.progress_gain}, "
+                f"finished={self.finished}, winner={self.winner})")
+
+
+class GlobalEvent:
+    """Evento global elegido; la descripción se genera al leerla por primera vez"""
+
+    __slots__ = ('type', 'effect', '_describer', '_description')
+
+    def __init__(self, event_type: str, effect: str, describer: Callable[[str], str] = None):
+        self.type = event_type
+        self.effect = effect
+        self._describer = describer
+        self._description = None
+
+    @property
+    def description(self) -> str:
+        if self._description is None:
+            self._description = self._describer(self.type) if self._describer else self.type
+        return self._description
+
+    def __repr__(self):
+        return f"GlobalEvent({self.type!r})"
+
+
+class GameEngine:
+    """Motor de partida puro Python, sin dependencias de Tk"""
+
+    def __init__(self, story_generator: StoryGenerator = None, rng=None,
+                 event_describer: Callable[[str], str] = None, rules: CompiledRules = None):
+        self.story_generator = story_generator or StoryGenerator()
+        self.rng = rng or random
+        self.rules = rules or RULES
+        self.event_describer = event_describer
+
+        self.selected_character = None
+        self.player_customization = {}
+        self.accessories = NO_ACCESSORIES
+        self.current_story = None
+        self.current_stage = 0
+        self.stage_path = []
+        self.start_time = None
+        self.player_progress = 0
+        self.player_errors = 0
+        self.game_active = False
+        self.effects = EffectRegistry(self.rules.effect_catalog)
+        self.turn_count = 0
+        self.global_events = []
+        self.ai_players = []
+        self.ai_winner = None
+        self.character_states = CharacterStateStore([PLAYER_SEAT])
+        # En tiempo real las IAs, los efectos y los eventos los mueve un reloj
+        # (game.realtime.RealtimeMatch) en lugar de la acción del jugador
+        self.realtime = False
+        # Semilla de la partida (si se fijó al iniciar) y grabador de repetición
+        self.seed = None
+        self.ai_per_archetype = 1
+        self.recorder = None
+        # Calculadoras de probabilidad de la historia por modificador de recursos
+        self._odds = {}
+        # Decisiones de IA especuladas en segundo plano: (turno, nodo, futuro)
+        self.decision_seed = 0
+        self._speculation = None
+        self._executor = None
+        # Las probabilidades van en su propio hilo: recoger la especulación al
+        # resolver el turno nunca espera detrás de un cálculo de probabilidades
+        self._odds_executor = None
+
+    def get_elapsed_time(self) -> int:
+        """Obtiene el tiempo transcurrido"""
+        if self.start_time:
+            return int(time.time() - self.start_time)
+        return 0
+
+    @property
+    def active_effects(self):
+        """Efectos activos del jugador como (definición, turnos restantes)"""
+        return self.effects.active(PLAYER_SEAT)
+
+    def get_player_state(self):
+        """Estado (salud, detección, recursos) del asiento del jugador"""
+        return self.character_states[PLAYER_SEAT]
+
+    def get_current_stage(self) -> Optional[Dict]:
+        """Retorna la etapa actual o None si ya no quedan etapas"""
+        if self.current_story and self.current_stage < len(self.current_story['stages']):
+            return self.current_story['stages'][self.current_stage]
+        return None
+
+    def start(self, character: str, customization: Dict = None,
+              ai_difficulties: Dict = None, scenario_index: int = None,
+              ai_per_archetype: int = 1, realtime: bool = False, seed: int = None):
+        """Inicia una nueva partida con el personaje indicado.
+
+        ai_difficulties permite sobrescribir la dificultad de cada IA por personaje
+        y scenario_index fija el escenario en lugar de elegirlo al azar.
+        ai_per_archetype es el número de asientos por arquetipo; el jugador
+        ocupa uno de los de su propio arquetipo. Con realtime la acción del
+        jugador solo resuelve su propio turno (ver step_ai y tick_effects).
+        Con seed la partida usa su propio generador, así se puede repetir.
+        """
+        self._discard_speculation()
+        if seed is not None:
+            self.rng = random.Random(seed)
+        self.seed = seed
+        self.ai_per_archetype = ai_per_archetype
+        self.recorder = None
+        self.selected_character = character
+        self.player_customization = customization or {}
+        self.accessories = compile_accessory_modifiers(self.player_customization.get('accessories'))
+        self.game_active = True
+        self.realtime = realtime
+        self.start_time = time.time()
+        self.player_progress = 0
+        self.player_errors = 0
+        self.current_stage = 0
+        self.stage_path = [0]
+        self.effects.reset()
+        self.turn_count = 0
+        self.global_events = []
+        self.ai_winner = None
+        self._odds = {}
+
+        self.current_story = self.story_generator.generate_new_story(character, scenario_index, rng=self.rng)
+
+        # Crear IAs y reiniciar el estado de todos los asientos
+        difficulties = dict(AI_DIFFICULTIES, **(ai_difficulties or {}))
+        self.ai_players = self._build_roster(character, difficulties, ai_per_archetype)
+        self.character_states.reset([PLAYER_SEAT] + [ai.seat for ai in self.ai_players])
+        # Semilla de las decisiones de IA: cada (turno, asiento) tiene su propio
+        # generador, así la decisión es la misma se calcule cuando se calcule
+        self.decision_seed = self.rng.getrandbits(32)
+        self.get_current_stage()
+
+        return self.current_story
+
+    def prepare_resume(self, character: str, customization: Dict, roster: List[AIPlayer],
+                       realtime: bool, decision_seed: int, seed: int = None):
+        """Prepara el motor para reanudar una partida guardada (game.savegame).
+
+        Fija el personaje y los asientos con el estado inicial; quien restaura
+        asigna después el estado de cada turno y la historia, y activa la partida.
+        """
+        self.stop()
+        self.selected_character = character
+        self.player_customization = customization
+        self.accessories = compile_accessory_modifiers(customization.get('accessories'))
+        self.realtime = realtime
+        self.current_story = None
+        self.current_stage = 0
+        self.stage_path = []
+        self.effects.reset()
+        self.global_events = []
+        self.ai_players = roster
+        self.ai_winner = None
+        self.character_states.reset([PLAYER_SEAT] + [ai.seat for ai in roster])
+        self.decision_seed = decision_seed
+        self.seed = seed
+        self.recorder = None
+        self._odds = {}
+
+    def _build_roster(self, character: str, difficulties: Dict, per_archetype: int) -> List[AIPlayer]:
+        """Crea los asientos de IA: per_archetype por arquetipo, menos el del jugador"""
+        roster = []
+        for char in CHARACTER_TYPES:
+            count = per_archetype - (1 if char == character else 0)
+            for i in range(count):
+                name = f"IA {i + 1}" if per_archetype > 1 else None
+                roster.append(AIPlayer(char, difficulties[char], rng=self.rng,
+                                       seat=f"{char}#{i + 1}", name=name))
+        return roster
+
+    # ------------------------------------------------------------------------
+    # Resolución de turno
+    # ------------------------------------------------------------------------
+
+    def resolve_turn(self, option: Dict, ai_decisions: Dict[int, int] = None) -> TurnResult:
+        """Resuelve un turno completo: acción del jugador, IAs y condiciones de fin.
+
+        ai_decisions (índice de asiento -> posición de la opción) impone las
+        decisiones de las IAs en lugar de calcularlas, para las repeticiones.
+        """
+        position = self._option_index(option) if self.recorder is not None else None
+        if self.realtime:
+            result = self.resolve_player_action(option)
+            if result is None:
+                return None
+        else:
+            # La especulación lee los estados de las IAs: debe terminar antes de tocarlos
+            plans = self._collect_speculation()
+            result = self.resolve_player_action(option)
+            if result is None:
+                return None
+            result.ai_completed = self.update_ai_progress(plans, ai_decisions, result.ai_decisions)
+        self.check_outcome(result)
+
+        # La etapa siguiente se genera al cerrar el turno: las tiradas siguen
+        # siempre el mismo orden, se muestre o no
+        if self.game_active:
+            self.get_current_stage()
+        if self.recorder is not None:
+            self.recorder.turn(position, result.ai_decisions, self.rng)
+        return result
+
+    def resolve_player_action(self, option: Dict) -> Optional[TurnResult]:
+        """Procesa la acción del jugador con sistema de interconexión"""
+        if not self.game_active:
+            return None
+
+        self.turn_count += 1
+
+        # Tirada de éxito, progreso y cambios de estado por el camino común
+        success, progress_gain = self.rules.resolve_action(
+            'player', option, self.get_player_state(), self.rng,
+            self.effects.modifier(PLAYER_SEAT, 'success') + self.accessories.success
+        )
+        if not success:
+            self.player_errors += 1
+        progress_gain += self.accessories.progress[success]
+        self.player_progress = min(100, self.player_progress + progress_gain)
+
+        result = TurnResult(option, success, progress_gain)
+        self._apply_accessories(success)
+
+        # Generar efectos según el riesgo y resultado
+        result.new_effect = self.apply_action_effects(option, success)
+
+        # Crear evento global que afecta a otros jugadores (en tiempo real van por temporizador)
+        if not self.realtime:
+            result.global_event = self.create_global_event(option, success)
+
+        return result
+
+    def standing(self) -> Optional[tuple]:
+        """(completado, ganador) si el estado actual termina la partida; None si sigue"""
+        # Verificar victoria del jugador
+        if self.player_progress >= 100:
+            return True, None
+
+        # Verificar si alguna IA ganó (se registra al completar, sin recorrer asientos)
+        if self.ai_winner is not None:
+            return False, self.ai_winner.character_type
+
+        # Verificar game over por efectos negativos
+        player_state = self.get_player_state()
+        if player_state['health'] <= 0:
+            return False, "system_failure"
+
+        if player_state['detection'] >= 100:
+            return False, "detected"
+        return None
+
+    def check_outcome(self, result: TurnResult) -> TurnResult:
+        """Verifica condiciones de victoria/derrota y avanza de etapa"""
+        standing = self.standing()
+        if standing is not None:
+            return self._finish(result, *standing)
+
+        # Avanzar por la rama de la opción elegida; al salir del grafo se acaba el tiempo
+        graph = self.current_story['graph']
+        next_node = graph.next(self.current_stage, self._option_index(result.option))
+        if graph.is_terminal(next_node):
+            return self._finish(result, completed=False, winner=graph.terminal_outcome(next_node))
+        self.current_stage = next_node
+        self.stage_path.append(next_node)
+
+        return result
+
+    def _option_index(self, option: Dict) -> int:
+        return option_position(self.get_current_stage()['options'], option)
+
+    def remaining_stages(self, node: int = None):
+        """(mínimo, máximo) de etapas que quedan desde el nodo (por defecto, el actual)"""
+        graph = self.current_story['graph']
+        return graph.remaining(self.current_stage if node is None else node)
+
+    def option_outlook(self, option_index: int):
+        """Etapas que quedarían tras elegir la opción: (mínimo, máximo)"""
+        graph = self.current_story['graph']
+        return graph.remaining(graph.next(self.current_stage, option_index))
+
+    def planning_horizon(self, character: str) -> List[List[Dict]]:
+        """Opciones del personaje en las etapas que siguen a la actual (camino más largo)"""
+        graph = self.current_story['graph']
+        phases = stage_phases(graph.num_layers)
+        catalog = self.story_generator.options
+        return [catalog.for_phase(character, phases[layer])
+                for layer in range(graph.layer(self.current_stage) + 1, graph.num_layers)]
+
+    def request_option_odds(self) -> Future:
+        """Calcula en segundo plano la probabilidad de victoria de cada opción
+        de la etapa actual; el futuro retorna la lista de probabilidades.
+
+        Hay una calculadora por modificador de recursos en la historia y el
+        memo de cada una se reutiliza en todas las etapas. Solo el hilo de
+        probabilidades las usa, con una copia del estado tomada al pedirla.
+        """
+        state = self.get_player_state()
+        modifier = OddsCalculator.resources_modifier(self.rules, state['resources'])
+        calculator = self._odds.get(modifier)
+        if calculator is None:
+            calculator = self._odds[modifier] = OddsCalculator(
+                self.current_story['graph'], self.selected_character, self.story_generator.options,
+                self.accessories, self.rules, state['resources'])
+        snapshot = {'health': state['health'], 'detection': state['detection']}
+        if self._odds_executor is None:
+            self._odds_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='engine-odds')
+        return self._odds_executor.submit(calculator.option_odds, self.current_stage, self.player_progress,
+                                          snapshot, list(self.active_effects))
+
+    def option_odds(self) -> List[float]:
+        """Probabilidad de victoria de cada opción de la etapa actual (espera el cálculo)"""
+        return self.request_option_odds().result()
+
+    def _finish(self, result: TurnResult, completed: bool, winner: str = None) -> TurnResult:
+        self.game_active = False
+        result.finished = True
+        result.completed = completed
+        result.winner = winner
+        return result
+
+    def stop(self):
+        """Detiene la partida sin resolver más turnos"""
+        self.game_active = False
+        self._discard_speculation()
+
+    def _apply_accessories(self, success: bool):
+        """Cambios de estado de los accesorios del jugador (vector precompilado)"""
+        deltas = self.accessories.state[success]
+        if deltas:
+            state = self.get_player_state()
+            for field, delta in deltas:
+                value = state[field] + delta
+                state[field] = STAT_MIN if value < STAT_MIN else STAT_MAX if value > STAT_MAX else value
+
+    def apply_action_effects(self, option: Dict, success: bool) -> Optional[EffectDefinition]:
+        """Aplica efectos según la acción realizada; retorna el nuevo efecto si hubo"""
+        # Avanzar la cuenta regresiva y retirar los efectos vencidos (en tiempo
+        # real la cuenta la lleva el reloj con tick_effects)
+        if not self.realtime:
+            self.effects.tick(PLAYER_SEAT)
+
+        # Aplicar nuevos efectos basados en riesgo y resultado
+        effect_type = self.rules.roll_effect(option['risk'], success, self.rng)
+        if effect_type is None:
+            return None
+        return self.effects.apply(PLAYER_SEAT, effect_type)
+
+    def create_global_event(self, option: Dict, success: bool) -> Optional[GlobalEvent]:
+        """Crea eventos globales que afectan a todos los jugadores"""
+        entry = self.rules.roll_global_event(success, self.rng)
+        if entry is None:
+            return None
+
+        return self._fire_global_event(entry)
+
+    def trigger_global_event(self) -> GlobalEvent:
+        """Dispara un evento global del catálogo sin tirada previa (tiempo real)"""
+        event = self._fire_global_event(self.rules.sample_global_event(self.rng))
+        if self.recorder is not None:
+            self.recorder.global_event(self.rng)
+        return event
+
+    def tick_effects(self):
+        """Avanza un periodo la cuenta regresiva de los efectos del jugador (tiempo real)"""
+        self.effects.tick(PLAYER_SEAT)
+        if self.recorder is not None:
+            self.recorder.effect_tick()
+
+    def _fire_global_event(self, entry) -> GlobalEvent:
+        event_type, _, effect, delta = entry
+        event = GlobalEvent(event_type, effect, self.event_describer)
+        self.global_events.append(event)
+
+        # Aplicar efectos a todos los personajes en una sola operación
+        if delta:
+            self.character_states.apply_all(*delta)
+
+        return event
+
+    # ------------------------------------------------------------------------
+    # Decisiones de IA
+    # ------------------------------------------------------------------------
+
+    def _decision_rng(self, turn: int, index: int) -> random.Random:
+        return random.Random(self.decision_seed + (turn << 16) + index)
+
+    def _decide(self, ai: AIPlayer, index: int, turn: int, options, horizon, base_scores=None) -> Dict:
+        state = self.character_states[ai.seat]
+        return ai.make_decision(options, state, horizon, self.accessories.ai_success,
+                                base_scores, self._decision_rng(turn, index))
+
+    def plan_ai_turn(self, turn: int = None) -> Dict[str, tuple]:
+        """Decisiones de las IAs activas para la etapa actual.
+
+        Retorna asiento -> (clave de decisión, opción). No tira dados ni cambia
+        estados, así que puede calcularse antes de la acción del jugador.
+        """
+        stage = self.get_current_stage()
+        if stage is None:
+            return {}
+        turn = self.turn_count if turn is None else turn
+        catalog = self.story_generator.options
+        phase = stage['phase']
+        ai_modifier = self.accessories.ai_success
+        active = [(index, ai) for index, ai in enumerate(self.ai_players) if not ai.completed]
+
+        # Puntuaciones de todos los asientos que puntúan, en una sola pasada
+        scorers = [ai for _, ai in active if not ai.plans_ahead]
+        scores = dict(zip((ai.seat for ai in scorers), DEFAULT_SCORER.score_matrix(
+            [(ai.character_type, catalog.for_phase(ai.character_type, phase), self.character_states[ai.seat])
+             for ai in scorers])))
+
+        plans = {}
+        horizons = {}
+        for index, ai in active:
+            # La IA decide entre las opciones de su propio personaje para esta fase
+            horizon = None
+            if ai.plans_ahead:
+                horizon = horizons.get(ai.character_type)
+                if horizon is None:
+                    horizon = horizons[ai.character_type] = self.planning_horizon(ai.character_type)
+            decision = self._decide(ai, index, turn, catalog.for_phase(ai.character_type, phase),
+                                    horizon, scores.get(ai.seat))
+            plans[ai.seat] = (ai.decision_key(self.character_states[ai.seat], ai_modifier), decision)
+        return plans
+
+    def speculate_ai_turn(self):
+        """Empieza a calcular en segundo plano las decisiones de las IAs para la
+        etapa que se está mostrando (mientras el jugador piensa)"""
+        self._discard_speculation()
+        if (self.realtime or not self.game_active or self.get_current_stage() is None
+                or not self.ai_players):
+            return
+        turn = self.turn_count + 1
+        self._speculation = (turn, self.current_stage, self._background().submit(self.plan_ai_turn, turn))
+
+    def _background(self) -> ThreadPoolExecutor:
+        """Hilo de trabajo del motor para la especulación de las IAs"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='engine-worker')
+        return self._executor
+
+    def _collect_speculation(self) -> Optional[Dict[str, tuple]]:
+        """Espera la especulación pendiente; None si no hay o ya no corresponde"""
+        if self._speculation is None:
+            return None
+        turn, node, future = self._speculation
+        self._speculation = None
+        plans = future.result()
+        if turn != self.turn_count + 1 or node != self.current_stage:
+            return None
+        return plans
+
+    def _discard_speculation(self):
+        if self._speculation is not None:
+            future = self._speculation[2]
+            self._speculation = None
+            if not future.cancel():
+                future.exception()
+
+    def update_ai_progress(self, plans: Dict[str, tuple] = None, forced: Dict[int, int] = None,
+                           chosen: Dict[int, int] = None) -> List[AIPlayer]:
+        """Actualiza el progreso de los jugadores IA; retorna las IAs que completaron.
+
+        plans son decisiones calculadas de antemano (plan_ai_turn); se usan las
+        que siguen siendo válidas para el estado actual de cada asiento y el
+        resto se recalcula con el mismo generador, así el resultado no depende
+        de si hubo especulación. forced impone la posición de la opción de cada
+        asiento y chosen, si se da, recibe las posiciones elegidas.
+        """
+        completed = []
+        stage = self.get_current_stage()
+        if stage is None:
+            return completed
+
+        ai_modifier = self.accessories.ai_success
+        if plans is None and forced is None:
+            plans = self.plan_ai_turn()
+        catalog = self.story_generator.options
+        for index, ai in enumerate(self.ai_players):
+            if ai.completed:
+                continue
+
+            ai_state = self.character_states[ai.seat]
+            options = catalog.for_phase(ai.character_type, stage['phase'])
+            plan = plans.get(ai.seat) if forced is None else None
+            if forced is not None:
+                decision = options[forced[index]]
+            elif plan is not None and plan[0] == ai.decision_key(ai_state, ai_modifier):
+                decision = plan[1]
+            else:
+                # Un evento global cambió el estado: recalcular solo esta decisión
+                horizon = self.planning_horizon(ai.character_type) if ai.plans_ahead else None
+                decision = self._decide(ai, index, self.turn_count, options, horizon)
+            if chosen is not None:
+                chosen[index] = option_position(options, decision)
+
+            if self._resolve_ai(ai, decision, ai_modifier):
+                completed.append(ai)
+
+        return completed
+
+    def step_ai(self, index: int, forced: int = None) -> bool:
+        """Una acción de la IA index por su cuenta (tiempo real); True si completó.
+
+        Decide entre las opciones de la fase de la etapa que muestra el jugador,
+        con el generador de su siguiente acción; forced impone la posición de
+        la opción (repeticiones).
+        """
+        ai = self.ai_players[index]
+        stage = self.get_current_stage()
+        if not self.game_active or ai.completed or stage is None:
+            return False
+        options = self.story_generator.options.for_phase(ai.character_type, stage['phase'])
+        if forced is not None:
+            decision = options[forced]
+        else:
+            horizon = self.planning_horizon(ai.character_type) if ai.plans_ahead else None
+            decision = self._decide(ai, index, ai.actions + 1, options, horizon)
+        completed = self._resolve_ai(ai, decision, self.accessories.ai_success)
+        if self.recorder is not None:
+            self.recorder.ai_step(index, option_position(options, decision), self.rng)
+        return completed
+
+    def _resolve_ai(self, ai: AIPlayer, decision: Dict, ai_modifier: int) -> bool:
+        # Mismo camino de resolución que el jugador, con el perfil de IA
+        success, gain = self.rules.resolve_action('ai', decision, self.character_states[ai.seat],
+                                                  self.rng, ai_modifier)
+        ai.actions += 1
+        if not success:
+            ai.errors += 1
+        ai.progress = min(100, ai.progress + gain)
+
+        if ai.progress >= 100:
+            ai.completed = True
+            if self.ai_winner is None:
+                self.ai_winner = ai
+        return ai.completed
@@ -1,12 +1,19 @@
 # game/game_manager.py - VERSIÓN CORREGIDA Y MEJORADA
+import os
+import random
+import threading
+import time
 import tkinter as tk
 from tkinter import font as tkfont
-import time
-import random
 
 from config.colors import COLORS
-from models.story import StoryGenerator
-from ai.ai_player import AIPlayer
+from config.constants import AI_SEATS_PER_ARCHETYPE, DEFAULT_RIVAL_LEVEL, REALTIME_TICK_MS
+from ai.policy_table import ensure_policy
+from models.story import game_story_generator
+from game.engine import GameEngine, rival_difficulties
+from game.realtime import RealtimeMatch
+from game.replay import ReplayRecorder, restore_recording
+from game.savegame import Autosave
 from utils.ranking_system import RankingSystem
 from ui.screens import GameScreens
 from utils.dialog_engine import DialogEngine
@@ -24,36 +31,36 @@ class CyberQuestGame:
         self.root.resizable(True, True)
         
         # Sistemas del juego
-        self.story_generator = StoryGenerator()
+        self.story_generator = game_story_generator()
         self.ranking_system = RankingSystem()
         self.dialog_engine = DialogEngine()
         self.effects_system = EffectsSystem()
         self.customization_system = CustomizationSystem()
-        self.ai_players = []
+        self.autosave = Autosave()
+        
+        # La tabla de la IA experto se compila fuera del hilo de Tk si falta en
+        # el caché; hasta entonces esa dificultad planifica como maestro
+        threading.Thread(target=ensure_policy, name='policy-build', daemon=True).start()
         
-        # Variables de juego
+        # Motor de partida sin interfaz: esta clase solo lo observa y lo dibuja
+        self.engine = GameEngine(
+            self.story_generator,
+            event_describer=self.dialog_engine.describe_event
+        )
+        
+        # Variables de interfaz
         self.player_name = tk.StringVar(value="Jugador")
         self.selected_character = None
-        self.current_story = None
-        self.current_stage = 0
-        self.start_time = None
-        self.player_progress = 0
-        self.player_errors = 0
-        self.game_active = False
         self.player_customization = {}
-        self.active_effects = []
-        self.turn_count = 0
+        # Modo carrera en tiempo real: reloj de la partida y su único tick de Tk
+        self.realtime_mode = tk.BooleanVar(value=False)
+        # Nivel de las IAs rivales (config.constants.RIVAL_LEVELS)
+        self.rival_level = tk.StringVar(value=DEFAULT_RIVAL_LEVEL)
+        self.realtime = None
+        self._realtime_job = None
         # Flag usado por modales para indicar que el usuario pidió volver al menú
         self._user_requested_menu = False
         
-        # Sistema de interconexión entre jugadores
-        self.global_events = []
-        self.character_states = {
-            'usuario': {'health': 100, 'detection': 0, 'resources': 50},
-            'hacker': {'health': 100, 'detection': 0, 'resources': 50},
-            'cyberdelincuente': {'health': 100, 'detection': 0, 'resources': 50}
-        }
-        
         # Configurar fuentes
         self.setup_fonts()
         
@@ -83,27 +90,60 @@ class CyberQuestGame:
         for widget in self.root.winfo_children():
             widget.destroy()
     
+    # ------------------------------------------------------------------------
+    # Estado de la partida: delegado al motor sin interfaz
+    # ------------------------------------------------------------------------
+
+    @property
+    def current_story(self):
+        return self.engine.current_story
+
+    @property
+    def current_stage(self):
+        return self.engine.current_stage
+
+    @property
+    def player_progress(self):
+        return self.engine.player_progress
+
+    @property
+    def player_errors(self):
+        return self.engine.player_errors
+
+    @property
+    def game_active(self):
+        return self.engine.game_active
+
+    @property
+    def active_effects(self):
+        return self.engine.active_effects
+
+    @property
+    def turn_count(self):
+        return self.engine.turn_count
+
+    @property
+    def global_events(self):
+        return self.engine.global_events
+
+    @property
+    def character_states(self):
+        return self.engine.character_states
+
+    @property
+    def ai_players(self):
+        return self.engine.ai_players
+
+    @property
+    def start_time(self):
+        return self.engine.start_time
+
     def get_elapsed_time(self) -> int:
         """Obtiene el tiempo transcurrido"""
-        if self.start_time:
-            return int(time.time() - self.start_time)
-        return 0
+        return self.engine.get_elapsed_time()
     
     def start_game(self):
         """Inicia una nueva partida"""
-        self.game_active = True
-        self.start_time = time.time()
-        self.player_progress = 0
-        self.player_errors = 0
-        self.current_stage = 0
-        self.active_effects = []
-        self.turn_count = 0
-        self.global_events = []
-        
-        # Reiniciar estados de personajes
-        for char in self.character_states:
-            self.character_states[char] = {'health': 100, 'detection': 0, 'resources': 50}
-        
         # Cargar personalización
         if self.player_name.get().strip():
             self.player_customization = self.customization_system.get_customization(
@@ -111,288 +151,185 @@ class CyberQuestGame:
                 self.selected_character
             )
         
-        # Generar historia
-        self.current_story = self.story_generator.generate_new_story(self.selected_character)
-        
-        # Crear IA para otros personajes
-        self.ai_players = []
-        characters = ['usuario', 'hacker', 'cyberdelincuente']
-        difficulties = {'usuario': 'facil', 'hacker': 'medio', 'cyberdelincuente': 'dificil'}
-        
-        for char in characters:
-            if char != self.selected_character:
-                ai = AIPlayer(char, difficulties[char])
-                self.ai_players.append(ai)
+        self._stop_realtime()
+        # Semilla propia por partida: la repetición guarda solo la semilla y las entradas
+        self.engine.start(self.selected_character, self.player_customization,
+                          ai_difficulties=rival_difficulties(self.rival_level.get()),
+                          ai_per_archetype=AI_SEATS_PER_ARCHETYPE,
+                          realtime=self.realtime_mode.get(), seed=random.getrandbits(32))
+        self._start_realtime()
+        self.engine.recorder = ReplayRecorder(self.engine, self.player_name.get(), self._replay_clock())
+        self.autosave.begin(self.engine, self.player_name.get())
         
         print(f"🎮 Iniciando juego con personaje: {self.selected_character}")
         print(f"📖 Historia generada: {self.current_story['scenario']['name']}")
         print(f"🎯 Objetivo: {self.current_story['objective']}")
         
-        self.screens.show_game_screen()
+        self.show_stage()
     
-    def process_player_action(self, option: dict):
-        """Procesa la acción del jugador con sistema de interconexión - CORREGIDO"""
-        if not self.game_active:
+    def resume_game(self):
+        """Reanuda la partida del autoguardado"""
+        self._stop_realtime()
+        player_name = self.autosave.load(self.engine)
+        if player_name is None:
+            print("⚠️ No hay una partida guardada válida")
+            self.autosave.clear()
+            self.screens.show_main_menu()
             return
         
-        self.turn_count += 1
-        
-        # Determinar éxito base
-        success_chance = option['success']
-        
-        # Modificar éxito según efectos activos
-        for effect in self.active_effects:
-            if effect['type'] == 'virus':
-                success_chance -= 15
-            elif effect['type'] == 'firewall_blocked':
-                success_chance -= 25
-            elif effect['type'] == 'system_override':
-                success_chance += 20
+        recording = None
+        if self.autosave.recording is not None:
+            recording = restore_recording(self.engine, *self.autosave.recording)
+        if recording is None and self.autosave.recording is not None:
+            # La reconstrucción no coincidió: volver al estado guardado
+            player_name = self.autosave.load(self.engine)
+        
+        self.player_name.set(player_name)
+        self.selected_character = self.engine.selected_character
+        self.player_customization = self.engine.player_customization
+        self.realtime_mode.set(self.engine.realtime)
+        self._start_realtime()
+        if recording is not None:
+            header, steps = recording
+            self.engine.recorder = ReplayRecorder.resume(self.engine, header, steps, self._replay_clock())
+        else:
+            print("⚠️ Esta partida reanudada no se grabará como repetición")
         
-        success = random.randint(1, 100) <= max(10, min(95, success_chance))
+        print(f"💾 Partida reanudada: {self.current_story['scenario']['name']} (turno {self.turn_count})")
+        self.show_stage()
+    
+    def _replay_clock(self):
+        """Reloj de la repetición: el de la partida en tiempo real (sin pausas)
+        o, por turnos, el tiempo transcurrido (None)"""
+        match = self.realtime
+        return (lambda: match.elapsed_ms) if match is not None else None
+    
+    def process_player_action(self, option: dict):
+        """Resuelve el turno en el motor y muestra el resultado"""
+        result = self.engine.resolve_turn(option)
+        if result is None:
+            return
+        if not result.finished:
+            self.autosave.record_turn(self.engine)
         
-        # Calcular ganancia de progreso
-        if success:
-            progress_gain = random.randint(18, 28)
-            self.player_progress += progress_gain
+        if result.success:
             result_text = "✅ ¡Acción exitosa!"
             result_color = COLORS['accent']
             emotion = "victory"
         else:
-            progress_gain = random.randint(3, 8)
-            self.player_progress += progress_gain
-            self.player_errors += 1
             result_text = "❌ Algo salió mal..."
             result_color = COLORS['bg']
             emotion = "stressed"
         
-        # Limitar progreso
-        self.player_progress = min(100, self.player_progress)
-        
-        # Actualizar estado del personaje
-        self.update_character_state(self.selected_character, success, option)
-        
-        # Generar efectos según el riesgo y resultado
-        self.apply_action_effects(option, success)
-        
         # Generar diálogo contextual con Gemini
-        situation = f"acción {option['text']} - resultado: {'éxito' if success else 'fallo'}"
+        situation = f"acción {option['text']} - resultado: {'éxito' if result.success else 'fallo'}"
         dialog = self.dialog_engine.generate_character_dialog(
             self.selected_character, 
             situation,
             emotion
         )
         
-        # Crear evento global que afecta a otros jugadores
-        self.create_global_event(option, success)
+        for ai in result.ai_completed:
+            print(f"🏆 IA {ai.character_type} completó el objetivo!")
         
-        # Mostrar resultado (bloqueante: show_action_result ahora espera hasta que el modal se cierre)
-        self.screens.show_action_result(result_text, result_color, option, success, dialog)
+        # Mostrar resultado (bloqueante: show_action_result espera hasta que el modal se cierre)
+        # El reloj en tiempo real se detiene mientras el modal está abierto
+        self.pause_realtime()
+        self.screens.show_action_result(result_text, result_color, option, result.success, dialog)
 
-        # Si el usuario desde el modal pidió volver al menú, hacerlo y abortar la secuencia
+        # Si el usuario desde el modal pidió volver al menú, hacerlo y abortar la secuencia.
+        # El turno ya está completo (las IAs también movieron) y así se autoguarda:
+        # a diferencia de antes, volver al menú no deshace el avance de las IAs
         if getattr(self, '_user_requested_menu', False):
-            # limpiar flag y volver al menú
             self._user_requested_menu = False
+            self.abandon_match()
             self.screens.show_main_menu()
             return
         
-        # Actualizar IA y procesar sus acciones
-        self.update_ai_progress()
-        
-        # Verificar victoria del jugador
-        if self.player_progress >= 100:
-            self.end_game(completed=True)
-            return
-        
-        # Verificar si alguna IA ganó
-        for ai in self.ai_players:
-            if ai.completed:
-                self.end_game(completed=False, winner=ai.character_type)
-                return
-        
-        # Verificar game over por efectos negativos
-        player_state = self.character_states[self.selected_character]
-        if player_state['health'] <= 0:
-            self.end_game(completed=False, winner="system_failure")
-            return
-        
-        if player_state['detection'] >= 100:
-            self.end_game(completed=False, winner="detected")
+        if result.finished:
+            self.end_game(completed=result.completed, winner=result.winner)
             return
-        
-        # CORRECCIÓN MEJORADA: Avanzar etapa solo si no hemos completado
-        if self.player_progress < 100:
-            if self.current_stage < len(self.current_story['stages']) - 1:
-                self.current_stage += 1
-            else:
-                # Si estamos en la última etapa y no hemos ganado, forzar fin del juego
-                self.end_game(completed=False, winner="time_out")
 
         # Refrescar la pantalla de juego si la partida sigue activa
         if self.game_active:
-            self.screens.show_game_screen()
-    
-    def update_character_state(self, character: str, success: bool, option: dict):
-        """Actualiza el estado del personaje basado en la acción - MEJORADO"""
-        state = self.character_states[character]
-        
-        # Modificar según resultado
-        if success:
-            state['resources'] = min(100, state['resources'] + random.randint(5, 15))
-            state['detection'] = max(0, state['detection'] - random.randint(5, 10))
-        else:
-            state['resources'] = max(0, state['resources'] - random.randint(5, 10))
-            state['detection'] = min(100, state['detection'] + random.randint(10, 20))
-        
-        # Modificar según riesgo
-        if option['risk'] == 'alto':
-            state['detection'] = min(100, state['detection'] + random.randint(15, 25))
-            if not success:
-                state['health'] = max(0, state['health'] - random.randint(10, 20))
-        elif option['risk'] == 'medio':
-            state['detection'] = min(100, state['detection'] + random.randint(5, 15))
-            if not success:
-                state['health'] = max(0, state['health'] - random.randint(5, 10))
-        
-        # Efectos de accesorios
-        if character == self.selected_character and self.player_customization:
-            accessories = self.player_customization.get('accessories', [])
-            if 'shield' in accessories and not success:
-                state['health'] += 5  # Reducción de daño
-            if 'analyzer' in accessories and success:
-                state['resources'] += 5  # Bonus de recursos
-    
-    def apply_action_effects(self, option: dict, success: bool):
-        """Aplica efectos según la acción realizada - MEJORADO"""
-        # Limpiar efectos expirados
-        self.active_effects = [e for e in self.active_effects if e['duration'] > 0]
-        
-        # Reducir duración de efectos activos
-        for effect in self.active_effects:
-            effect['duration'] -= 1
-        
-        # Aplicar nuevos efectos basados en riesgo y resultado
-        effect_chance = random.random()
-        
-        if not success:
-            if option['risk'] == 'alto' and effect_chance < 0.4:
-                self.active_effects.append({
-                    'type': 'virus',
-                    'duration': 2,
-                    'description': '🦠 INFECTADO - Éxito reducido 15%'
-                })
-            elif option['risk'] == 'medio' and effect_chance < 0.3:
-                self.active_effects.append({
-                    'type': 'firewall_blocked',
-                    'duration': 1,
-                    'description': '🛡️ BLOQUEADO - Próxima acción penalizada 25%'
-                })
-        else:
-            # Efectos positivos por éxito
-            if option['risk'] == 'alto' and effect_chance < 0.2:
-                self.active_effects.append({
-                    'type': 'system_override',
-                    'duration': 2,
-                    'description': '⚡ POTENCIADO - Éxito aumentado 20%'
-                })
-            elif option['risk'] == 'medio' and effect_chance < 0.15:
-                self.active_effects.append({
-                    'type': 'encryption',
-                    'duration': 2,
-                    'description': '🔒 ENCRIPTADO - Detección reducida'
-                })
+            self.show_stage()
     
-    def create_global_event(self, option: dict, success: bool):
-        """Crea eventos globales que afectan a todos los jugadores - MEJORADO"""
-        event_chance = 0.3 if success else 0.5
-        
-        if random.random() < event_chance:
-            events = [
-                {
-                    'type': 'security_alert',
-                    'description': self.dialog_engine.generate_event_description('security_alert'),
-                    'effect': 'Todos los jugadores: +20% detección'
-                },
-                {
-                    'type': 'system_vulnerability',
-                    'description': self.dialog_engine.generate_event_description('system_vulnerability'),
-                    'effect': 'Todos los jugadores: +10% éxito próxima acción'
-                },
-                {
-                    'type': 'data_corruption',
-                    'description': self.dialog_engine.generate_event_description('data_corruption'),
-                    'effect': 'Todos los jugadores: -10 recursos'
-                },
-                {
-                    'type': 'network_boost',
-                    'description': self.dialog_engine.generate_event_description('network_boost'),
-                    'effect': 'Todos los jugadores: -15% detección'
-                }
-            ]
-            
-            event = random.choice(events)
-            self.global_events.append(event)
-            
-            # Aplicar efectos a todos los personajes
-            for char in self.character_states:
-                state = self.character_states[char]
-                if event['type'] == 'security_alert':
-                    state['detection'] = min(100, state['detection'] + 20)
-                elif event['type'] == 'data_corruption':
-                    state['resources'] = max(0, state['resources'] - 10)
-                elif event['type'] == 'network_boost':
-                    state['detection'] = max(0, state['detection'] - 15)
-    
-    def update_ai_progress(self):
-        """Actualiza el progreso de los jugadores IA con interconexión - MEJORADO"""
-        for ai in self.ai_players:
-            if ai.completed:
-                continue
-            
-            # La IA toma decisiones considerando el estado actual
-            if self.current_stage < len(self.current_story['stages']):
-                stage = self.current_story['stages'][self.current_stage]
-                decision = ai.make_decision(stage['options'], self.character_states[ai.character_type])
-                
-                # Procesar decisión de IA
-                ai_state = self.character_states[ai.character_type]
-                success_mod = 0
-                
-                # Modificar según estado actual
-                if ai_state['detection'] > 70:
-                    success_mod -= 20
-                elif ai_state['detection'] > 40:
-                    success_mod -= 10
-                
-                if ai_state['resources'] < 20:
-                    success_mod -= 15
-                elif ai_state['resources'] > 80:
-                    success_mod += 10
-                
-                if ai_state['health'] < 30:
-                    success_mod -= 10
-                
-                success = random.randint(1, 100) <= max(10, min(95, decision['success'] + success_mod))
-                
-                # Actualizar progreso de IA
-                if success:
-                    ai.progress += random.randint(15, 25)
-                else:
-                    ai.errors += 1
-                    ai.progress += random.randint(5, 10)
-                
-                ai.progress = min(100, ai.progress)
-                
-                if ai.progress >= 100:
-                    ai.completed = True
-                    print(f"🏆 IA {ai.character_type} completó el objetivo!")
-                
-                # Actualizar estado de la IA
-                self.update_character_state(ai.character_type, success, decision)
+    def show_stage(self):
+        """Muestra la etapa actual; las IAs deciden en segundo plano mientras el jugador piensa"""
+        self.engine.speculate_ai_turn()
+        self.screens.show_game_screen()
+        self.resume_realtime()
+
+    # ------------------------------------------------------------------------
+    # Modo en tiempo real
+    # ------------------------------------------------------------------------
+
+    def _start_realtime(self):
+        if self.engine.realtime:
+            self.realtime = RealtimeMatch(self.engine)
+            self.realtime.start()
+            self._realtime_job = self.root.after(REALTIME_TICK_MS, self._realtime_tick)
+
+    def _realtime_tick(self):
+        """Único callback periódico de la partida: avanza la rueda de temporizadores"""
+        self._realtime_job = None
+        match = self.realtime
+        if match is None:
+            return
+        if match.tick(time.monotonic()):
+            if match.outcome is not None:
+                self.end_game(*match.outcome)
+                return
+            self.screens.refresh_live_panels()
+        if self.game_active:
+            self._realtime_job = self.root.after(REALTIME_TICK_MS, self._realtime_tick)
+
+    def pause_realtime(self):
+        if self.realtime is not None:
+            self.realtime.pause()
+
+    def resume_realtime(self):
+        if self.realtime is not None:
+            self.realtime.resume()
+
+    def _stop_realtime(self):
+        if self._realtime_job is not None:
+            self.root.after_cancel(self._realtime_job)
+            self._realtime_job = None
+        if self.realtime is not None:
+            self.realtime.stop()
+            self.realtime = None
+
+    def abandon_match(self):
+        """Abandona la partida en curso (vuelta al menú) sin registrar puntuación.
+
+        El autoguardado se conserva para poder continuarla desde el menú; la
+        repetición se guarda hasta este punto.
+        """
+        self._stop_realtime()
+        if self.game_active:
+            self.autosave.record_turn(self.engine)
+        self.engine.stop()
+        self._save_replay(False, 'abandoned')
+
+    def _save_replay(self, completed: bool, winner: str = None):
+        recorder, self.engine.recorder = self.engine.recorder, None
+        if recorder is None:
+            return
+        try:
+            # Una partida reanudada reemplaza su repetición parcial (ver ReplayRecorder.path)
+            replaces = os.path.exists(recorder.path())
+            path = recorder.save(completed, winner)
+            print(f"🎬 Repetición {'actualizada' if replaces else 'guardada'}: {path}")
+        except OSError as e:
+            print(f"⚠️ Error guardando repetición: {e}")
     
     def end_game(self, completed: bool, winner: str = None):
         """Finaliza el juego - MEJORADO"""
-        self.game_active = False
+        self._stop_realtime()
+        self.engine.stop()
+        self.autosave.clear()
+        self._save_replay(completed, winner)
         elapsed_time = self.get_elapsed_time()
         
         # Generar diálogo final
@@ -420,4 +357,4 @@ class CyberQuestGame:
             )
         
         # Mostrar pantalla de resultados
-        self.screens.show_results_screen(completed, elapsed_time, winner)
\ No newline at end of file
+        self.screens.show_results_screen(completed, elapsed_time, winner)
@@ -0,0 +1,321 @@
+# ============================================================================
+# ARCHIVO: game/odds.py
+# DESCRIPCIÓN: Calculadora de probabilidad de victoria por opción. Programación
+#              dinámica sobre el estado discretizado del jugador (progreso,
+#              salud, detección y efectos activos) con las mismas reglas que
+#              GameEngine.resolve_player_action, memoizada por
+#              (nodo, cubo de estado, efectos).
+# ============================================================================
+
+from typing import Dict, List, Tuple
+
+from config.constants import MAX_PROGRESS
+from game.rules import CompiledRules, RULES, RISK_INDEX, STAT_MAX, SUCCESS_BOUNDS
+from models.story import stage_phases
+from models.story_graph import StoryGraph
+
+try:
+    import numpy as np
+except ImportError:  # sin numpy los vectores son listas (mismo resultado, más lento)
+    np = None
+
+# Tamaño de los cubos de discretización (deben dividir a 100). El progreso va
+# sin discretizar: los cubos gruesos sobrestiman la victoria cerca de la meta.
+PROGRESS_BUCKET = 1
+STAT_BUCKET = 10
+
+
+# Operaciones sobre los vectores de valor (uno por cubo de progreso)
+if np is not None:
+    def _zeros(n: int):
+        return np.zeros(n)
+
+    def _axpy(acc, weight: float, values):
+        acc += weight * values
+        return acc
+
+    def _maximum(a, b):
+        return np.maximum(a, b)
+
+    def _shift_axpy(acc, weight: float, values, shift: int):
+        acc[:len(acc) - shift] += weight * values[shift:]
+        return acc
+else:
+    def _zeros(n: int):
+        return [0.0] * n
+
+    def _axpy(acc, weight: float, values):
+        return [a + weight * v for a, v in zip(acc, values)]
+
+    def _maximum(a, b):
+        return [x if x > y else y for x, y in zip(a, b)]
+
+    def _shift_axpy(acc, weight: float, values, shift: int):
+        acc[:len(acc) - shift] = [a + weight * v for a, v in zip(acc, values[shift:])]
+        return acc
+
+
+def _uniform(low: int, high: int) -> Dict[int, float]:
+    p = 1.0 / (high - low + 1)
+    return {value: p for value in range(low, high + 1)}
+
+
+def _convolve(a: Dict[int, float], b: Dict[int, float]) -> Dict[int, float]:
+    out = {}
+    for x, px in a.items():
+        for y, py in b.items():
+            out[x + y] = out.get(x + y, 0.0) + px * py
+    return out
+
+
+def _to_buckets(dist: Dict[int, float], size: int) -> Tuple[Tuple[int, float], ...]:
+    """Pasa deltas a unidades de cubo con redondeo estocástico (conserva la media)"""
+    out = {}
+    for delta, p in dist.items():
+        q, r = divmod(delta, size)
+        frac = r / size
+        out[q] = out.get(q, 0.0) + p * (1 - frac)
+        if frac:
+            out[q + 1] = out.get(q + 1, 0.0) + p * frac
+    return tuple((d, p) for d, p in sorted(out.items()) if p > 0)
+
+
+class OddsCalculator:
+    """Probabilidad aproximada de llegar a 100 de progreso antes de que se
+    acaben las etapas, jugando de forma óptima desde la etapa siguiente.
+
+    Es una aproximación: salud y detección van en cubos de STAT_BUCKET y los
+    cambios se reparten entre cubos con redondeo estocástico. Se consideran
+    las condiciones de derrota propias del jugador (salud a 0, detección a
+    100, fin del grafo). La carrera contra las IAs no entra en el cálculo: no
+    depende de las decisiones del jugador. El modificador de recursos queda
+    fijo en el de resources para el resto de la historia; como cambia con los
+    umbrales de recursos, el motor usa una calculadora por modificador (ver
+    resources_modifier).
+    """
+
+    def __init__(self, graph: StoryGraph, character: str, catalog, accessories,
+                 rules: CompiledRules = RULES, resources: int = 50):
+        self.graph = graph
+        self.character = character
+        self.catalog = catalog
+        self.rules = rules
+        self.phases = stage_phases(graph.num_layers)
+        self.memo = {}
+        self._expected = {}
+
+        self._target = MAX_PROGRESS // PROGRESS_BUCKET
+        self._stat_max = STAT_MAX // STAT_BUCKET
+        self._success_bonus = accessories.success
+        health_table, detection_table, _ = rules.state_tables['player']
+        self._health_mods = [health_table[min(STAT_MAX, b * STAT_BUCKET)] for b in range(self._stat_max + 1)]
+        self._detection_mods = [detection_table[min(STAT_MAX, b * STAT_BUCKET)] for b in range(self._stat_max + 1)]
+        self._resources_mod = self.resources_modifier(rules, resources)
+        self._compile(accessories)
+        self._compile_bounds()
+
+    @staticmethod
+    def resources_modifier(rules: CompiledRules, resources: int) -> int:
+        """Modificador de éxito del jugador por sus recursos actuales"""
+        _, _, resources_table = rules.state_tables['player']
+        return resources_table[resources]
+
+    # ------------------------------------------------------------------------
+    # Tablas de transición por (riesgo, resultado)
+    # ------------------------------------------------------------------------
+
+    def _compile(self, accessories):
+        rules = self.rules
+        chance_fail, chance_ok = rules.global_event_chance
+        total_weight = sum(weight for _, weight, _, _ in rules.global_events)
+
+        self._gains = {}
+        self._reach = {}
+        self._health = {}
+        self._detection = {}
+        for success in (False, True):
+            low, high = rules.progress['player'][success]
+            gain = _uniform(low + accessories.progress[success], high + accessories.progress[success])
+            self._gains[success] = _to_buckets(gain, PROGRESS_BUCKET)
+            reach = _zeros(self._target)
+            for progress in range(self._target):
+                reach[progress] = sum(p for g, p in self._gains[success] if progress + g >= self._target)
+            self._reach[success] = reach
+
+            # Evento global: solo importa su efecto sobre la detección del jugador
+            chance = chance_ok if success else chance_fail
+            event = {0: 1.0 - chance}
+            for _, weight, _, delta in rules.global_events:
+                amount = delta[1] if delta and delta[0] == 'detection' else 0
+                event[amount] = event.get(amount, 0.0) + chance * weight / total_weight
+            extra = dict(accessories.state[success])
+
+            for risk in range(len(rules.deltas)):
+                fields = {'health': {extra.get('health', 0): 1.0},
+                          'detection': {extra.get('detection', 0): 1.0}}
+                for field, lo, hi in rules.deltas[risk][success]:
+                    if field in fields:
+                        fields[field] = _convolve(fields[field], _uniform(lo, hi))
+                self._health[risk, success] = _to_buckets(fields['health'], STAT_BUCKET)
+                self._detection[risk, success] = _to_buckets(_convolve(fields['detection'], event), STAT_BUCKET)
+
+        # Los efectos se siguen como perfil: modificador de éxito total de cada una
+        # de las próximas resoluciones. Combinaciones equivalentes comparten estado.
+        self._effect_mods = {t: m for t, m in rules.effect_modifiers.items() if m}
+        self._procs = {}
+        for risk in range(len(rules.procs)):
+            for success in (False, True):
+                proc = rules.procs[risk][success]
+                if proc and proc[1] in self._effect_mods:
+                    duration = rules.effect_definitions[proc[1]]['duration'] + 1
+                    self._procs[risk, success] = (proc[0], self._effect_mods[proc[1]], duration)
+                else:
+                    self._procs[risk, success] = None
+
+    def _compile_bounds(self):
+        """Cotas por nodo a partir de las cuales salud y detección ya no importan.
+
+        Con r etapas por delante la salud baja como mucho r veces la pérdida
+        máxima por turno: por encima de eso todos los valores son equivalentes
+        (si no cambian el éxito). Lo mismo vale para detecciones bajas. Colapsar
+        esos valores reduce los estados sin cambiar el resultado.
+        """
+        stat_max = self._stat_max
+        max_loss = max(0, -min(d for dist in self._health.values() for d, _ in dist))
+        max_gain = max(0, max(d for dist in self._detection.values() for d, _ in dist))
+        flat_health = len(set(self._health_mods[1:])) == 1
+        flat_detection = len(set(self._detection_mods[:stat_max])) == 1
+
+        self._health_cap = []
+        self._detection_floor = []
+        for node in range(len(self.graph)):
+            remaining = self.graph.remaining(node)[1]
+            self._health_cap.append(min(stat_max, remaining * max_loss + 1) if flat_health else stat_max)
+            self._detection_floor.append(max(0, stat_max - remaining * max_gain - 1) if flat_detection else 0)
+
+    # ------------------------------------------------------------------------
+    # Estado
+    # ------------------------------------------------------------------------
+
+    def bucket_state(self, progress: int, state, effects) -> Tuple:
+        """Convierte el estado real del motor en la clave discretizada"""
+        profile = ()
+        for definition, remaining in effects:
+            modifier = self._effect_mods.get(definition.type)
+            if modifier:
+                profile = self._add_effect(profile, modifier, remaining + 1)
+        return (round(progress / PROGRESS_BUCKET),
+                round(state['health'] / STAT_BUCKET),
+                round(state['detection'] / STAT_BUCKET),
+                profile)
+
+    def _options(self, node: int):
+        return self.catalog.for_phase(self.character, self.phases[self.graph.layer(node)])
+
+    @staticmethod
+    def _add_effect(profile: Tuple, modifier: int, resolutions: int) -> Tuple:
+        """Suma un efecto al perfil de modificadores de las próximas resoluciones"""
+        if len(profile) < resolutions:
+            profile = profile + (0,) * (resolutions - len(profile))
+        return tuple(m + modifier if i < resolutions else m for i, m in enumerate(profile))
+
+    # ------------------------------------------------------------------------
+    # Programación dinámica
+    # ------------------------------------------------------------------------
+    # Los valores se guardan como vectores indexados por el cubo de progreso:
+    # salud, detección y efectos no dependen del progreso, así que cada
+    # combinación (nodo, salud, detección, efectos) se resuelve de una vez
+    # para todos los progresos posibles.
+
+    def value(self, node: int, health: int, detection: int, effects: Tuple) -> List[float]:
+        """Probabilidad de victoria por progreso eligiendo siempre la mejor opción"""
+        key = (node, health, detection, effects)
+        cached = self.memo.get(key)
+        if cached is not None:
+            return cached
+        best = None
+        for i, option in enumerate(self._options(node)):
+            q = self.option_value(node, i, option, health, detection, effects)
+            best = q if best is None else _maximum(best, q)
+        self.memo[key] = best
+        return best
+
+    def _continuation(self, node: int, health: int, detection: int, effects: Tuple,
+                      success: bool) -> List[float]:
+        """Valor esperado tras sumar la ganancia de progreso sin llegar a la meta"""
+        key = (node, health, detection, effects, success)
+        cached = self._expected.get(key)
+        if cached is not None:
+            return cached
+        values = self.value(node, health, detection, effects)
+        target = self._target
+        expected = _zeros(target)
+        for gain, p_gain in self._gains[success]:
+            if gain < target:
+                expected = _shift_axpy(expected, p_gain, values, gain)
+        self._expected[key] = expected
+        return expected
+
+    def option_value(self, node: int, index: int, option, health: int,
+                     detection: int, effects: Tuple) -> List[float]:
+        """Probabilidad de victoria por progreso si se elige la opción index"""
+        risk = RISK_INDEX[option['risk']]
+        modifier = (self._success_bonus + (effects[0] if effects else 0)
+                    + self._health_mods[health] + self._detection_mods[detection] + self._resources_mod)
+        chance = option['success'] + modifier
+        low, high = SUCCESS_BOUNDS
+        p_success = (low if chance < low else high if chance > high else chance) / 100.0
+
+        next_node = self.graph.next(node, index)
+        stat_max = self._stat_max
+        if next_node >= 0:
+            health_cap = self._health_cap[next_node]
+            detection_floor = self._detection_floor[next_node]
+        ticked = effects[1:]
+        win = _zeros(self._target)
+
+        for success, p_outcome in ((True, p_success), (False, 1.0 - p_success)):
+            if p_outcome <= 0:
+                continue
+            # Victoria inmediata: la ganancia alcanza la meta desde cada progreso
+            win = _axpy(win, p_outcome, self._reach[success])
+            if next_node < 0:
+                continue
+
+            proc = self._procs[risk, success]
+            if proc:
+                added = self._add_effect(ticked, proc[1], proc[2])
+                effect_outcomes = ((added, proc[0]), (ticked, 1.0 - proc[0]))
+            else:
+                effect_outcomes = ((ticked, 1.0),)
+
+            # Agrupar primero los estados siguientes iguales (los topes en 0 y
+            # 100 colapsan varias combinaciones) y luego sumar sus vectores
+            weights = {}
+            for d_health, p_health in self._health[risk, success]:
+                h = health + d_health
+                if h <= 0:
+                    continue
+                h = health_cap if h > health_cap else h
+                for d_detection, p_detection in self._detection[risk, success]:
+                    d = detection + d_detection
+                    if d >= stat_max:
+                        continue
+                    d = detection_floor if d < detection_floor else d
+                    for next_effects, p_effect in effect_outcomes:
+                        key = (h, d, next_effects)
+                        weights[key] = weights.get(key, 0.0) + p_outcome * p_health * p_detection * p_effect
+
+            for (h, d, next_effects), weight in weights.items():
+                following = self._continuation(next_node, h, d, next_effects, success)
+                win = _axpy(win, weight, following)
+        return win
+
+    def option_odds(self, node: int, progress: int, state, effects) -> List[float]:
+        """Probabilidad de victoria de cada opción de la etapa actual"""
+        prog, health, detection, profile = self.bucket_state(progress, state, effects)
+        prog = min(prog, self._target - 1)
+        health = min(health, self._health_cap[node])
+        detection = max(detection, self._detection_floor[node])
+        return [float(self.option_value(node, i, option, health, detection, profile)[prog])
+                for i, option in enumerate(self._options(node))]
@@ -0,0 +1,135 @@
+# ============================================================================
+# ARCHIVO: game/realtime.py
+# DESCRIPCIÓN: Modo carrera en tiempo real sobre el GameEngine. Las IAs
+#              actúan con su propia cadencia, los efectos vencen por tiempo y
+#              los eventos globales llegan por temporizador. Todo se programa
+#              en una TimerWheel que avanza desde un único tick externo (en la
+#              interfaz, un solo root.after), sin temporizadores por entidad.
+# ============================================================================
+
+import random
+from typing import Dict, Optional, Tuple
+
+from config.constants import (REALTIME_TICK_MS, REALTIME_AI_CADENCE_MS,
+                              REALTIME_EFFECT_PERIOD_MS, REALTIME_EVENT_INTERVAL_MS)
+from utils.timer_wheel import TimerWheel
+
+# Variación aleatoria de la cadencia de las IAs (fracción del intervalo)
+CADENCE_JITTER = 0.2
+
+
+class RealtimeMatch:
+    """Reloj de una partida en tiempo real.
+
+    tick(now) recibe el tiempo monotónico en segundos y avanza la rueda solo
+    mientras la partida no está en pausa (modales de resultado o de menú).
+    Retorna True si algo cambió desde el tick anterior; outcome queda en
+    (completado, ganador) cuando el reloj termina la partida.
+    """
+
+    def __init__(self, engine, cadences: Dict[str, int] = None,
+                 effect_period_ms: int = REALTIME_EFFECT_PERIOD_MS,
+                 event_interval_ms: Tuple[int, int] = REALTIME_EVENT_INTERVAL_MS,
+                 tick_ms: int = REALTIME_TICK_MS):
+        self.engine = engine
+        self.cadences = cadences or REALTIME_AI_CADENCE_MS
+        self.effect_period_ms = effect_period_ms
+        self.event_interval_ms = event_interval_ms
+        self.wheel = TimerWheel(tick_ms)
+        # Generador propio para la variación de los temporizadores: el del motor
+        # solo avanza con las acciones, así la partida se puede repetir
+        self.rng = random.Random()
+        self.outcome = None
+        self.paused = False
+        self._elapsed_ms = 0.0
+        self._last = None
+        self._changed = False
+        self._effect_timer = None
+
+    @property
+    def elapsed_ms(self) -> int:
+        """Tiempo de juego transcurrido (sin contar las pausas)"""
+        return int(self._elapsed_ms)
+
+    def start(self):
+        """Programa la primera acción de cada IA, el reloj de efectos y el primer evento"""
+        self.wheel.clear()
+        for index in range(len(self.engine.ai_players)):
+            self._schedule_ai(index)
+        self._effect_timer = self.wheel.schedule(self.effect_period_ms, self._tick_effects)
+        self._schedule_event()
+
+    def stop(self):
+        self.wheel.clear()
+        self._last = None
+
+    def pause(self):
+        self.paused = True
+        self._last = None
+
+    def resume(self):
+        self.paused = False
+
+    def tick(self, now: float) -> bool:
+        """Avanza el reloj hasta now (segundos monotónicos); True si hubo cambios"""
+        if self.paused or self.outcome is not None:
+            return False
+        if self._last is not None:
+            self._elapsed_ms += (now - self._last) * 1000.0
+        self._last = now
+        self.wheel.advance(self._elapsed_ms)
+        changed, self._changed = self._changed, False
+        return changed
+
+    def effect_seconds(self, remaining: int) -> int:
+        """Segundos aproximados que le quedan a un efecto con remaining periodos"""
+        next_tick = self.wheel.remaining_ms(self._effect_timer) if self._effect_timer else 0
+        return round((remaining * self.effect_period_ms + next_tick) / 1000)
+
+    # ------------------------------------------------------------------------
+    # Temporizadores
+    # ------------------------------------------------------------------------
+
+    def _schedule_ai(self, index: int):
+        ai = self.engine.ai_players[index]
+        cadence = self.cadences.get(ai.difficulty, REALTIME_AI_CADENCE_MS['medio'])
+        delay = cadence * self.rng.uniform(1 - CADENCE_JITTER, 1 + CADENCE_JITTER)
+        self.wheel.schedule(delay, self._ai_turn, index)
+
+    def _ai_turn(self, index: int):
+        engine = self.engine
+        if not engine.game_active:
+            return
+        engine.step_ai(index)
+        self._changed = True
+        if not engine.ai_players[index].completed:
+            self._schedule_ai(index)
+        self._check_standing()
+
+    def _tick_effects(self):
+        self.engine.tick_effects()
+        self._changed = True
+        self._effect_timer = self.wheel.schedule(self.effect_period_ms, self._tick_effects)
+
+    def _schedule_event(self):
+        low, high = self.event_interval_ms
+        self.wheel.schedule(self.rng.randint(low, high), self._global_event)
+
+    def _global_event(self):
+        if not self.engine.game_active:
+            return
+        self.engine.trigger_global_event()
+        self._changed = True
+        self._schedule_event()
+        self._check_standing()
+
+    def _check_standing(self) -> Optional[Tuple]:
+        """Termina la partida si una IA ganó o un evento dejó al jugador fuera"""
+        engine = self.engine
+        if self.outcome is None and engine.game_active:
+            standing = engine.standing()
+            if standing is not None:
+                self.outcome = standing
+                engine.stop()
+                self.wheel.clear()
+        return self.outcome
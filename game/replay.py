@@ -0,0 +1,393 @@
+# ============================================================================
+# ARCHIVO: game/replay.py
+# DESCRIPCIÓN: Repeticiones de partidas. Una partida con semilla propia es
+#              determinista, así que basta con grabar la semilla y un registro
+#              compacto de entradas por paso (opción del jugador, decisiones
+#              de las IAs, eventos del reloj en tiempo real y una huella del
+#              generador para detectar desincronizaciones). El reproductor la
+#              vuelve a simular y salta a cualquier turno desde el fotograma
+#              clave más cercano.
+# ============================================================================
+
+import bisect
+import json
+import os
+import re
+import struct
+import time
+import zlib
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from config.constants import REPLAY_DIR, REPLAY_KEYFRAME_INTERVAL
+from game.engine import GameEngine
+from game.savegame import content_fingerprint, encode_snapshot, decode_snapshot
+from models.story import StoryGenerator
+
+# Formato: MAGIC, versión (u16), huella del contenido (8 bytes), largo de la
+# cabecera JSON (u32), cabecera JSON y los pasos comprimidos con zlib
+MAGIC = b'CQRP'
+FORMAT_VERSION = 1
+_HEADER = struct.Struct('<4sH8sI')
+REPLAY_EXTENSION = '.cqrp'
+
+# Tipos de paso: (tipo, ms desde el inicio, datos, huella del generador)
+TURN, AI_STEP, EFFECT_TICK, GLOBAL_EVENT = range(4)
+_NO_FINGERPRINT = None
+
+
+def rng_fingerprint(rng) -> int:
+    """crc32 del estado interno del generador (no consume tiradas)"""
+    _, internal, _ = rng.getstate()
+    return zlib.crc32(struct.pack(f'<{len(internal)}I', *internal))
+
+
+def pack_steps(steps: Sequence[Tuple]) -> bytes:
+    """Codifica pasos sin comprimir (el autoguardado los agrega turno a turno)"""
+    out = bytearray()
+    for kind, ms, data, fingerprint in steps:
+        out.append(kind)
+        out += ms.to_bytes(4, 'little')
+        if kind == TURN:
+            option, decisions = data
+            out.append(option)
+            out.append(len(decisions))
+            for seat, position in decisions:
+                out.append(seat)
+                out.append(position)
+        elif kind == AI_STEP:
+            out += bytes(data)
+        if fingerprint is not None:
+            out += fingerprint.to_bytes(4, 'little')
+    return bytes(out)
+
+
+def unpack_steps(data: bytes) -> List[Tuple]:
+    """Inverso de pack_steps"""
+    steps, pos = [], 0
+    while pos < len(data):
+        kind = data[pos]
+        ms = int.from_bytes(data[pos + 1:pos + 5], 'little')
+        pos += 5
+        value, fingerprint = None, None
+        if kind == TURN:
+            option, count = data[pos], data[pos + 1]
+            pos += 2
+            value = (option, tuple((data[pos + 2 * i], data[pos + 2 * i + 1]) for i in range(count)))
+            pos += 2 * count
+        elif kind == AI_STEP:
+            value = (data[pos], data[pos + 1])
+            pos += 2
+        if kind != EFFECT_TICK:
+            fingerprint = int.from_bytes(data[pos:pos + 4], 'little')
+            pos += 4
+        steps.append((kind, ms, value, fingerprint))
+    return steps
+
+
+def apply_step(engine: GameEngine, step: Tuple) -> bool:
+    """Vuelve a jugar un paso grabado; False si el generador no coincide con la huella"""
+    kind, _, data, fingerprint = step
+    if kind == TURN:
+        option, decisions = data
+        engine.resolve_turn(engine.get_current_stage()['options'][option], dict(decisions))
+    elif kind == AI_STEP:
+        engine.step_ai(*data)
+    elif kind == EFFECT_TICK:
+        engine.tick_effects()
+    else:
+        engine.trigger_global_event()
+    # En tiempo real el reloj termina la partida al ganar una IA o caer el jugador
+    if kind != TURN and engine.game_active and engine.standing() is not None:
+        engine.stop()
+    return fingerprint is None or rng_fingerprint(engine.rng) == fingerprint
+
+
+def _start_recorded(engine: GameEngine, header: Dict):
+    engine.start(header['character'], header['customization'],
+                 ai_difficulties=header['ai_difficulties'],
+                 ai_per_archetype=header['ai_per_archetype'],
+                 realtime=header['realtime'], seed=header['seed'])
+
+
+def resimulate(engine: GameEngine, header: Dict, steps: Sequence[Tuple]) -> bool:
+    """Reconstruye en engine una partida grabada desde su semilla.
+
+    Sirve para seguir grabando una partida reanudada: el generador queda en
+    el mismo estado que en la partida original. Retorna False si el generador
+    de historias no coincide con el grabado o si algún paso se desincroniza.
+    """
+    generator = engine.story_generator
+    if ((generator.synth is not None) != header['procedural'] or generator.branch_width != header['branch_width']
+            or generator.skip_chance != header['skip_chance']):
+        return False
+    _start_recorded(engine, header)
+    return all(apply_step(engine, step) for step in steps)
+
+
+def _standing_key(engine: GameEngine) -> Tuple:
+    return (engine.turn_count, engine.current_stage, engine.player_progress,
+            [ai.progress for ai in engine.ai_players])
+
+
+def restore_recording(engine: GameEngine, header: Dict, encoded_steps: bytes) -> Optional[Tuple[Dict, List]]:
+    """Sigue la grabación de una partida recién cargada del autoguardado.
+
+    Reconstruye la partida desde la semilla y los pasos guardados
+    (Autosave.recording), así el generador queda igual que en la partida
+    original. Retorna (cabecera, pasos) para ReplayRecorder.resume, o None si
+    la reconstrucción no coincide con lo cargado; en ese caso el motor queda
+    a medio reconstruir y hay que volver a cargar el autoguardado.
+    """
+    steps = unpack_steps(encoded_steps)
+    saved = _standing_key(engine)
+    elapsed = engine.get_elapsed_time()
+    if not resimulate(engine, header, steps) or not engine.game_active or _standing_key(engine) != saved:
+        return None
+    engine.start_time = time.time() - elapsed
+    return header, steps
+
+
+class Replay:
+    """Repetición leída de disco: cabecera (dict) y pasos"""
+
+    def __init__(self, header: Dict, steps: List[Tuple]):
+        self.header = header
+        self.steps = steps
+
+    @property
+    def turns(self) -> int:
+        return sum(1 for step in self.steps if step[0] == TURN)
+
+
+def _slug(text: str) -> str:
+    return re.sub(r'[^A-Za-z0-9_-]+', '_', text).strip('_')[:24] or 'jugador'
+
+
+def write_replay(path: str, header: Dict, steps: List[Tuple]):
+    encoded = json.dumps(header, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, content_fingerprint(), len(encoded)))
+        f.write(encoded)
+        f.write(zlib.compress(pack_steps(steps), 9))
+    os.replace(tmp_path, path)
+
+
+def _read_header(f, path: str) -> Dict:
+    magic, version, fingerprint, header_len = _HEADER.unpack(f.read(_HEADER.size))
+    if magic != MAGIC or version != FORMAT_VERSION:
+        raise ValueError(f"Repetición inválida: {path}")
+    if fingerprint != content_fingerprint():
+        raise ValueError(f"La repetición es de otro paquete de contenido: {path}")
+    return json.loads(f.read(header_len).decode('utf-8'))
+
+
+def read_replay(path: str) -> Replay:
+    with open(path, 'rb') as f:
+        header = _read_header(f, path)
+        steps = unpack_steps(zlib.decompress(f.read()))
+    return Replay(header, steps)
+
+
+def list_replays(directory: str = REPLAY_DIR) -> List[Tuple[str, Dict]]:
+    """(ruta, cabecera) de las repeticiones válidas, de la más reciente a la más antigua"""
+    if not os.path.isdir(directory):
+        return []
+    replays = []
+    for name in sorted(os.listdir(directory), reverse=True):
+        if not name.endswith(REPLAY_EXTENSION):
+            continue
+        path = os.path.join(directory, name)
+        try:
+            with open(path, 'rb') as f:
+                replays.append((path, _read_header(f, path)))
+        except (OSError, ValueError, struct.error):
+            continue
+    return replays
+
+
+# ----------------------------------------------------------------------------
+# Grabación
+# ----------------------------------------------------------------------------
+
+class ReplayRecorder:
+    """Graba los pasos de una partida; el motor lo llama desde engine.recorder.
+
+    clock retorna los ms transcurridos (por defecto, tiempo real desde que se
+    crea el grabador; en tiempo real conviene el reloj de la partida, que no
+    cuenta las pausas).
+    """
+
+    def __init__(self, engine: GameEngine, player_name: str, clock=None):
+        if engine.seed is None:
+            raise ValueError("Solo se pueden grabar partidas iniciadas con semilla")
+        generator = engine.story_generator
+        difficulties = {}
+        for ai in engine.ai_players:
+            difficulties.setdefault(ai.character_type, ai.difficulty)
+        self.header = {
+            'player': player_name,
+            'character': engine.selected_character,
+            'customization': engine.player_customization,
+            'seed': engine.seed,
+            'realtime': engine.realtime,
+            'ai_difficulties': difficulties,
+            'ai_per_archetype': engine.ai_per_archetype,
+            'procedural': generator.synth is not None,
+            'branch_width': generator.branch_width,
+            'skip_chance': generator.skip_chance,
+            'scenario': engine.current_story['scenario']['name'],
+            'date': time.strftime('%Y-%m-%d %H:%M:%S')
+        }
+        self.steps = []
+        if clock is None:
+            start = time.monotonic()
+            clock = lambda: int((time.monotonic() - start) * 1000)
+        self.clock = clock
+
+    @classmethod
+    def resume(cls, engine: GameEngine, header: Dict, steps: List[Tuple], clock=None) -> 'ReplayRecorder':
+        """Sigue grabando una partida reanudada (ver resimulate); el reloj
+        continúa desde el último paso grabado"""
+        recorder = cls(engine, header['player'], clock)
+        recorder.header = header
+        recorder.steps = list(steps)
+        offset, base = (steps[-1][1] if steps else 0), recorder.clock
+        recorder.clock = lambda: offset + base()
+        return recorder
+
+    def export_steps(self, start: int = 0) -> bytes:
+        """Pasos grabados desde start, para el autoguardado"""
+        return pack_steps(self.steps[start:])
+
+    def turn(self, option: int, decisions: Dict[int, int], rng):
+        self.steps.append((TURN, self.clock(), (option, tuple(sorted(decisions.items()))),
+                           rng_fingerprint(rng)))
+
+    def ai_step(self, seat: int, option: int, rng):
+        self.steps.append((AI_STEP, self.clock(), (seat, option), rng_fingerprint(rng)))
+
+    def effect_tick(self):
+        self.steps.append((EFFECT_TICK, self.clock(), None, _NO_FINGERPRINT))
+
+    def global_event(self, rng):
+        self.steps.append((GLOBAL_EVENT, self.clock(), None, rng_fingerprint(rng)))
+
+    def path(self, directory: str = REPLAY_DIR) -> str:
+        """Ruta de la repetición: una por partida, según su fecha de inicio.
+
+        Reemplazar es intencional: una partida abandonada guarda una
+        repetición parcial ('abandoned') y, si se reanuda, el grabador sigue
+        desde esos mismos pasos (resume), así que la repetición final los
+        contiene todos y ocupa su lugar. Si la reanudación no puede seguir
+        grabando no hay grabador y la parcial se conserva.
+        """
+        started = self.header['date'].replace('-', '').replace(':', '').replace(' ', '-')
+        name = f"{started}-{_slug(self.header['player'])}-{self.header['character']}{REPLAY_EXTENSION}"
+        return os.path.join(directory, name)
+
+    def save(self, completed: bool, winner: Optional[str], directory: str = REPLAY_DIR) -> str:
+        """Escribe la repetición con el desenlace en path() y retorna la ruta"""
+        path = self.path(directory)
+        write_replay(path, dict(self.header, completed=completed, winner=winner), self.steps)
+        return path
+
+
+# ----------------------------------------------------------------------------
+# Reproducción
+# ----------------------------------------------------------------------------
+
+class ReplayPlayer:
+    """Vuelve a simular una repetición paso a paso sobre un GameEngine propio.
+
+    position es el número de pasos aplicados. Cada keyframe_interval pasos se
+    guarda un fotograma clave (instantánea del motor y estado del generador)
+    la primera vez que se pasa por él; seek() parte del más cercano.
+    """
+
+    def __init__(self, replay: Replay, story_generator: StoryGenerator = None,
+                 keyframe_interval: int = REPLAY_KEYFRAME_INTERVAL, event_describer=None):
+        self.replay = replay
+        header = replay.header
+        generator = story_generator
+        if (generator is None or (generator.synth is not None) != header['procedural']
+                or generator.branch_width != header['branch_width']
+                or generator.skip_chance != header['skip_chance']):
+            generator = StoryGenerator(procedural=header['procedural'], branch_width=header['branch_width'],
+                                       skip_chance=header['skip_chance'])
+        self.engine = GameEngine(generator, event_describer=event_describer)
+        self.keyframe_interval = keyframe_interval
+        self.position = 0
+        self.desync_at = None
+        self._keyframes = {}
+        # Posición después de cada turno del jugador (turno n -> _turn_ends[n - 1])
+        self._turn_ends = [i + 1 for i, step in enumerate(replay.steps) if step[0] == TURN]
+        self._restart()
+
+    @property
+    def steps(self) -> List[Tuple]:
+        return self.replay.steps
+
+    @property
+    def finished(self) -> bool:
+        return self.position >= len(self.replay.steps)
+
+    @property
+    def turn(self) -> int:
+        """Turnos del jugador ya aplicados"""
+        return bisect.bisect_right(self._turn_ends, self.position)
+
+    @property
+    def total_turns(self) -> int:
+        return len(self._turn_ends)
+
+    def next_gap_ms(self) -> int:
+        """Tiempo grabado entre el paso anterior y el siguiente"""
+        if self.finished:
+            return 0
+        previous = self.steps[self.position - 1][1] if self.position else 0
+        return max(0, self.steps[self.position][1] - previous)
+
+    def _restart(self):
+        _start_recorded(self.engine, self.replay.header)
+        self.position = 0
+        self._capture()
+
+    def _capture(self):
+        if self.position % self.keyframe_interval == 0 and self.position not in self._keyframes:
+            self._keyframes[self.position] = (encode_snapshot(self.engine), self.engine.rng.getstate(),
+                                              self.engine.game_active)
+
+    def _restore(self, position: int):
+        snapshot, rng_state, active = self._keyframes[position]
+        self.engine.rng.setstate(rng_state)
+        decode_snapshot(snapshot, self.engine)
+        # La instantánea se carga como partida en curso; el final también se repite
+        self.engine.game_active = active
+        self.position = position
+
+    def step(self) -> bool:
+        """Aplica el siguiente paso; False si la repetición terminó"""
+        if self.finished:
+            return False
+        if not apply_step(self.engine, self.steps[self.position]) and self.desync_at is None:
+            self.desync_at = self.position
+            print(f"⚠️ Repetición desincronizada en el paso {self.position + 1}")
+        self.position += 1
+        self._capture()
+        return True
+
+    def seek(self, position: int):
+        """Lleva la repetición al paso indicado desde el fotograma clave más cercano"""
+        position = max(0, min(position, len(self.steps)))
+        nearest = max((p for p in self._keyframes if p <= position), default=0)
+        if position < self.position or nearest > self.position:
+            self._restore(nearest)
+        while self.position < position:
+            self.step()
+
+    def seek_turn(self, turn: int):
+        """Posición justo después del turno indicado del jugador (0: inicio)"""
+        turn = max(0, min(turn, self.total_turns))
+        self.seek(self._turn_ends[turn - 1] if turn else 0)
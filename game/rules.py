@@ -0,0 +1,214 @@
+# ============================================================================
+# ARCHIVO: game/rules.py
+# DESCRIPCIÓN: Reglas de resolución de turno declaradas como tablas de datos.
+#              Se compilan una sola vez en tablas de búsqueda (CompiledRules)
+#              y el jugador y las IAs las usan por el mismo camino.
+# ============================================================================
+
+from typing import Dict, Optional, Tuple
+
+from utils.effects_system import EffectDefinition
+from utils.alias_sampler import AliasTable
+
+RISK_LEVELS = ('bajo', 'medio', 'alto')
+RISK_INDEX = {risk: i for i, risk in enumerate(RISK_LEVELS)}
+
+STAT_FIELDS = ('health', 'detection', 'resources')
+STAT_MIN, STAT_MAX = 0, 100
+
+# Límites de la probabilidad de éxito de cualquier acción
+SUCCESS_BOUNDS = (10, 95)
+
+# Progreso ganado por tipo de asiento y resultado: (mínimo, máximo)
+PROGRESS_RANGES = {
+    'player': {True: (18, 28), False: (3, 8)},
+    'ai': {True: (15, 25), False: (5, 10)}
+}
+
+# Modificadores de éxito según el estado del personaje. Cada grupo es una lista
+# de (campo, operador, umbral, modificador) y solo aplica la primera coincidencia.
+STATE_SUCCESS_MODIFIERS = {
+    'player': [],
+    'ai': [
+        [('detection', '>', 70, -20), ('detection', '>', 40, -10)],
+        [('resources', '<', 20, -15), ('resources', '>', 80, 10)],
+        [('health', '<', 30, -10)]
+    ]
+}
+
+# Modificador de éxito por cada efecto activo del tipo indicado
+EFFECT_SUCCESS_MODIFIERS = {
+    'virus': -15,
+    'firewall_blocked': -25,
+    'system_override': 20
+}
+
+# Cambios de estado por resultado: (campo, mínimo, máximo), aplicados en orden
+OUTCOME_DELTAS = {
+    True: [('resources', 5, 15), ('detection', -10, -5)],
+    False: [('resources', -10, -5), ('detection', 10, 20)]
+}
+
+# Cambios de estado adicionales por nivel de riesgo y resultado
+RISK_DELTAS = {
+    'bajo': {True: [], False: []},
+    'medio': {True: [('detection', 5, 15)], False: [('detection', 5, 15), ('health', -10, -5)]},
+    'alto': {True: [('detection', 15, 25)], False: [('detection', 15, 25), ('health', -20, -10)]}
+}
+
+# Efectos que puede desencadenar una acción: (riesgo, éxito) -> (probabilidad, tipo)
+EFFECT_PROCS = {
+    ('alto', False): (0.4, 'virus'),
+    ('medio', False): (0.3, 'firewall_blocked'),
+    ('alto', True): (0.2, 'system_override'),
+    ('medio', True): (0.15, 'encryption')
+}
+
+EFFECT_DEFINITIONS = {
+    'virus': {'duration': 2, 'description': '🦠 INFECTADO - Éxito reducido 15%'},
+    'firewall_blocked': {'duration': 1, 'description': '🛡️ BLOQUEADO - Próxima acción penalizada 25%'},
+    'system_override': {'duration': 2, 'description': '⚡ POTENCIADO - Éxito aumentado 20%'},
+    'encryption': {'duration': 2, 'description': '🔒 ENCRIPTADO - Defensas fortalecidas'}
+}
+
+# Probabilidad de que una acción desencadene un evento global, según su resultado
+GLOBAL_EVENT_CHANCE = {True: 0.3, False: 0.5}
+
+# Catálogo de eventos globales: (tipo, peso, efecto visible, (campo, delta) o None)
+GLOBAL_EVENTS = (
+    ('security_alert', 1, 'Todos los jugadores: +20% detección', ('detection', 20)),
+    ('system_vulnerability', 1, 'Todos los jugadores: +10% éxito próxima acción', None),
+    ('data_corruption', 1, 'Todos los jugadores: -10 recursos', ('resources', -10)),
+    ('network_boost', 1, 'Todos los jugadores: -15% detección', ('detection', -15))
+)
+
+# Tamaño de las tablas de modificadores por valor de estadística
+_STAT_TABLE_SIZE = 256
+
+_COMPARATORS = {
+    '>': lambda value, threshold: value > threshold,
+    '<': lambda value, threshold: value < threshold,
+    '>=': lambda value, threshold: value >= threshold,
+    '<=': lambda value, threshold: value <= threshold
+}
+
+
+class CompiledRules:
+    """Tablas de búsqueda derivadas de las reglas declarativas"""
+
+    def __init__(self, progress_ranges: Dict = PROGRESS_RANGES,
+                 state_modifiers: Dict = STATE_SUCCESS_MODIFIERS,
+                 effect_modifiers: Dict = EFFECT_SUCCESS_MODIFIERS,
+                 outcome_deltas: Dict = OUTCOME_DELTAS,
+                 risk_deltas: Dict = RISK_DELTAS,
+                 effect_procs: Dict = EFFECT_PROCS,
+                 effect_definitions: Dict = EFFECT_DEFINITIONS,
+                 global_event_chance: Dict = GLOBAL_EVENT_CHANCE,
+                 global_events: Tuple = GLOBAL_EVENTS):
+        self.effect_modifiers = dict(effect_modifiers)
+        self.effect_definitions = effect_definitions
+
+        # Catálogo tipado de efectos para el EffectRegistry del motor
+        self.effect_catalog = {
+            effect_type: EffectDefinition(effect_type, definition['duration'], definition['description'],
+                                          success=self.effect_modifiers.get(effect_type, 0))
+            for effect_type, definition in effect_definitions.items()
+        }
+
+        # progress[tipo][éxito] -> (mínimo, máximo)
+        self.progress = {kind: (ranges[False], ranges[True]) for kind, ranges in progress_ranges.items()}
+
+        # state_tables[tipo] -> (tabla salud, tabla detección, tabla recursos) indexadas por valor
+        self.state_tables = {kind: self._compile_state_modifiers(groups)
+                             for kind, groups in state_modifiers.items()}
+
+        # deltas[riesgo][éxito] -> ((campo, mínimo, máximo), ...)
+        self.deltas = tuple(
+            tuple(tuple(outcome_deltas[success]) + tuple(risk_deltas[risk][success])
+                  for success in (False, True))
+            for risk in RISK_LEVELS
+        )
+
+        # procs[riesgo][éxito] -> (probabilidad, tipo) o None
+        self.procs = tuple(
+            tuple(effect_procs.get((risk, success)) for success in (False, True))
+            for risk in RISK_LEVELS
+        )
+
+        # Eventos globales: probabilidad por resultado y tabla de alias por peso
+        self.global_event_chance = (global_event_chance[False], global_event_chance[True])
+        self.global_events = tuple(global_events)
+        self._event_table = AliasTable(self.global_events, [weight for _, weight, _, _ in self.global_events])
+
+    @staticmethod
+    def _compile_state_modifiers(groups) -> Tuple:
+        tables = {field: [0] * _STAT_TABLE_SIZE for field in STAT_FIELDS}
+        for group in groups:
+            field = group[0][0]
+            table = tables[field]
+            for value in range(_STAT_TABLE_SIZE):
+                for _, op, threshold, modifier in group:
+                    if _COMPARATORS[op](value, threshold):
+                        table[value] += modifier
+                        break
+        return tuple(tuple(tables[field]) for field in STAT_FIELDS)
+
+    # ------------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------------
+
+    def state_modifier(self, kind: str, state: Dict) -> int:
+        health, detection, resources = self.state_tables[kind]
+        return health[state['health']] + detection[state['detection']] + resources[state['resources']]
+
+    def success_chance(self, kind: str, option: Dict, state: Dict, effect_modifier: int = 0) -> int:
+        """Probabilidad de éxito acotada (1-100) de una opción para un asiento"""
+        chance = option['success'] + effect_modifier + self.state_modifier(kind, state)
+        low, high = SUCCESS_BOUNDS
+        return low if chance < low else high if chance > high else chance
+
+    # ------------------------------------------------------------------------
+    # Resolución
+    # ------------------------------------------------------------------------
+
+    def resolve_action(self, kind: str, option: Dict, state: Dict, rng,
+                       effect_modifier: int = 0) -> Tuple[bool, int]:
+        """Tira el éxito, calcula el progreso y aplica los cambios de estado.
+
+        Camino común para jugador ('player') e IA ('ai'); retorna (éxito, progreso).
+        """
+        success = rng.randint(1, 100) <= self.success_chance(kind, option, state, effect_modifier)
+        low, high = self.progress[kind][success]
+        gain = rng.randint(low, high)
+        self.apply_state_deltas(state, RISK_INDEX[option['risk']], success, rng)
+        return success, gain
+
+    def progress_gain(self, kind: str, success: bool, rng) -> int:
+        low, high = self.progress[kind][success]
+        return rng.randint(low, high)
+
+    def apply_state_deltas(self, state: Dict, risk: int, success: bool, rng):
+        for field, low, high in self.deltas[risk][success]:
+            value = state[field] + rng.randint(low, high)
+            state[field] = STAT_MIN if value < STAT_MIN else STAT_MAX if value > STAT_MAX else value
+
+    def roll_effect(self, risk: str, success: bool, rng) -> Optional[str]:
+        """Retorna el tipo del nuevo efecto si la acción lo desencadena"""
+        proc = self.procs[RISK_INDEX[risk]][success]
+        if proc is None or rng.random() >= proc[0]:
+            return None
+        return proc[1]
+
+    def roll_global_event(self, success: bool, rng) -> Optional[Tuple]:
+        """Retorna la entrada del catálogo del evento global desencadenado, si hay"""
+        if rng.random() >= self.global_event_chance[success]:
+            return None
+        return self.sample_global_event(rng)
+
+    def sample_global_event(self, rng) -> Tuple:
+        """Elige una entrada del catálogo de eventos globales según su peso"""
+        return self._event_table.sample(rng)
+
+
+# Reglas por defecto compiladas al importar el módulo
+RULES = CompiledRules()
@@ -0,0 +1,409 @@
+# ============================================================================
+# ARCHIVO: game/savegame.py
+# DESCRIPCIÓN: Guardado binario compacto de la partida en curso. El archivo
+#              empieza con una instantánea completa del GameEngine y cada
+#              turno le agrega un delta pequeño (solo lo que cambió), así que
+#              autoguardar cuesta unas decenas de bytes y reanudar es leer un
+#              archivo de pocos KB. Si la partida se está grabando, guarda
+#              también la semilla y los pasos de la repetición.
+# ============================================================================
+
+import json
+import os
+import struct
+import time
+import zlib
+from typing import List, Optional, Sequence, Tuple
+
+from config.constants import AUTOSAVE_FILE, AUTOSAVE_COMPACT_AFTER
+from ai.ai_player import AIPlayer
+from game.engine import GameEngine, GlobalEvent
+from game.rules import STAT_FIELDS
+from models.story_graph import StoryGraph
+from utils.content_pack import default_pack
+
+# Formato: MAGIC, versión (u16) y huella del contenido (8 bytes), seguidos de
+# registros (tipo, largo u32, crc32 u32, datos). El primero es la instantánea
+# (comprimida con zlib) y los siguientes son deltas de turno sin comprimir.
+MAGIC = b'CQSV'
+FORMAT_VERSION = 2
+_HEADER = struct.Struct('<4sH8s')
+_RECORD = struct.Struct('<cII')
+SNAPSHOT, DELTA = b'S', b'D'
+
+
+def content_fingerprint() -> bytes:
+    """Huella del paquete de contenido: las etapas y eventos guardados dependen de él"""
+    return bytes.fromhex(default_pack().content_hash[:16])
+
+
+class _Writer:
+    """Codificador de enteros sin signo y textos cortos (little-endian)"""
+
+    __slots__ = ('data',)
+
+    def __init__(self):
+        self.data = bytearray()
+
+    def u8(self, value: int):
+        self.data.append(value)
+
+    def u16(self, value: int):
+        self.data += value.to_bytes(2, 'little')
+
+    def u32(self, value: int):
+        self.data += value.to_bytes(4, 'little')
+
+    def text(self, value: Optional[str]):
+        """Texto con largo u16; 0xFFFF representa None"""
+        if value is None:
+            self.u16(0xFFFF)
+            return
+        encoded = value.encode('utf-8')
+        self.u16(len(encoded))
+        self.data += encoded
+
+
+class _Reader:
+    __slots__ = ('data', 'pos')
+
+    def __init__(self, data: bytes):
+        self.data = data
+        self.pos = 0
+
+    def u8(self) -> int:
+        self.pos += 1
+        return self.data[self.pos - 1]
+
+    def u16(self) -> int:
+        self.pos += 2
+        return int.from_bytes(self.data[self.pos - 2:self.pos], 'little')
+
+    def u32(self) -> int:
+        self.pos += 4
+        return int.from_bytes(self.data[self.pos - 4:self.pos], 'little')
+
+    def raw(self, size: int) -> bytes:
+        self.pos += size
+        return bytes(self.data[self.pos - size:self.pos])
+
+    def text(self) -> Optional[str]:
+        size = self.u16()
+        if size == 0xFFFF:
+            return None
+        return self.raw(size).decode('utf-8')
+
+
+# ----------------------------------------------------------------------------
+# Codificación de la partida
+# ----------------------------------------------------------------------------
+
+def _marks(engine: GameEngine) -> Tuple[int, int, int, int]:
+    """Largo de las partes que solo crecen: camino, etapas generadas, eventos
+    y pasos grabados"""
+    recorder = engine.recorder
+    return (len(engine.stage_path), engine.current_story['stages'].generated(),
+            len(engine.global_events), len(recorder.steps) if recorder is not None else 0)
+
+
+def _encode_match(out: _Writer, engine: GameEngine, player_name: str):
+    """Lo que no cambia durante la partida: personaje, historia y asientos"""
+    story = engine.current_story
+    out.text(player_name)
+    out.text(engine.selected_character)
+    out.text(json.dumps(engine.player_customization, ensure_ascii=False, separators=(',', ':')))
+    out.u16(story['scenario_index'])
+    out.u8(engine.realtime)
+    out.u32(engine.decision_seed)
+    out.u8(engine.seed is not None)
+    out.u32(engine.seed or 0)
+    recorder = engine.recorder
+    out.text(json.dumps(recorder.header, ensure_ascii=False, separators=(',', ':'))
+             if recorder is not None else None)
+
+    graph = story['graph']
+    out.u8(graph.num_layers)
+    out.u8(len(graph))
+    for node in range(len(graph)):
+        out.u8(graph.node_layer[node])
+        targets = graph.edges[node]
+        out.u8(len(targets))
+        for target in targets:
+            out.u8(target & 0xFF)
+
+    out.u8(len(engine.ai_players))
+    for ai in engine.ai_players:
+        out.text(ai.character_type)
+        out.text(ai.difficulty)
+        out.text(ai.seat)
+        out.text(ai.name)
+
+
+def _encode_turn(out: _Writer, engine: GameEngine, since: Tuple[int, int, int, int]):
+    """Estado variable; de las partes que solo crecen, lo agregado desde since"""
+    # La etapa que verá el jugador se genera ya para guardarla con el turno
+    engine.get_current_stage()
+    out.u32(engine.get_elapsed_time())
+    out.u16(engine.turn_count)
+    out.u8(engine.current_stage)
+    out.u8(engine.player_progress)
+    out.u16(engine.player_errors)
+    winner = engine.ai_players.index(engine.ai_winner) if engine.ai_winner is not None else 0xFF
+    out.u8(winner)
+
+    states = engine.character_states
+    out.u8(len(states))
+    for field in STAT_FIELDS:
+        out.data += states.column(field)
+
+    for ai in engine.ai_players:
+        out.u8(ai.progress)
+        out.u16(ai.errors)
+        out.u16(ai.actions)
+        out.u8(ai.completed)
+        out.u8(ai.conservative_turns)
+
+    effects = engine.effects.snapshot()
+    out.u8(len(effects))
+    for target, turn, next_id, active in effects:
+        out.text(target)
+        out.u16(turn)
+        out.u16(next_id)
+        out.u8(len(active))
+        for effect_id, effect_type, expires_at in active:
+            out.u16(effect_id)
+            out.text(effect_type)
+            out.u16(expires_at)
+
+    path_mark, stages_mark, events_mark, steps_mark = since
+    path = engine.stage_path[path_mark:]
+    out.u8(len(path))
+    for node in path:
+        out.u8(node)
+
+    stages = engine.current_story['stages'].generated_stages()[stages_mark:]
+    out.u8(len(stages))
+    for node, stage in stages:
+        out.u8(node)
+        out.text(stage['location'])
+        out.text(stage['event'])
+        out.text(stage['consequence'])
+        out.text(stage['description'])
+
+    event_index = {entry[0]: i for i, entry in enumerate(engine.rules.global_events)}
+    events = engine.global_events[events_mark:]
+    out.u8(len(events))
+    for event in events:
+        out.u8(event_index[event.type])
+
+    steps = engine.recorder.export_steps(steps_mark) if engine.recorder is not None else b''
+    out.u32(len(steps))
+    out.data += steps
+
+
+def _decode_match(reader: _Reader, engine: GameEngine) -> Tuple[str, int, StoryGraph, Optional[dict]]:
+    """Restaura lo fijo de la partida; retorna (nombre del jugador, escenario,
+    grafo, cabecera de la repetición o None)"""
+    player_name = reader.text()
+    character = reader.text()
+    customization = json.loads(reader.text())
+    scenario_index = reader.u16()
+    realtime = bool(reader.u8())
+    decision_seed = reader.u32()
+    has_seed, seed = reader.u8(), reader.u32()
+    replay_header = reader.text()
+
+    num_layers = reader.u8()
+    node_layer, edges = [], []
+    for _ in range(reader.u8()):
+        node_layer.append(reader.u8())
+        edges.append(tuple(target - 256 if target >= 128 else target
+                           for target in (reader.u8() for _ in range(reader.u8()))))
+    graph = StoryGraph(num_layers, node_layer, edges)
+
+    roster = []
+    for _ in range(reader.u8()):
+        char, difficulty, seat, name = reader.text(), reader.text(), reader.text(), reader.text()
+        roster.append(AIPlayer(char, difficulty, rng=engine.rng, seat=seat, name=name))
+
+    engine.prepare_resume(character, customization, roster, realtime, decision_seed,
+                          seed if has_seed else None)
+    return player_name, scenario_index, graph, json.loads(replay_header) if replay_header else None
+
+
+def _decode_turn(reader: _Reader, engine: GameEngine, stages: List[Tuple], steps: bytearray):
+    """Aplica un bloque de turno; las etapas y los pasos grabados nuevos se
+    acumulan en stages y steps"""
+    engine.start_time = time.time() - reader.u32()
+    engine.turn_count = reader.u16()
+    engine.current_stage = reader.u8()
+    engine.player_progress = reader.u8()
+    engine.player_errors = reader.u16()
+    winner = reader.u8()
+    engine.ai_winner = engine.ai_players[winner] if winner != 0xFF else None
+
+    states = engine.character_states
+    count = reader.u8()
+    for field in STAT_FIELDS:
+        states.column(field)[:] = reader.raw(count)
+
+    for ai in engine.ai_players:
+        ai.progress = reader.u8()
+        ai.errors = reader.u16()
+        ai.actions = reader.u16()
+        ai.completed = bool(reader.u8())
+        ai.conservative_turns = reader.u8()
+
+    effects = []
+    for _ in range(reader.u8()):
+        target, turn, next_id = reader.text(), reader.u16(), reader.u16()
+        active = [(reader.u16(), reader.text(), reader.u16()) for _ in range(reader.u8())]
+        effects.append((target, turn, next_id, active))
+    engine.effects.restore(effects)
+
+    engine.stage_path.extend(reader.u8() for _ in range(reader.u8()))
+    for _ in range(reader.u8()):
+        stages.append((reader.u8(), reader.text(), reader.text(), reader.text(), reader.text()))
+
+    rules = engine.rules
+    for _ in range(reader.u8()):
+        event_type, _, effect, _ = rules.global_events[reader.u8()]
+        engine.global_events.append(GlobalEvent(event_type, effect, engine.event_describer))
+
+    steps += reader.raw(reader.u32())
+
+
+def encode_snapshot(engine: GameEngine, player_name: str = '') -> bytes:
+    """Instantánea completa de la partida, comprimida"""
+    out = _Writer()
+    _encode_match(out, engine, player_name)
+    _encode_turn(out, engine, (0, 0, 0, 0))
+    return zlib.compress(bytes(out.data), 9)
+
+
+def decode_snapshot(payload: bytes, engine: GameEngine,
+                    deltas: Sequence[bytes] = ()) -> Tuple[str, Optional[Tuple[dict, bytes]]]:
+    """Restaura en engine una instantánea y los deltas que la siguen.
+
+    Las etapas que falten se generarán con engine.rng al visitarlas. Retorna
+    el nombre del jugador guardado y, si la partida se estaba grabando, la
+    cabecera de la repetición con sus pasos codificados (game.replay.unpack_steps).
+    """
+    stages, steps = [], bytearray()
+    reader = _Reader(zlib.decompress(payload))
+    player_name, scenario_index, graph, replay_header = _decode_match(reader, engine)
+    _decode_turn(reader, engine, stages, steps)
+    for delta in deltas:
+        _decode_turn(_Reader(delta), engine, stages, steps)
+
+    engine.current_story = engine.story_generator.restore_story(
+        engine.selected_character, scenario_index, graph, stages, engine.rng)
+    engine.game_active = True
+    return player_name, (replay_header, bytes(steps)) if replay_header is not None else None
+
+
+# ----------------------------------------------------------------------------
+# Archivo de autoguardado
+# ----------------------------------------------------------------------------
+
+class Autosave:
+    """Autoguardado de la partida en curso: una instantánea y un delta por turno"""
+
+    def __init__(self, filename: str = AUTOSAVE_FILE, compact_after: int = AUTOSAVE_COMPACT_AFTER):
+        self.filename = filename
+        self.compact_after = compact_after
+        self._marks = None
+        self._deltas = 0
+        self._player_name = None
+        # Repetición de la partida cargada: (cabecera, pasos codificados) o None
+        self.recording = None
+
+    def exists(self) -> bool:
+        return os.path.exists(self.filename)
+
+    def begin(self, engine: GameEngine, player_name: str):
+        """Escribe la instantánea completa (reemplaza el archivo de forma atómica)"""
+        payload = encode_snapshot(engine, player_name)
+
+        folder = os.path.dirname(self.filename)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        tmp_path = f"{self.filename}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, content_fingerprint()))
+            f.write(_RECORD.pack(SNAPSHOT, len(payload), zlib.crc32(payload)))
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.filename)
+        self._marks = _marks(engine)
+        self._deltas = 0
+        self._player_name = player_name
+
+    def record_turn(self, engine: GameEngine):
+        """Agrega al archivo lo que cambió desde el último guardado"""
+        if self._marks is None or not self.exists():
+            return
+        if self._deltas >= self.compact_after:
+            self.begin(engine, self._player_name)
+            return
+        out = _Writer()
+        _encode_turn(out, engine, self._marks)
+        payload = bytes(out.data)
+        with open(self.filename, 'ab') as f:
+            f.write(_RECORD.pack(DELTA, len(payload), zlib.crc32(payload)))
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        self._marks = _marks(engine)
+        self._deltas += 1
+
+    def load(self, engine: GameEngine) -> Optional[str]:
+        """Restaura la partida guardada en engine; retorna el nombre del jugador.
+
+        La repetición guardada con la partida queda en self.recording.
+
+        Retorna None si no hay archivo o si es de otra versión o contenido. Un
+        registro final incompleto (corte durante la escritura) se ignora y la
+        partida se reanuda desde el turno anterior.
+        """
+        self.recording = None
+        try:
+            with open(self.filename, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+        if len(data) < _HEADER.size:
+            return None
+        magic, version, fingerprint = _HEADER.unpack_from(data)
+        if magic != MAGIC or version != FORMAT_VERSION or fingerprint != content_fingerprint():
+            print(f"⚠️ Autoguardado incompatible, se descarta: {self.filename}")
+            return None
+
+        records = []
+        pos = _HEADER.size
+        while pos + _RECORD.size <= len(data):
+            kind, size, crc = _RECORD.unpack_from(data, pos)
+            payload = data[pos + _RECORD.size:pos + _RECORD.size + size]
+            if len(payload) != size or zlib.crc32(payload) != crc:
+                break
+            records.append((kind, payload))
+            pos += _RECORD.size + size
+        if not records or records[0][0] != SNAPSHOT:
+            return None
+
+        player_name, self.recording = decode_snapshot(records[0][1], engine,
+                                                      [payload for _, payload in records[1:]])
+
+        self._marks = _marks(engine)
+        self._deltas = len(records) - 1
+        self._player_name = player_name
+        return player_name
+
+    def clear(self):
+        """Elimina el autoguardado (la partida terminó)"""
+        self._marks = None
+        self._deltas = 0
+        self.recording = None
+        if self.exists():
+            os.remove(self.filename)
@@ -0,0 +1,135 @@
+# ============================================================================
+# ARCHIVO: game/state_store.py
+# DESCRIPCIÓN: Almacén compacto de estados de personaje. Guarda salud,
+#              detección y recursos como columnas (una por campo) indexadas
+#              por slot, y aplica cambios acotados a todos los personajes en
+#              una sola operación para los eventos globales.
+# ============================================================================
+
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List
+
+from game.rules import STAT_FIELDS, STAT_MIN, STAT_MAX
+
+INITIAL_STATE = {'health': 100, 'detection': 0, 'resources': 50}
+
+# Las estadísticas caben en un byte (0-255), así que cada columna es un bytearray
+# y un cambio acotado sobre todas las filas es un único bytes.translate().
+_BYTE_RANGE = 256
+
+
+@lru_cache(maxsize=None)
+def _clamped_delta_table(delta: int, low: int = STAT_MIN, high: int = STAT_MAX) -> bytes:
+    """Tabla de traducción valor -> max(low, min(high, valor + delta))"""
+    return bytes(max(low, min(high, value + delta)) for value in range(_BYTE_RANGE))
+
+
+class CharacterState:
+    """Vista de un slot del almacén con acceso tipo diccionario"""
+
+    __slots__ = ('_columns', '_slot')
+
+    def __init__(self, columns: Dict, slot: int):
+        self._columns = columns
+        self._slot = slot
+
+    def __getitem__(self, field: str) -> int:
+        return self._columns[field][self._slot]
+
+    def __setitem__(self, field: str, value: int):
+        self._columns[field][self._slot] = value
+
+    def __len__(self):
+        return len(STAT_FIELDS)
+
+    def __iter__(self):
+        return iter(STAT_FIELDS)
+
+    def keys(self):
+        return STAT_FIELDS
+
+    def items(self):
+        return [(field, self[field]) for field in STAT_FIELDS]
+
+    def to_dict(self) -> Dict:
+        return {field: self[field] for field in STAT_FIELDS}
+
+    def __repr__(self):
+        return f"CharacterState({self.to_dict()})"
+
+
+class CharacterStateStore:
+    """Estados de todos los personajes de una partida en columnas por campo"""
+
+    __slots__ = ('_columns', '_slots', '_names', '_views')
+
+    def __init__(self, names: Iterable[str] = ()):
+        self._columns = {field: bytearray() for field in STAT_FIELDS}
+        self._slots = {}
+        self._names = []
+        self._views = []
+        for name in names:
+            self.add(name)
+
+    def add(self, name: str) -> int:
+        """Agrega un personaje con el estado inicial y retorna su slot"""
+        if name in self._slots:
+            return self._slots[name]
+        slot = len(self._names)
+        for field in STAT_FIELDS:
+            self._columns[field].append(INITIAL_STATE[field])
+        self._slots[name] = slot
+        self._names.append(name)
+        self._views.append(CharacterState(self._columns, slot))
+        return slot
+
+    def reset(self, names: Iterable[str] = None):
+        """Restablece el estado inicial; con names reemplaza también los personajes"""
+        if names is not None:
+            self._slots.clear()
+            self._names.clear()
+            self._views.clear()
+            for field in STAT_FIELDS:
+                self._columns[field].clear()
+            for name in names:
+                self.add(name)
+            return
+        n = len(self._names)
+        for field in STAT_FIELDS:
+            self._columns[field][:] = bytes([INITIAL_STATE[field]]) * n
+
+    def slot(self, name: str) -> int:
+        return self._slots[name]
+
+    def names(self) -> List[str]:
+        return self._names
+
+    def column(self, field: str) -> bytearray:
+        """Columna completa de un campo (lectura rápida para estadísticas)"""
+        return self._columns[field]
+
+    def apply_all(self, field: str, delta: int):
+        """Suma delta al campo de todos los personajes, acotado a STAT_MIN..STAT_MAX"""
+        self._columns[field] = self._columns[field].translate(_clamped_delta_table(delta))
+
+    # ------------------------------------------------------------------------
+    # Acceso tipo diccionario: store['usuario']['health']
+    # ------------------------------------------------------------------------
+
+    def __getitem__(self, name: str) -> CharacterState:
+        return self._views[self._slots[name]]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._slots
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._names)
+
+    def __len__(self):
+        return len(self._names)
+
+    def items(self):
+        return [(name, self._views[slot]) for slot, name in enumerate(self._names)]
+
+    def to_dict(self) -> Dict:
+        return {name: view.to_dict() for name, view in self.items()}
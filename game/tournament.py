@@ -0,0 +1,215 @@
+# ============================================================================
+# ARCHIVO: game/tournament.py
+# DESCRIPCIÓN: Torneo de IAs. Enfrenta las dificultades de AIPlayer y todos
+#              los personajes en todos los escenarios, repartiendo lotes
+#              de partidas en un ProcessPoolExecutor. Los procesos escriben sus
+#              contadores en un arreglo de memoria compartida en lugar de
+#              devolver un diccionario por partida.
+# ============================================================================
+
+import os
+import random
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, List, Tuple
+
+from config.constants import MAX_STAGES
+from game.engine import GameEngine, CHARACTER_TYPES
+from ai.ai_player import AIPlayer, PLANNING_DIFFICULTIES
+from ai.policy_table import ensure_policy
+from models.story import game_story_generator
+
+# Dificultades voraces (por defecto). Las que planifican multiplican las
+# alineaciones (5³ por protagonista y escenario) y gastan el presupuesto de
+# planificación en cada decisión: solo con planning=True
+DIFFICULTIES = ['facil', 'medio', 'dificil']
+END_REASONS = ['system_failure', 'detected', 'time_out']
+
+# Columnas de contadores por fila (una fila por lote)
+COL_MATCHES = 0
+COL_WINS = 1                                    # una columna por personaje
+COL_ENDS = COL_WINS + len(CHARACTER_TYPES)      # una columna por motivo de fin
+COL_TURNS = COL_ENDS + len(END_REASONS)
+COL_SEAT_ERRORS = COL_TURNS + 1                 # errores acumulados por personaje
+COL_ERROR_HIST = COL_SEAT_ERRORS + len(CHARACTER_TYPES)  # histograma de errores del protagonista
+N_COLUMNS = COL_ERROR_HIST + MAX_STAGES + 1
+
+COUNTER_SIZE = 8  # int64
+
+
+def build_lineups(n_scenarios: int, difficulties: List[str] = None) -> List[Tuple]:
+    """Todas las combinaciones (protagonista, dificultad por personaje, escenario)"""
+    combinations = list(itertools.product(difficulties or DIFFICULTIES, repeat=len(CHARACTER_TYPES)))
+    lineups = []
+    for protagonist in CHARACTER_TYPES:
+        for combination in combinations:
+            for scenario in range(n_scenarios):
+                lineups.append((protagonist, dict(zip(CHARACTER_TYPES, combination)), scenario))
+    return lineups
+
+
+def play_match(engine: GameEngine, character: str, difficulty: str,
+               ai_difficulties: Dict = None, scenario_index: int = None):
+    """Juega una partida completa donde el protagonista también es una IA.
+
+    El protagonista se resuelve con el perfil de reglas del jugador, así que
+    la dificultad experto usa la tabla de política de ese perfil.
+    """
+    engine.start(character, ai_difficulties=ai_difficulties, scenario_index=scenario_index)
+    pilot = AIPlayer(character, difficulty, rng=engine.rng, kind='player')
+    result = None
+    while engine.game_active:
+        stage = engine.get_current_stage()
+        horizon = None
+        if pilot.plans_ahead:
+            pilot.progress = engine.player_progress
+            horizon = engine.planning_horizon(character)
+        option = pilot.make_decision(stage['options'], engine.get_player_state(), horizon)
+        result = engine.resolve_turn(option)
+    return result
+
+
+def _run_batch(shm_name: str, row: int, lineup: Tuple, n_matches: int, seed: int):
+    """Proceso trabajador: juega un lote y suma sus contadores en su fila"""
+    protagonist, difficulties, scenario = lineup
+    engine = GameEngine(game_story_generator(), rng=random.Random(seed))
+    counters = [0] * N_COLUMNS
+
+    for _ in range(n_matches):
+        result = play_match(engine, protagonist, difficulties[protagonist], difficulties, scenario)
+        counters[COL_MATCHES] += 1
+        if result.completed:
+            counters[COL_WINS + CHARACTER_TYPES.index(protagonist)] += 1
+        elif result.winner in CHARACTER_TYPES:
+            counters[COL_WINS + CHARACTER_TYPES.index(result.winner)] += 1
+        else:
+            counters[COL_ENDS + END_REASONS.index(result.winner)] += 1
+        counters[COL_TURNS] += engine.turn_count
+        counters[COL_SEAT_ERRORS + CHARACTER_TYPES.index(protagonist)] += engine.player_errors
+        for ai in engine.ai_players:
+            counters[COL_SEAT_ERRORS + CHARACTER_TYPES.index(ai.character_type)] += ai.errors
+        counters[COL_ERROR_HIST + min(engine.player_errors, MAX_STAGES)] += 1
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        view = shm.buf.cast('q')
+        base = row * N_COLUMNS
+        for col, value in enumerate(counters):
+            view[base + col] = value
+        view.release()
+    finally:
+        shm.close()
+
+
+class TournamentRunner:
+    """Reparte el torneo en procesos y agrega los contadores compartidos"""
+
+    def __init__(self, matches_per_lineup: int = 200, batch_size: int = 100,
+                 workers: int = None, seed: int = None, planning: bool = False):
+        self.matches_per_lineup = matches_per_lineup
+        self.batch_size = batch_size
+        self.workers = workers or os.cpu_count() or 1
+        self.seed = seed
+        self.difficulties = DIFFICULTIES + list(PLANNING_DIFFICULTIES) if planning else DIFFICULTIES
+        n_scenarios = game_story_generator().scenario_count()
+        self.lineups = build_lineups(n_scenarios, self.difficulties)
+
+    def _batches(self):
+        """Divide cada alineación en lotes; cada lote escribe en su propia fila"""
+        batches = []
+        for lineup_index in range(len(self.lineups)):
+            remaining = self.matches_per_lineup
+            while remaining > 0:
+                size = min(self.batch_size, remaining)
+                batches.append((lineup_index, size))
+                remaining -= size
+        return batches
+
+    def run(self) -> List[Dict]:
+        """Ejecuta el torneo y retorna una fila de estadísticas por alineación"""
+        if 'experto' in self.difficulties:
+            # Una sola compilación antes de crear los procesos; cada uno solo la lee
+            for kind in ('ai', 'player'):
+                ensure_policy(kind)
+        batches = self._batches()
+        seeds = random.Random(self.seed)
+        shm = shared_memory.SharedMemory(create=True, size=len(batches) * N_COLUMNS * COUNTER_SIZE)
+        try:
+            view = shm.buf.cast('q')
+            for i in range(len(view)):
+                view[i] = 0
+
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                futures = [
+                    pool.submit(_run_batch, shm.name, row, self.lineups[lineup_index],
+                                size, seeds.getrandbits(64))
+                    for row, (lineup_index, size) in enumerate(batches)
+                ]
+                for future in futures:
+                    future.result()
+
+            totals = [[0] * N_COLUMNS for _ in self.lineups]
+            for row, (lineup_index, _) in enumerate(batches):
+                base = row * N_COLUMNS
+                target = totals[lineup_index]
+                for col in range(N_COLUMNS):
+                    target[col] += view[base + col]
+            view.release()
+        finally:
+            shm.close()
+            shm.unlink()
+
+        return [self._summarize(lineup, counters) for lineup, counters in zip(self.lineups, totals)]
+
+    @staticmethod
+    def _summarize(lineup: Tuple, counters: List[int]) -> Dict:
+        protagonist, difficulties, scenario = lineup
+        matches = max(1, counters[COL_MATCHES])
+        return {
+            'protagonist': protagonist,
+            'difficulties': difficulties,
+            'scenario': scenario,
+            'matches': counters[COL_MATCHES],
+            'win_rates': {char: counters[COL_WINS + i] / matches for i, char in enumerate(CHARACTER_TYPES)},
+            'end_rates': {reason: counters[COL_ENDS + i] / matches for i, reason in enumerate(END_REASONS)},
+            'mean_turns': counters[COL_TURNS] / matches,
+            'mean_errors': {char: counters[COL_SEAT_ERRORS + i] / matches for i, char in enumerate(CHARACTER_TYPES)},
+            'error_distribution': [count / matches for count in counters[COL_ERROR_HIST:]]
+        }
+
+
+def format_report(results: List[Dict]) -> str:
+    """Agrupa los resultados por protagonista y dificultad del protagonista"""
+    groups = {}
+    for r in results:
+        key = (r['protagonist'], r['difficulties'][r['protagonist']])
+        groups.setdefault(key, []).append(r)
+
+    lines = [f"{'Protagonista':<18}{'Dificultad':<11}{'Victoria':>9}{'Turnos':>8}  Errores (0..{MAX_STAGES})"]
+    for (protagonist, difficulty), rows in sorted(groups.items()):
+        matches = sum(r['matches'] for r in rows) or 1
+        win = sum(r['win_rates'][protagonist] * r['matches'] for r in rows) / matches
+        turns = sum(r['mean_turns'] * r['matches'] for r in rows) / matches
+        dist = [sum(r['error_distribution'][i] * r['matches'] for r in rows) / matches
+                for i in range(MAX_STAGES + 1)]
+        lines.append(f"{protagonist:<18}{difficulty:<11}{win * 100:>8.2f}%{turns:>8.2f}  "
+                     + " ".join(f"{d * 100:5.1f}" for d in dist))
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Torneo de IAs de Cyber Quest")
+    parser.add_argument('--matches', type=int, default=200, help="Partidas por alineación")
+    parser.add_argument('--batch', type=int, default=100, help="Partidas por lote de trabajo")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--planning', action='store_true',
+                        help="Incluye las dificultades que planifican (maestro, experto); "
+                             "multiplica las alineaciones y el tiempo por decisión")
+    args = parser.parse_args()
+
+    runner = TournamentRunner(args.matches, args.batch, args.workers, args.seed, args.planning)
+    print(format_report(runner.run()))
@@ -4,7 +4,8 @@
 #              Incluye configuración de dificultad y características únicas.
 # ============================================================================
 
-from typing import Dict, List
+from types import MappingProxyType
+from typing import Dict, Optional, Tuple
 
 class Character:
     """Clase base para personajes del juego"""
@@ -27,35 +28,45 @@ class Character:
         """Registra un error"""
         self.errors += 1
 
+# Registro inmutable de personajes, construido una sola vez al importar
+CHARACTERS = tuple(MappingProxyType(data) for data in (
+    {
+        'name': 'Usuario',
+        'type': 'usuario',
+        'icon': '👤',
+        'difficulty': 'FÁCIL',
+        'description': 'Un ciudadano común atrapado en una situación peligrosa. Debe sobrevivir y proteger su información.',
+        'color': '#00b894'
+    },
+    {
+        'name': 'Hacker Ético',
+        'type': 'hacker',
+        'icon': '💻',
+        'difficulty': 'MEDIO',
+        'description': 'Experto en seguridad informática. Usa sus habilidades para exponer vulnerabilidades y proteger sistemas.',
+        'color': '#e67e22'
+    },
+    {
+        'name': 'Cyberdelincuente',
+        'type': 'cyberdelincuente',
+        'icon': '🎭',
+        'difficulty': 'DIFÍCIL',
+        'description': 'Maestro del sigilo digital. Opera en las sombras para lograr objetivos complejos sin ser detectado.',
+        'color': '#E34232'
+    }
+))
+CHARACTERS_BY_TYPE = MappingProxyType({data['type']: data for data in CHARACTERS})
+
+
 class CharacterDatabase:
     """Base de datos de personajes disponibles"""
     
     @staticmethod
-    def get_all_characters() -> List[Dict]:
-        """Retorna información de todos los personajes"""
-        return [
-            {
-                'name': 'Usuario',
-                'type': 'usuario',
-                'icon': '👤',
-                'difficulty': 'FÁCIL',
-                'description': 'Un ciudadano común atrapado en una situación peligrosa. Debe sobrevivir y proteger su información.',
-                'color': '#00b894'
-            },
-            {
-                'name': 'Hacker Ético',
-                'type': 'hacker',
-                'icon': '💻',
-                'difficulty': 'MEDIO',
-                'description': 'Experto en seguridad informática. Usa sus habilidades para exponer vulnerabilidades y proteger sistemas.',
-                'color': '#e67e22'
-            },
-            {
-                'name': 'Cyberdelincuente',
-                'type': 'cyberdelincuente',
-                'icon': '🎭',
-                'difficulty': 'DIFÍCIL',
-                'description': 'Maestro del sigilo digital. Opera en las sombras para lograr objetivos complejos sin ser detectado.',
-                'color': '#E34232'
-            }
-        ]
+    def get_all_characters() -> Tuple[Dict, ...]:
+        """Retorna información (de solo lectura) de todos los personajes"""
+        return CHARACTERS
+    
+    @staticmethod
+    def get_character(char_type: str) -> Optional[Dict]:
+        """Retorna la información de un personaje por tipo"""
+        return CHARACTERS_BY_TYPE.get(char_type)
@@ -5,186 +5,304 @@
 # ============================================================================
 
 import random
-from typing import Dict, List
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Iterator, List, Mapping, Sequence, Tuple
+
+from config.constants import (MIN_STAGES, MAX_STAGES, PROCEDURAL_STORIES, STORY_BRANCH_WIDTH,
+                              STORY_SKIP_CHANCE)
+from utils.alias_sampler import AliasTable, weighted_entries
+from utils.content_pack import ContentPack, default_pack
+from models.story_synth import ScenarioSynthesizer
+from models.story_graph import StoryGraph
+
+PHASES = ('early', 'mid', 'late')
+
+
+@lru_cache(maxsize=None)
+def stage_phases(total_stages: int) -> Tuple[str, ...]:
+    """Fase de cada etapa para una historia de total_stages etapas"""
+    phases = []
+    for stage in range(total_stages):
+        if stage < total_stages * 0.33:
+            phases.append('early')
+        elif stage < total_stages * 0.66:
+            phases.append('mid')
+        else:
+            phases.append('late')
+    return tuple(phases)
+
+
+# Las longitudes de historia posibles se precalculan al importar
+for _total in range(MIN_STAGES, MAX_STAGES + 1):
+    stage_phases(_total)
+
+
+class OptionCatalog:
+    """Opciones inmutables indexadas por (personaje, fase), con id estable por opción.
+
+    options_db es un mapeo personaje -> fase -> opciones; cada personaje se
+    compila la primera vez que se piden sus opciones.
+    """
+
+    def __init__(self, options_db: Mapping):
+        self._source = options_db
+        self._options = {}
+        self._by_id = {}
+
+    def _compile(self, character: str):
+        for phase, options in self._source[character].items():
+            frozen = tuple(
+                MappingProxyType(dict(option, id=f"{character}.{phase}.{j}"))
+                for j, option in enumerate(options)
+            )
+            self._options[(character, phase)] = frozen
+            for option in frozen:
+                self._by_id[option['id']] = option
+
+    def for_phase(self, character: str, phase: str) -> Tuple:
+        try:
+            return self._options[(character, phase)]
+        except KeyError:
+            self._compile(character)
+            return self._options[(character, phase)]
+
+    def for_stage(self, character: str, stage: int, total_stages: int) -> Tuple:
+        return self.for_phase(character, stage_phases(total_stages)[stage])
+
+    def get(self, option_id: str):
+        """Opción por id (None si no existe)"""
+        character = option_id.split('.', 1)[0]
+        if option_id not in self._by_id and character in self._source:
+            self._compile(character)
+        return self._by_id.get(option_id)
+
+
+@lru_cache(maxsize=None)
+def default_option_catalog() -> OptionCatalog:
+    """Catálogo de opciones del paquete de contenido base"""
+    return OptionCatalog(default_pack().items_of('options'))
+
+
+def load_options_db(content: ContentPack = None) -> Dict:
+    """Tabla completa personaje -> fase -> opciones (para herramientas de balance)"""
+    options = (content or default_pack()).items_of('options')
+    return {character: options[character] for character in options}
+
+
+# Plantillas de descripción de etapa; se formatea solo la elegida
+DESCRIPTION_TEMPLATES = (
+    "Te encuentras en {location}. {event}. La tensión aumenta mientras {context}.",
+    "Llegas a {location}. De repente, {event_lower}. Debes actuar rápido.",
+    "En {location}, observas que {event_lower}. Cada decisión cuenta ahora.",
+    "El sistema te lleva a {location}. {event}. El tiempo corre en tu contra.",
+    "Navegando hacia {location}, descubres que {event_lower}. ¿Qué harás?"
+)
+
+
+class StageSequence:
+    """Etapas de una historia indexadas por nodo, creadas al entrar en ellas.
+
+    Admite len() e índices; cada etapa se construye la primera vez que se lee
+    con make_stage(nodo), de modo que las ramas no visitadas nunca se generan.
+    """
+
+    def __init__(self, length: int, make_stage):
+        self._length = length
+        self._make_stage = make_stage
+        self._stages = {}
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, index: int) -> Dict:
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("etapa fuera de rango")
+        stage = self._stages.get(index)
+        if stage is None:
+            stage = self._stages[index] = self._make_stage(index)
+        return stage
+
+    def __iter__(self):
+        for i in range(self._length):
+            yield self[i]
+
+    def generated(self) -> int:
+        """Número de etapas generadas hasta ahora"""
+        return len(self._stages)
+
+    def generated_stages(self) -> List[Tuple[int, Dict]]:
+        """(nodo, etapa) de las etapas ya generadas, en orden de generación"""
+        return list(self._stages.items())
+
+    def preload(self, index: int, stage: Dict):
+        """Registra una etapa ya generada (al restaurar una partida guardada)"""
+        self._stages[index] = stage
+
 
 class StoryGenerator:
     """Generador de historias dinámicas para cada partida"""
     
-    def __init__(self):
-        self.story_templates = self._load_story_templates()
+    def __init__(self, options_db: Dict = None, content: ContentPack = None, procedural: bool = False,
+                 branch_width: int = 1, skip_chance: float = 0.0):
+        self.content = content or default_pack()
+        # Forma del grafo de etapas: nodos por capa y probabilidad de ramas que saltan una capa
+        self.branch_width = branch_width
+        self.skip_chance = skip_chance
+        # Con procedural=True las etapas siguen cadenas de Markov en vez de sorteos independientes
+        self.synth = ScenarioSynthesizer(self.content) if procedural else None
+        if options_db is not None:
+            self.options = OptionCatalog(options_db)
+        elif content is None:
+            self.options = default_option_catalog()
+        else:
+            self.options = OptionCatalog(self.content.items_of('options'))
         self.current_story = None
-        
-    def _load_story_templates(self) -> Dict:
-        """Carga plantillas base para generar historias"""
-        return {
-            'scenarios': [
-                {
-                    'name': 'La Amenaza Corporativa',
-                    'context': 'Una megacorporación está implementando un sistema de vigilancia masiva',
-                    'locations': ['Data Center', 'Oficinas Ejecutivas', 'Laboratorio de Seguridad', 'Red Corporativa'],
-                    'objectives': {
-                        'usuario': 'Proteger tus datos personales y escapar del sistema',
-                        'hacker': 'Exponer las vulnerabilidades y alertar al público',
-                        'cyberdelincuente': 'Robar información valiosa sin ser detectado'
-                    }
-                },
-                {
-                    'name': 'El Virus Desconocido',
-                    'context': 'Un malware de origen desconocido está infectando sistemas críticos',
-                    'locations': ['Hospital Central', 'Base de Datos Nacional', 'Servidor de Energía', 'Centro de Control'],
-                    'objectives': {
-                        'usuario': 'Recuperar tus archivos y proteger tu información',
-                        'hacker': 'Neutralizar el virus y restaurar los sistemas',
-                        'cyberdelincuente': 'Aprovechar el caos para infiltrarte en sistemas protegidos'
-                    }
-                },
-                {
-                    'name': 'La Red Oscura',
-                    'context': 'Una organización criminal controla una vasta red de información robada',
-                    'locations': ['Mercado Negro', 'Servidor Proxy', 'Nodo de Distribución', 'Base de Operaciones'],
-                    'objectives': {
-                        'usuario': 'Encontrar y eliminar tu información del mercado negro',
-                        'hacker': 'Desmantelar la red y reportar a las autoridades',
-                        'cyberdelincuente': 'Tomar control de la red para tu beneficio'
-                    }
-                },
-                {
-                    'name': 'Ataque a la Infraestructura',
-                    'context': 'Sistemas críticos de la ciudad están siendo comprometidos',
-                    'locations': ['Central Eléctrica', 'Sistema de Tráfico', 'Red de Comunicaciones', 'Bunker de Seguridad'],
-                    'objectives': {
-                        'usuario': 'Mantener tus servicios funcionando y pedir ayuda',
-                        'hacker': 'Defender la infraestructura y detener el ataque',
-                        'cyberdelincuente': 'Extorsionar a la ciudad con el control de los sistemas'
-                    }
-                }
-            ],
-            'events': [
-                'Un firewall inesperado bloquea tu progreso',
-                'Detectas una presencia enemiga en la red',
-                'Encuentras una vulnerabilidad crítica',
-                'El sistema activa protocolos de emergencia',
-                'Recibes una comunicación anónima',
-                'Descubres un archivo encriptado',
-                'Se activa un rastreador de intrusos',
-                'Encuentras un backdoor oculto'
-            ],
-            'consequences': [
-                'Tu actividad ha sido registrada',
-                'Has ganado tiempo valioso',
-                'Alertaste al sistema de seguridad',
-                'Obtuviste información crítica',
-                'Perdiste el rastro del objetivo',
-                'Creaste una distracción efectiva'
-            ]
-        }
+        self._build_samplers()
+    
+    def _build_samplers(self):
+        """Tablas de alias del contenido; las de cada escenario se crean al usarlo"""
+        scenarios = self.content.section('scenarios')
+        self._scenario_table = AliasTable(range(len(scenarios)), [sc['weight'] for sc in scenarios])
+        self._global_events = None
+        self._stage_tables = {}
+    
+    def scenario_count(self) -> int:
+        return len(self._scenario_table)
     
-    def generate_new_story(self, character_type: str) -> Dict:
-        """Genera una historia única para cada partida"""
-        scenario = random.choice(self.story_templates['scenarios'])
+    def get_scenario(self, scenario_index: int) -> Dict:
+        """Escenario completo (se carga del paquete al pedirlo)"""
+        return self.content.section(f'scenario/{scenario_index}')
+    
+    def _scenario_tables(self, scenario_index: int) -> Tuple[AliasTable, AliasTable]:
+        """(lugares, eventos) del escenario; los eventos propios se suman a los globales"""
+        tables = self._stage_tables.get(scenario_index)
+        if tables is None:
+            scenario = self.get_scenario(scenario_index)
+            locations = AliasTable(*weighted_entries(scenario['locations']))
+            events, weights = weighted_entries(scenario.get('events', ()))
+            if self._global_events is None:
+                self._global_events = weighted_entries(self.content.section('events'))
+            global_events, global_weights = self._global_events
+            tables = self._stage_tables[scenario_index] = (
+                locations, AliasTable(global_events + events, global_weights + weights)
+            )
+        return tables
         
-        # Generar secuencia de eventos
-        num_stages = random.randint(4, 6)
-        story_stages = []
+    def generate_new_story(self, character_type: str, scenario_index: int = None, rng=None) -> Dict:
+        """Genera una historia única para cada partida.
+
+        Las etapas se producen bajo demanda (StageSequence) a medida que el motor
+        las pide; rng permite fijar la fuente de azar (por defecto, random).
+        """
+        rng = rng or random
+        if scenario_index is None:
+            scenario_index = self._scenario_table.sample(rng)
+        scenario = self.get_scenario(scenario_index)
         
-        for i in range(num_stages):
-            location = random.choice(scenario['locations'])
-            event = random.choice(self.story_templates['events'])
-            
-            # Generar opciones basadas en el personaje
-            options = self._generate_options(character_type, i, num_stages)
-            
-            story_stages.append({
-                'stage': i + 1,
-                'location': location,
-                'event': event,
-                'description': self._generate_description(scenario, location, event, i),
-                'options': options
-            })
+        graph = self.build_graph(character_type, rng)
+        stages = StageSequence(len(graph), self._stage_factory(character_type, scenario_index, graph, rng))
         
         self.current_story = {
             'scenario': scenario,
-            'stages': story_stages,
+            'scenario_index': scenario_index,
+            'graph': graph,
+            'stages': stages,
             'character': character_type,
             'objective': scenario['objectives'][character_type]
         }
         
         return self.current_story
     
-    def _generate_description(self, scenario, location, event, stage_num):
-        """Genera descripción narrativa para cada etapa"""
-        descriptions = [
-            f"Te encuentras en {location}. {event}. La tensión aumenta mientras {scenario['context'].lower()}.",
-            f"Llegas a {location}. De repente, {event.lower()}. Debes actuar rápido.",
-            f"En {location}, observas que {event.lower()}. Cada decisión cuenta ahora.",
-            f"El sistema te lleva a {location}. {event}. El tiempo corre en tu contra.",
-            f"Navegando hacia {location}, descubres que {event.lower()}. ¿Qué harás?"
-        ]
-        return random.choice(descriptions)
+    def build_graph(self, character_type: str, rng=None) -> StoryGraph:
+        """Sortea la longitud de la historia y su grafo de etapas"""
+        rng = rng or random
+        num_stages = rng.randint(MIN_STAGES, MAX_STAGES)
+        return StoryGraph.build(
+            num_stages, [len(self.options.for_phase(character_type, phase))
+                         for phase in stage_phases(num_stages)],
+            rng, max_width=self.branch_width, skip_chance=self.skip_chance
+        )
     
-    def _generate_options(self, character_type: str, stage: int, total_stages: int) -> List[Dict]:
-        """Genera opciones contextuales según el personaje y la etapa"""
-        options_db = {
-            'usuario': {
-                'early': [
-                    {'text': 'Buscar ayuda de seguridad', 'risk': 'bajo', 'time': 1, 'success': 75},
-                    {'text': 'Intentar resolver solo', 'risk': 'medio', 'time': 2, 'success': 50},
-                    {'text': 'Desconectarte temporalmente', 'risk': 'bajo', 'time': 1, 'success': 60}
-                ],
-                'mid': [
-                    {'text': 'Seguir las instrucciones de seguridad', 'risk': 'bajo', 'time': 1, 'success': 70},
-                    {'text': 'Explorar opciones alternativas', 'risk': 'medio', 'time': 2, 'success': 55},
-                    {'text': 'Contactar con autoridades', 'risk': 'bajo', 'time': 2, 'success': 65}
-                ],
-                'late': [
-                    {'text': 'Aplicar medidas de protección', 'risk': 'bajo', 'time': 1, 'success': 80},
-                    {'text': 'Evacuar el sistema', 'risk': 'medio', 'time': 1, 'success': 70},
-                    {'text': 'Confiar en los expertos', 'risk': 'bajo', 'time': 2, 'success': 75}
-                ]
-            },
-            'hacker': {
-                'early': [
-                    {'text': 'Escanear vulnerabilidades', 'risk': 'medio', 'time': 2, 'success': 70},
-                    {'text': 'Implementar contramedidas', 'risk': 'medio', 'time': 2, 'success': 65},
-                    {'text': 'Analizar el código fuente', 'risk': 'alto', 'time': 3, 'success': 80}
-                ],
-                'mid': [
-                    {'text': 'Desplegar herramientas de pentesting', 'risk': 'medio', 'time': 2, 'success': 70},
-                    {'text': 'Explotar vulnerabilidad encontrada', 'risk': 'alto', 'time': 2, 'success': 75},
-                    {'text': 'Crear un bypass de seguridad', 'risk': 'medio', 'time': 3, 'success': 65}
-                ],
-                'late': [
-                    {'text': 'Ejecutar exploit definitivo', 'risk': 'alto', 'time': 2, 'success': 80},
-                    {'text': 'Reportar hallazgos', 'risk': 'bajo', 'time': 1, 'success': 70},
-                    {'text': 'Neutralizar la amenaza', 'risk': 'medio', 'time': 2, 'success': 75}
-                ]
-            },
-            'cyberdelincuente': {
-                'early': [
-                    {'text': 'Infiltrarse sigilosamente', 'risk': 'alto', 'time': 3, 'success': 60},
-                    {'text': 'Usar técnicas de evasión avanzadas', 'risk': 'alto', 'time': 3, 'success': 65},
-                    {'text': 'Crear distracción en otro sector', 'risk': 'medio', 'time': 2, 'success': 55}
-                ],
-                'mid': [
-                    {'text': 'Instalar backdoor persistente', 'risk': 'alto', 'time': 3, 'success': 60},
-                    {'text': 'Exfiltrar datos valiosos', 'risk': 'alto', 'time': 3, 'success': 65},
-                    {'text': 'Borrar rastros de tu presencia', 'risk': 'alto', 'time': 2, 'success': 50}
-                ],
-                'late': [
-                    {'text': 'Ejecutar el golpe final', 'risk': 'alto', 'time': 3, 'success': 70},
-                    {'text': 'Establecer ruta de escape', 'risk': 'alto', 'time': 2, 'success': 60},
-                    {'text': 'Maximizar ganancias antes de salir', 'risk': 'alto', 'time': 3, 'success': 65}
-                ]
-            }
-        }
-        
-        # Determinar fase del juego
-        if stage < total_stages * 0.33:
-            phase = 'early'
-        elif stage < total_stages * 0.66:
-            phase = 'mid'
-        else:
-            phase = 'late'
+    def restore_story(self, character_type: str, scenario_index: int, graph: StoryGraph,
+                      stages: Sequence[Tuple], rng=None) -> Dict:
+        """Reconstruye una historia guardada.
+
+        stages son (nodo, lugar, evento, consecuencia, descripción) de las etapas
+        ya generadas; las que falten se generarán con rng al visitarlas.
+        """
+        rng = rng or random
+        scenario = self.get_scenario(scenario_index)
+        # El recorrido procedural sigue desde la última etapa generada
+        after = (stages[-1][1], stages[-1][2]) if stages else None
+        sequence = StageSequence(len(graph), self._stage_factory(character_type, scenario_index, graph, rng, after))
+        phases = stage_phases(graph.num_layers)
+        for node, location, event, consequence, description in stages:
+            sequence.preload(node, self._stage_dict(character_type, graph, phases, node, location,
+                                                    event, consequence, description))
         
-        return options_db[character_type][phase]
+        self.current_story = {
+            'scenario': scenario,
+            'scenario_index': scenario_index,
+            'graph': graph,
+            'stages': sequence,
+            'character': character_type,
+            'objective': scenario['objectives'][character_type]
+        }
+        return self.current_story
+    
+    def _stage_factory(self, character_type: str, scenario_index: int, graph: StoryGraph, rng,
+                       after: Tuple[str, str] = None):
+        """Constructor de etapas por nodo; los sorteos siguen el orden de visita"""
+        scenario = self.get_scenario(scenario_index)
+        phases = stage_phases(graph.num_layers)
+        draws = self._stage_draws(scenario_index, rng, after)
+
+        def make_stage(node: int) -> Dict:
+            location, event, consequence = next(draws)
+            layer = graph.layer(node)
+            description = self._generate_description(scenario, location, event, layer, rng)
+            return self._stage_dict(character_type, graph, phases, node, location, event,
+                                    consequence, description)
+        return make_stage
+    
+    def _stage_dict(self, character_type: str, graph: StoryGraph, phases: Tuple, node: int,
+                    location: str, event: str, consequence, description: str) -> Dict:
+        layer = graph.layer(node)
+        return {
+            'stage': layer + 1,
+            'node': node,
+            'location': location,
+            'event': event,
+            'consequence': consequence,
+            'description': description,
+            'phase': phases[layer],
+            'options': self.options.for_phase(character_type, phases[layer])
+        }
+    
+    def _stage_draws(self, scenario_index: int, rng, after: Tuple[str, str] = None):
+        """(lugar, evento, consecuencia) de cada etapa visitada, procedural o independiente"""
+        if self.synth is not None:
+            yield from self.synth.walk(scenario_index, rng, after)
+            return
+        locations, events = self._scenario_tables(scenario_index)
+        while True:
+            yield locations.sample(rng), events.sample(rng), None
+    
+    def _generate_description(self, scenario, location, event, stage_num, rng=None):
+        """Genera descripción narrativa para cada etapa (solo se formatea la plantilla elegida)"""
+        template = (rng or random).choice(DESCRIPTION_TEMPLATES)
+        return template.format(location=location, event=event, event_lower=event.lower(),
+                               context=scenario['context'].lower())
+    
+    def _generate_options(self, character_type: str, stage: int, total_stages: int) -> Tuple:
+        """Opciones contextuales según el personaje y la etapa (catálogo precompilado)"""
+        return self.options.for_stage(character_type, stage, total_stages)
+
 
+def game_story_generator(options_db: Dict = None) -> StoryGenerator:
+    """StoryGenerator con la forma de historia del juego (config.constants)"""
+    return StoryGenerator(options_db, procedural=PROCEDURAL_STORIES,
+                          branch_width=STORY_BRANCH_WIDTH, skip_chance=STORY_SKIP_CHANCE)
@@ -0,0 +1,136 @@
+# ============================================================================
+# ARCHIVO: models/story_graph.py
+# DESCRIPCIÓN: Historia ramificada como grafo dirigido acíclico. Cada opción de
+#              una etapa lleva a una etapa siguiente (o al final). Al crear el
+#              grafo se precalculan alcanzabilidad, etapas restantes mínimas y
+#              máximas y desenlaces terminales de cada nodo.
+# ============================================================================
+
+import random
+from typing import FrozenSet, List, Sequence, Tuple
+
+# Destinos terminales (negativos) y el desenlace que producen
+TERMINAL = -1
+TERMINAL_OUTCOMES = {TERMINAL: 'time_out'}
+
+
+class StoryGraph:
+    """DAG de etapas con consultas O(1) sobre cada nodo.
+
+    Los nodos se numeran por capa (la raíz es 0) y las aristas siempre van a
+    capas posteriores, así que un recorrido en orden inverso basta para
+    calcular todo sin recursión.
+    """
+
+    __slots__ = ('num_layers', 'node_layer', 'edges', 'min_remaining',
+                 'max_remaining', 'reach', 'outcomes')
+
+    def __init__(self, num_layers: int, node_layer: Sequence[int], edges: Sequence[Tuple[int, ...]]):
+        self.num_layers = num_layers
+        self.node_layer = tuple(node_layer)
+        self.edges = tuple(tuple(targets) for targets in edges)
+        self._precompute()
+
+    def _precompute(self):
+        n = len(self.edges)
+        min_remaining = [0] * n
+        max_remaining = [0] * n
+        reach = [0] * n
+        outcomes = [frozenset()] * n
+
+        for node in range(n - 1, -1, -1):
+            low, high, mask, ends = None, 0, 1 << node, set()
+            for target in self.edges[node]:
+                if target < 0:
+                    t_low, t_high = 0, 0
+                    ends.add(TERMINAL_OUTCOMES[target])
+                else:
+                    t_low, t_high = min_remaining[target], max_remaining[target]
+                    mask |= reach[target]
+                    ends |= outcomes[target]
+                low = t_low if low is None else min(low, t_low)
+                high = max(high, t_high)
+            min_remaining[node] = 1 + (low or 0)
+            max_remaining[node] = 1 + high
+            reach[node] = mask
+            outcomes[node] = frozenset(ends)
+
+        self.min_remaining = tuple(min_remaining)
+        self.max_remaining = tuple(max_remaining)
+        self.reach = tuple(reach)
+        self.outcomes = tuple(outcomes)
+
+    @classmethod
+    def build(cls, num_layers: int, options_per_layer: Sequence[int], rng=None,
+              max_width: int = 2, skip_chance: float = 0.0) -> 'StoryGraph':
+        """Crea un DAG por capas: 1 nodo raíz y hasta max_width nodos por capa.
+
+        options_per_layer indica cuántas opciones (aristas) tiene cada nodo de
+        cada capa. Cada nodo de la capa siguiente recibe al menos una arista; con
+        skip_chance una opción salta una capa (rama más corta).
+        """
+        rng = rng or random
+        layers, node_layer = [], []
+        for layer in range(num_layers):
+            width = 1 if layer == 0 or max_width <= 1 else rng.randint(1, max_width)
+            first = len(node_layer)
+            layers.append(list(range(first, first + width)))
+            node_layer.extend([layer] * width)
+
+        edges = []
+        for layer, nodes in enumerate(layers):
+            if layer == num_layers - 1:
+                edges.extend((TERMINAL,) * options_per_layer[layer] for _ in nodes)
+                continue
+            following = layers[layer + 1]
+            skip_targets = layers[layer + 2] if layer + 2 < num_layers else [TERMINAL]
+            counter = 0
+            for _ in nodes:
+                targets = []
+                for _ in range(options_per_layer[layer]):
+                    # Primero se cubren todos los nodos de la capa siguiente
+                    if counter >= len(following) and rng.random() < skip_chance:
+                        targets.append(rng.choice(skip_targets))
+                    else:
+                        targets.append(following[counter % len(following)])
+                    counter += 1
+                edges.append(tuple(targets))
+
+        return cls(num_layers, node_layer, edges)
+
+    # ------------------------------------------------------------------------
+    # Consultas O(1)
+    # ------------------------------------------------------------------------
+
+    def __len__(self):
+        return len(self.edges)
+
+    def next(self, node: int, option_index: int) -> int:
+        """Nodo al que lleva la opción (negativo si termina la historia)"""
+        return self.edges[node][option_index]
+
+    def remaining(self, node: int) -> Tuple[int, int]:
+        """Etapas que quedan (incluida esta) por el camino más corto y el más largo"""
+        if node < 0:
+            return 0, 0
+        return self.min_remaining[node], self.max_remaining[node]
+
+    def can_reach(self, node: int, target: int) -> bool:
+        return bool(self.reach[node] >> target & 1)
+
+    def terminal_outcomes(self, node: int) -> FrozenSet[str]:
+        return self.outcomes[node]
+
+    def layer(self, node: int) -> int:
+        return self.node_layer[node]
+
+    @staticmethod
+    def is_terminal(node: int) -> bool:
+        return node < 0
+
+    @staticmethod
+    def terminal_outcome(node: int) -> str:
+        return TERMINAL_OUTCOMES[node]
+
+    def nodes_in_layer(self, layer: int) -> List[int]:
+        return [node for node, node_layer in enumerate(self.node_layer) if node_layer == layer]
@@ -0,0 +1,167 @@
+# ============================================================================
+# ARCHIVO: models/story_synth.py
+# DESCRIPCIÓN: Síntesis procedural de etapas con cadenas de Markov. Aprende
+#              transiciones entre lugares, eventos y consecuencias a partir del
+#              paquete de contenido y las guarda como arreglos acumulados, así
+#              cada paso de la cadena es una búsqueda binaria. Los pesos de
+#              lugares y eventos del paquete escalan las transiciones.
+# ============================================================================
+
+import random
+from bisect import bisect_right
+from itertools import accumulate
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+from utils.alias_sampler import weighted_entries
+from utils.content_pack import ContentPack, default_pack
+
+# Peso de las transiciones observadas frente al suavizado entre estados vecinos
+OBSERVED_WEIGHT = 4
+SMOOTHING_WEIGHT = 1
+
+
+class MarkovChain:
+    """Cadena de Markov con tablas de transición acumuladas por estado"""
+
+    __slots__ = ('states', '_start', '_transitions')
+
+    def __init__(self, states: Sequence[str], counts: Dict[str, Dict[str, float]],
+                 start_counts: Dict[str, float] = None):
+        self.states = tuple(states)
+        self._transitions = {state: self._cumulative(counts.get(state, {})) for state in self.states}
+        self._start = self._cumulative(start_counts or {state: 1 for state in self.states})
+
+    @staticmethod
+    def _cumulative(weights: Dict[str, float]) -> Tuple[Tuple[str, ...], List[float]]:
+        targets = tuple(state for state, weight in weights.items() if weight > 0)
+        return targets, list(accumulate(weights[state] for state in targets))
+
+    @staticmethod
+    def _draw(table, rng) -> str:
+        targets, cumulative = table
+        return targets[bisect_right(cumulative, rng.random() * cumulative[-1])]
+
+    def start(self, rng) -> str:
+        return self._draw(self._start, rng)
+
+    def step(self, state: str, rng) -> str:
+        table = self._transitions[state]
+        if not table[0]:
+            return self.start(rng)
+        return self._draw(table, rng)
+
+
+def _scaled(counts: Dict[str, float], weight: Dict[str, float]) -> Dict[str, float]:
+    """Multiplica cada cuenta por el peso de contenido de su estado"""
+    return {state: count * weight.get(state, 1) for state, count in counts.items()}
+
+
+def _weighted(counts: Dict[str, Dict[str, float]], weight: Dict[str, float]) -> Dict[str, Dict[str, float]]:
+    """Aplica _scaled a cada fila de transiciones (el peso es el del destino)"""
+    return {state: _scaled(row, weight) for state, row in counts.items()}
+
+
+def _smoothed(states: Sequence[str], allow_self: bool = False) -> Dict[str, Dict[str, float]]:
+    """Transiciones base: cualquier estado hacia los demás con el peso de suavizado"""
+    return {a: {b: SMOOTHING_WEIGHT for b in states if allow_self or a != b} for a in states}
+
+
+class ScenarioSynthesizer:
+    """Genera secuencias (lugar, evento, consecuencia) coherentes por escenario.
+
+    - Lugares: se aprende el orden en que el escenario lista sus lugares y
+      solo se transita entre lugares del mismo escenario.
+    - Eventos y consecuencias: se aprenden de la sección 'sequences' del
+      paquete (evento -> siguiente evento, evento -> consecuencia), con
+      suavizado para que toda combinación sea posible pero poco frecuente.
+      Cada escenario usa su propio grupo de eventos (globales más los suyos).
+
+    Toda transición hacia un lugar o evento se multiplica por su 'weight' del
+    paquete, así los pesos del contenido se respetan también en modo procedural.
+    """
+
+    def __init__(self, content: ContentPack = None):
+        self.content = content or default_pack()
+        self._chains = {}
+        self._global_events = weighted_entries(self.content.section('events'))
+        self._consequences = weighted_entries(self.content.get('consequences', []))
+
+    def _scenario_chains(self, scenario_index: int) -> Tuple[MarkovChain, MarkovChain, MarkovChain]:
+        """(lugares, eventos, consecuencias) del escenario, creadas al usarlo"""
+        chains = self._chains.get(scenario_index)
+        if chains is None:
+            scenario = self.content.section(f'scenario/{scenario_index}')
+            events, weights = weighted_entries(scenario.get('events', ()))
+            global_events, global_weights = self._global_events
+            chains = self._chains[scenario_index] = (
+                self._location_chain(scenario),
+                *self._event_chains(global_events + events, global_weights + weights)
+            )
+        return chains
+
+    @staticmethod
+    def _location_chain(scenario: Dict) -> MarkovChain:
+        locations, weights = weighted_entries(scenario['locations'])
+        counts = _smoothed(locations)
+        for a, b in zip(locations, locations[1:]):
+            counts[a][b] += OBSERVED_WEIGHT
+        start = {loc: SMOOTHING_WEIGHT for loc in locations}
+        start[locations[0]] += OBSERVED_WEIGHT
+        weight = dict(zip(locations, weights))
+        return MarkovChain(locations, _weighted(counts, weight), _scaled(start, weight))
+
+    def _event_chains(self, events: List[str], weights: List[float]) -> Tuple[MarkovChain, MarkovChain]:
+        consequences, consequence_weights = self._consequences
+
+        event_counts = _smoothed(events)
+        start_counts = {event: SMOOTHING_WEIGHT for event in events}
+        consequence_counts = {event: {c: SMOOTHING_WEIGHT for c in consequences} for event in events}
+
+        for sequence in self.content.get('sequences', []):
+            previous = None
+            for step in sequence:
+                event = step['event']
+                if event not in event_counts:
+                    continue
+                if previous is None:
+                    start_counts[event] += OBSERVED_WEIGHT
+                else:
+                    event_counts[previous][event] = event_counts[previous].get(event, 0) + OBSERVED_WEIGHT
+                consequence = step.get('consequence')
+                if consequence in consequence_counts[event]:
+                    consequence_counts[event][consequence] += OBSERVED_WEIGHT
+                previous = event
+
+        weight = dict(zip(events, weights))
+        event_chain = MarkovChain(events, _weighted(event_counts, weight), _scaled(start_counts, weight))
+        # Las consecuencias dependen solo del evento: una tabla por evento
+        consequence_chain = None
+        if consequences:
+            consequence_chain = MarkovChain(
+                events, _weighted(consequence_counts, dict(zip(consequences, consequence_weights))))
+        return event_chain, consequence_chain
+
+    def walk(self, scenario_index: int, rng=None, after: Tuple[str, str] = None) -> Iterator[Tuple[str, str, str]]:
+        """Recorrido infinito de etapas (lugar, evento, consecuencia) del escenario.
+
+        after=(lugar, evento) continúa un recorrido ya empezado desde esa etapa,
+        con las mismas tiradas que habría hecho el recorrido original.
+        """
+        rng = rng or random
+        locations, events, consequences = self._scenario_chains(scenario_index)
+        if after is None:
+            location = locations.start(rng)
+            event = events.start(rng)
+        else:
+            location = locations.step(after[0], rng)
+            event = events.step(after[1], rng)
+        while True:
+            consequence = consequences.step(event, rng) if consequences is not None else None
+            yield location, event, consequence
+            location = locations.step(location, rng)
+            event = events.step(event, rng)
+
+    def generate(self, scenario_index: int, n_stages: int, rng=None) -> List[Tuple[str, str, str]]:
+        """Secuencia completa de n_stages etapas"""
+        stream = self.walk(scenario_index, rng)
+        return [next(stream) for _ in range(n_stages)]
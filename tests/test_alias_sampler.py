@@ -0,0 +1,62 @@
+import random
+
+import pytest
+
+from utils.alias_sampler import AliasTable, weighted_entries
+
+
+def table_distribution(table):
+    """Probabilidad exacta de cada índice según las columnas de la tabla"""
+    n = len(table)
+    mass = [0.0] * n
+    for column in range(n):
+        mass[column] += table._prob[column] / n
+        mass[table._alias[column]] += (1.0 - table._prob[column]) / n
+    return mass
+
+
+@pytest.mark.parametrize('weights', [
+    [1, 1, 1, 1],
+    [5, 1, 0, 3, 1],
+    [0.5, 20, 1e-3, 7, 7, 2],
+    [1] + [0] * 9,
+])
+def test_table_encodes_the_weights_exactly(weights):
+    table = AliasTable(range(len(weights)), weights)
+    total = sum(weights)
+    assert table_distribution(table) == pytest.approx([w / total for w in weights], abs=1e-12)
+
+
+def test_samples_follow_the_weights():
+    weights = [6, 3, 0, 1]
+    table = AliasTable('abcd', weights)
+    rng = random.Random(42)
+    draws = 40000
+    counts = dict.fromkeys('abcd', 0)
+    for _ in range(draws):
+        counts[table.sample(rng)] += 1
+    assert counts['c'] == 0
+    for item, weight in zip('abcd', weights):
+        assert counts[item] / draws == pytest.approx(weight / 10, abs=0.01)
+
+
+def test_same_seed_same_draws():
+    table = AliasTable(['x', 'y', 'z'], [1, 2, 3])
+    first, second = random.Random(7), random.Random(7)
+    assert [table.sample(first) for _ in range(50)] == [table.sample(second) for _ in range(50)]
+
+
+@pytest.mark.parametrize('items, weights', [
+    ([], None),
+    (['a', 'b'], [1]),
+    (['a', 'b'], [1, -1]),
+    (['a', 'b'], [0, 0]),
+])
+def test_invalid_tables(items, weights):
+    with pytest.raises(ValueError):
+        AliasTable(items, weights)
+
+
+def test_weighted_entries():
+    entries = ['plano', {'text': 'raro', 'weight': 0.25}, {'text': 'normal'}]
+    assert weighted_entries(entries) == (['plano', 'raro', 'normal'], [1, 0.25, 1])
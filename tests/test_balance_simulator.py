@@ -0,0 +1,38 @@
+import random
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from game.balance_simulator import GRAPH_SEED, BalanceSimulator
+from models.story import StoryGenerator, game_story_generator
+
+
+def test_graph_pool_matches_the_story_generator():
+    generator = game_story_generator()
+    simulator = BalanceSimulator(generator, seed=1, graph_pool=32)
+    pool = simulator._graph_pool('hacker')
+    rng = random.Random(GRAPH_SEED)
+    for g in range(32):
+        graph = generator.build_graph('hacker', rng)
+        assert pool['layers'][g] == graph.num_layers
+        assert tuple(pool['node_layer'][g, :len(graph)]) == graph.node_layer
+        for node, targets in enumerate(graph.edges):
+            assert tuple(pool['edges'][g, node, :len(targets)]) == targets
+            assert (pool['edges'][g, node, len(targets):] == -1).all()
+
+
+def test_skip_edges_shorten_matches():
+    linear = BalanceSimulator(StoryGenerator(), seed=3, graph_pool=256).simulate('usuario', 20000)
+    skipping = BalanceSimulator(StoryGenerator(skip_chance=0.9), seed=3,
+                                graph_pool=256).simulate('usuario', 20000)
+    assert skipping['mean_turns'] < linear['mean_turns'] - 0.3
+    assert skipping['outcomes']['time_out'] > linear['outcomes']['time_out']
+
+
+def test_accessories_change_the_win_rate():
+    simulator = BalanceSimulator(seed=5, graph_pool=256)
+    plain = simulator.simulate('hacker', 40000, 'medio')
+    toolkit = simulator.simulate('hacker', 40000, 'medio', ['toolkit'])
+    assert toolkit['accessories'] == ['toolkit']
+    assert toolkit['win_rate'] > plain['win_rate'] + 0.05
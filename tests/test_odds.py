@@ -0,0 +1,55 @@
+import random
+import threading
+import time
+
+from game.engine import GameEngine
+from game.odds import OddsCalculator
+from game.rules import CompiledRules, STATE_SUCCESS_MODIFIERS
+from models.story import game_story_generator
+
+# Reglas donde los recursos del jugador cambian su éxito (los del perfil 'ai')
+RESOURCE_RULES = CompiledRules(state_modifiers=dict(
+    STATE_SUCCESS_MODIFIERS, player=[[('resources', '<', 20, -15), ('resources', '>', 80, 10)]]))
+
+
+def started_engine(seed=4, rules=None):
+    engine = GameEngine(game_story_generator(), rng=random.Random(seed), rules=rules)
+    engine.start('hacker', ai_difficulties={'usuario': 'medio', 'cyberdelincuente': 'dificil'})
+    return engine
+
+
+def test_odds_follow_the_current_resources():
+    engine = started_engine(rules=RESOURCE_RULES)
+    normal = engine.option_odds()
+
+    engine.get_player_state()['resources'] = 10
+    starved = engine.option_odds()
+    expected = OddsCalculator(engine.current_story['graph'], 'hacker', engine.story_generator.options,
+                              engine.accessories, engine.rules, 10)
+    state = engine.get_player_state()
+    assert starved == expected.option_odds(engine.current_stage, engine.player_progress, state,
+                                           engine.active_effects)
+    assert all(low < high for low, high in zip(starved, normal))
+
+    engine.get_player_state()['resources'] = 60
+    assert engine.option_odds() == normal
+
+
+def test_turn_does_not_wait_for_pending_odds(monkeypatch):
+    engine = started_engine()
+    release = threading.Event()
+    slow = OddsCalculator.option_odds
+
+    def blocked(self, *args):
+        release.wait(5)
+        return slow(self, *args)
+
+    monkeypatch.setattr(OddsCalculator, 'option_odds', blocked)
+    odds = engine.request_option_odds()
+    engine.speculate_ai_turn()
+    started = time.perf_counter()
+    engine.resolve_turn(engine.get_current_stage()['options'][0])
+    elapsed = time.perf_counter() - started
+    release.set()
+    assert elapsed < 1.0
+    assert len(odds.result()) == len(engine.story_generator.options.for_phase('hacker', 'early'))
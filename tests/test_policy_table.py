@@ -0,0 +1,35 @@
+import pytest
+
+from ai import policy_table
+from ai.ai_player import AIPlayer
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(policy_table, 'policy_path', lambda kind='ai': str(tmp_path / f"{kind}.cqpt"))
+    monkeypatch.setattr(policy_table, '_LOADED', {})
+    return tmp_path
+
+
+def test_missing_table_is_not_built_by_the_ai(cache):
+    assert policy_table.default_policy() is None
+    expert = AIPlayer('hacker', 'experto')
+    assert expert.policy is None
+    assert expert.planner is not None
+    assert list(cache.iterdir()) == []
+
+
+def test_ensure_policy_builds_each_profile_once(cache):
+    pytest.importorskip('numpy')
+    path = policy_table.ensure_policy('player')
+    assert path == str(cache / 'player.cqpt')
+    assert sorted(p.name for p in cache.iterdir()) == ['player.cqpt']
+    modified = (cache / 'player.cqpt').stat().st_mtime_ns
+    assert policy_table.ensure_policy('player') == path
+    assert (cache / 'player.cqpt').stat().st_mtime_ns == modified
+
+    pilot = AIPlayer('hacker', 'experto', kind='player')
+    assert pilot.policy is policy_table.default_policy('player')
+    assert pilot.policy.kind == 'player'
+    assert pilot.planner is None
+    assert AIPlayer('hacker', 'experto').policy is None
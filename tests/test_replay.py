@@ -0,0 +1,106 @@
+import pytest
+
+from game.engine import GameEngine
+from game.replay import (ReplayPlayer, ReplayRecorder, read_replay, resimulate, restore_recording,
+                         rng_fingerprint, unpack_steps)
+from game.savegame import Autosave
+from models.story import StoryGenerator
+
+AI_DIFFICULTIES = {'usuario': 'medio', 'hacker': 'dificil', 'cyberdelincuente': 'facil'}
+
+
+def standing(engine):
+    return (engine.turn_count, engine.current_stage, engine.stage_path, engine.player_progress,
+            engine.player_errors, [(ai.progress, ai.errors, ai.completed) for ai in engine.ai_players],
+            engine.game_active)
+
+
+def recorded_engine(generator, seed, name='Ana'):
+    engine = GameEngine(generator)
+    engine.start('hacker', ai_difficulties=AI_DIFFICULTIES, seed=seed)
+    engine.recorder = ReplayRecorder(engine, name)
+    return engine
+
+
+def play(engine, turns=None):
+    played = 0
+    while engine.game_active and (turns is None or played < turns):
+        options = engine.get_current_stage()['options']
+        result = engine.resolve_turn(options[played % len(options)])
+        played += 1
+    return result
+
+
+@pytest.fixture(params=[False, True], ids=['clasico', 'procedural'])
+def generator(request):
+    return StoryGenerator(procedural=request.param, branch_width=2, skip_chance=0.15)
+
+
+def test_resimulation_matches_every_fingerprint(generator, tmp_path):
+    engine = recorded_engine(generator, seed=7)
+    result = play(engine)
+    path = engine.recorder.save(result.completed, result.winner, directory=str(tmp_path))
+
+    replay = read_replay(path)
+    assert replay.steps == engine.recorder.steps
+    player = ReplayPlayer(replay, generator)
+    while not player.finished:
+        assert player.step()
+    assert player.desync_at is None
+    assert standing(player.engine) == standing(engine)
+    assert rng_fingerprint(player.engine.rng) == rng_fingerprint(engine.rng)
+
+
+def test_tampered_step_is_detected(generator):
+    engine = recorded_engine(generator, seed=11)
+    play(engine, turns=3)
+    kind, ms, data, fingerprint = engine.recorder.steps[-1]
+    steps = engine.recorder.steps[:-1] + [(kind, ms, data, fingerprint ^ 1)]
+    assert not resimulate(GameEngine(generator), engine.recorder.header, steps)
+
+
+def test_resumed_match_keeps_recording(generator, tmp_path):
+    autosave = Autosave(str(tmp_path / 'auto.cqsv'), compact_after=2)
+    original = recorded_engine(generator, seed=23)
+    resumed_source = recorded_engine(generator, seed=23)
+    autosave.begin(resumed_source, 'Ana')
+    for _ in range(3):
+        play(original, turns=1)
+        play(resumed_source, turns=1)
+        autosave.record_turn(resumed_source)
+
+    partial = resumed_source.recorder.save(False, 'abandoned', directory=str(tmp_path))
+
+    engine = GameEngine(generator)
+    assert autosave.load(engine) == 'Ana'
+    assert autosave.recording is not None
+    recording = restore_recording(engine, *autosave.recording)
+    assert recording is not None
+    header, steps = recording
+    assert steps == unpack_steps(resumed_source.recorder.export_steps())
+    assert rng_fingerprint(engine.rng) == rng_fingerprint(original.rng)
+
+    engine.recorder = ReplayRecorder.resume(engine, header, steps)
+    play(original)
+    result = play(engine)
+    assert standing(engine) == standing(original)
+    path = engine.recorder.save(result.completed, result.winner, directory=str(tmp_path))
+    # La repetición final reemplaza a la parcial y contiene todos sus pasos
+    assert path == partial
+    replay = read_replay(path)
+    assert replay.header['winner'] == result.winner
+    assert replay.steps[:len(steps)] == steps
+    player = ReplayPlayer(replay, generator)
+    player.seek(len(player.steps))
+    assert player.desync_at is None
+    assert standing(player.engine) == standing(original)
+
+
+def test_resume_without_seed_has_no_recording(tmp_path):
+    generator = StoryGenerator()
+    engine = GameEngine(generator)
+    engine.start('usuario', ai_difficulties=AI_DIFFICULTIES)
+    autosave = Autosave(str(tmp_path / 'auto.cqsv'))
+    autosave.begin(engine, 'Ana')
+    assert autosave.load(GameEngine(generator)) == 'Ana'
+    assert autosave.recording is None
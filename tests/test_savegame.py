@@ -0,0 +1,89 @@
+import random
+
+import pytest
+
+from game.engine import GameEngine
+from game.savegame import Autosave
+from models.story import StoryGenerator
+
+
+def dump(engine):
+    story = engine.current_story
+    return (engine.selected_character, engine.player_customization, engine.current_stage, list(engine.stage_path),
+            engine.player_progress, engine.player_errors, engine.turn_count, engine.character_states.to_dict(),
+            [(ai.seat, ai.character_type, ai.difficulty, ai.progress, ai.errors, ai.actions, ai.completed)
+             for ai in engine.ai_players],
+            [(effect.type, rounds) for effect, rounds in engine.active_effects],
+            [event.type for event in engine.global_events], story['graph'].edges, story['scenario']['name'],
+            [(number, stage['description'], stage['phase'], stage['options'])
+             for number, stage in story['stages'].generated_stages()],
+            engine.decision_seed, engine.get_elapsed_time())
+
+
+def play(engine, turns, autosave=None):
+    for turn in range(turns):
+        options = engine.get_current_stage()['options']
+        result = engine.resolve_turn(options[turn % len(options)])
+        if result.finished:
+            return
+        if autosave is not None:
+            autosave.record_turn(engine)
+
+
+@pytest.fixture
+def generator():
+    return StoryGenerator(procedural=True, branch_width=2, skip_chance=0.15)
+
+
+@pytest.mark.parametrize('seed, turns', [(seed, seed % 3) for seed in range(12)])
+def test_round_trip_restores_the_match(generator, tmp_path, seed, turns):
+    engine = GameEngine(generator, rng=random.Random(seed))
+    engine.start('hacker', {'accessories': ['toolkit']}, ai_per_archetype=2)
+    autosave = Autosave(str(tmp_path / 'auto.cqsv'), compact_after=1 + seed % 2)
+    autosave.begin(engine, 'Ana')
+    play(engine, turns, autosave)
+    assert engine.game_active
+    engine.get_current_stage()
+
+    loaded = GameEngine(generator, rng=random.Random(999))
+    assert Autosave(autosave.filename).load(loaded) == 'Ana'
+    assert loaded.game_active
+    assert dump(loaded) == dump(engine)
+
+    # Con el mismo generador, ambas partidas siguen igual hasta el final
+    for match in (engine, loaded):
+        match.rng = random.Random(5)
+        for ai in match.ai_players:
+            ai.rng = match.rng
+    while engine.game_active:
+        original = engine.resolve_turn(engine.get_current_stage()['options'][0])
+        restored = loaded.resolve_turn(loaded.get_current_stage()['options'][0])
+        assert (restored.success, restored.progress_gain, restored.winner) == \
+               (original.success, original.progress_gain, original.winner)
+    assert not loaded.game_active
+
+
+def test_torn_last_record_resumes_from_previous_turn(generator, tmp_path):
+    engine = GameEngine(generator, rng=random.Random(3))
+    engine.start('usuario')
+    autosave = Autosave(str(tmp_path / 'auto.cqsv'))
+    autosave.begin(engine, 'Ana')
+    play(engine, 1, autosave)
+    expected = dump(engine)
+    size = len(open(autosave.filename, 'rb').read())
+    play(engine, 1, autosave)
+    with open(autosave.filename, 'r+b') as f:
+        f.truncate(size + 5)
+
+    loaded = GameEngine(generator)
+    assert Autosave(autosave.filename).load(loaded) == 'Ana'
+    assert dump(loaded)[:-1] == expected[:-1]
+
+
+def test_incompatible_or_missing_file(generator, tmp_path):
+    autosave = Autosave(str(tmp_path / 'auto.cqsv'))
+    assert autosave.load(GameEngine(generator)) is None
+    (tmp_path / 'auto.cqsv').write_bytes(b'otro formato')
+    assert autosave.load(GameEngine(generator)) is None
+    autosave.clear()
+    assert not autosave.exists()
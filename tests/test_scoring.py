@@ -0,0 +1,34 @@
+from ai.scoring import OptionScorer, state_bucket
+
+OPTIONS = [
+    {'id': 'hacker.early.0', 'text': 'Escanear puertos', 'success': 80, 'risk': 'bajo', 'time': 1},
+    {'id': 'hacker.early.1', 'text': 'Inyectar exploit', 'success': 65, 'risk': 'alto', 'time': 3},
+]
+STATE = {'health': 100, 'detection': 0, 'resources': 50}
+
+
+def test_cache_is_correct_across_catalogs_that_reuse_ids():
+    scorer = OptionScorer()
+    scorer.score_options('hacker', OPTIONS, STATE)
+
+    custom = [dict(option, success=10) for option in OPTIONS]
+    cached = scorer.score_options('hacker', custom, STATE)
+    fresh = OptionScorer().score_options('hacker', custom, STATE)
+    assert cached == fresh
+    assert all(score < 20 for score in cached)
+
+
+def test_score_matrix_matches_per_seat_scores():
+    scorer = OptionScorer()
+    tired = {'health': 20, 'detection': 90, 'resources': 10}
+    seats = [('hacker', OPTIONS, STATE), ('usuario', OPTIONS, tired), ('hacker', OPTIONS, STATE)]
+    matrix = scorer.score_matrix(seats)
+    assert matrix == [OptionScorer().score_options(character, options, state)
+                      for character, options, state in seats]
+    assert matrix[0] is matrix[2]
+
+
+def test_state_bucket_thresholds():
+    assert state_bucket(None) == -1
+    assert state_bucket(STATE) == 0
+    assert state_bucket({'health': 39, 'detection': 71, 'resources': 29}) == 7
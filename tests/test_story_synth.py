@@ -0,0 +1,55 @@
+import collections
+import json
+import random
+
+import pytest
+
+from utils.content_pack import ContentPack, default_pack
+from models.story_synth import ScenarioSynthesizer
+
+
+@pytest.fixture
+def weighted_synth(tmp_path):
+    with open(default_pack().source_path, encoding='utf-8') as f:
+        content = json.load(f)
+    content['events'][0] = {'text': content['events'][0], 'weight': 20}
+    scenario = content['scenarios'][0]
+    scenario['locations'][1] = {'text': scenario['locations'][1], 'weight': 20}
+    scenario['events'] = [{'text': 'Evento propio', 'weight': 10}]
+    path = tmp_path / 'pack.json'
+    path.write_text(json.dumps(content, ensure_ascii=False), encoding='utf-8')
+    return ScenarioSynthesizer(ContentPack(str(path), cache_dir=str(tmp_path))), content
+
+
+def _counts(synth, scenario_index, runs=200):
+    locations, events = collections.Counter(), collections.Counter()
+    for seed in range(runs):
+        for location, event, _ in synth.generate(scenario_index, 10, random.Random(seed)):
+            locations[location] += 1
+            events[event] += 1
+    return locations, events
+
+
+def test_content_weights_shape_the_walk(weighted_synth):
+    synth, content = weighted_synth
+    locations, events = _counts(synth, 0)
+    assert locations.most_common(1)[0][0] == content['scenarios'][0]['locations'][1]['text']
+    assert events.most_common(1)[0][0] == content['events'][0]['text']
+    assert events['Evento propio'] > 0
+
+
+def test_scenario_events_stay_in_their_scenario(weighted_synth):
+    synth, _ = weighted_synth
+    _, events = _counts(synth, 1, runs=50)
+    assert events['Evento propio'] == 0
+
+
+def test_walk_resumes_where_it_stopped():
+    synth = ScenarioSynthesizer()
+    rng = random.Random(7)
+    full = synth.generate(0, 8, rng)
+
+    rng = random.Random(7)
+    head = synth.generate(0, 4, rng)
+    stream = synth.walk(0, rng, after=head[-1][:2])
+    assert head + [next(stream) for _ in range(4)] == full
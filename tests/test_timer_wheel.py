@@ -0,0 +1,70 @@
+import random
+
+import pytest
+
+from utils.timer_wheel import TimerWheel
+
+
+def fire_log(wheel):
+    fired = []
+
+    def callback(name, expected_ms):
+        fired.append((name, expected_ms, wheel.now_ms - wheel.tick_ms))
+
+    return fired, callback
+
+
+@pytest.mark.parametrize('slots, levels', [(4, 3), (64, 3)])
+def test_timers_fire_in_deadline_order_on_their_tick(slots, levels):
+    wheel = TimerWheel(tick_ms=10, slots=slots, levels=levels)
+    fired, callback = fire_log(wheel)
+    rng = random.Random(slots)
+    span = 10 * slots ** levels
+    expected = []
+    for name in range(300):
+        delay = rng.randrange(span)
+        wheel.schedule(delay, callback, name, -(-delay // 10) * 10)
+        expected.append(-(-delay // 10) * 10)
+
+    now = 0
+    while len(wheel):
+        now += rng.randrange(1, span // 100)
+        wheel.advance(now)
+    assert len(fired) == 300
+    assert [due for _, due, _ in fired] == sorted(expected)
+    assert all(due == at for _, due, at in fired)
+
+
+def test_timers_beyond_the_last_level_still_fire_on_time():
+    wheel = TimerWheel(tick_ms=1, slots=4, levels=2)
+    fired, callback = fire_log(wheel)
+    wheel.schedule(100, callback, 'lejos', 100)
+    wheel.schedule(37, callback, 'cerca', 37)
+    for now in range(0, 120, 7):
+        wheel.advance(now)
+    assert fired == [('cerca', 37, 37), ('lejos', 100, 100)]
+
+
+def test_cancel_and_reschedule_from_callbacks():
+    wheel = TimerWheel(tick_ms=50)
+    fired, callback = fire_log(wheel)
+    cancelled = wheel.schedule(120, callback, 'cancelado', 150)
+
+    def chain():
+        wheel.cancel(cancelled)
+        wheel.schedule(0, callback, 'encadenado', 150)
+
+    wheel.schedule(100, chain)
+    assert len(wheel) == 2
+    assert wheel.advance(100) == 1
+    assert len(wheel) == 1
+    assert wheel.advance(1000) == 1
+    assert fired == [('encadenado', 150, 150)]
+    assert len(wheel) == 0
+
+
+def test_invalid_geometry():
+    with pytest.raises(ValueError):
+        TimerWheel(slots=48)
+    with pytest.raises(ValueError):
+        TimerWheel(levels=0)
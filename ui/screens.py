@@ -1,11 +1,26 @@
 # ui/screens.py - VERSIÓN COMPLETA Y MEJORADA
 import tkinter as tk
 from tkinter import messagebox
+import heapq
 import random
 import time
 from config.colors import COLORS
+from config.constants import VISIBLE_AI_SEATS, REPLAY_MAX_GAP_MS
+from game.replay import (list_replays, read_replay, ReplayPlayer, TURN as REPLAY_TURN,
+                         AI_STEP as REPLAY_AI_STEP, EFFECT_TICK as REPLAY_EFFECT_TICK)
 from models.character import CharacterDatabase
 
+# Pasos recientes que muestra el visor de repeticiones
+REPLAY_LOG_LINES = 8
+# Intervalo con que la pantalla de juego revisa si ya están las probabilidades (ms)
+ODDS_POLL_MS = 30
+# Texto de cada nivel de rivales (config.constants.RIVAL_LEVELS)
+RIVAL_LEVEL_LABELS = {
+    'clasico': "🎲 Clásicos (fácil, medio, difícil)",
+    'maestro': "🧠 Maestro (planifica)",
+    'experto': "🏆 Experto (política óptima)"
+}
+
 class GameScreens:
     """Clase que contiene todas las pantallas del juego - Versión Mejorada"""
     
@@ -277,9 +292,13 @@ class GameScreens:
             ("🎮 NUEVA AVENTURA", self.show_character_selection, COLORS['primary']),
             ("✨ PERSONALIZAR", lambda: self.show_customization_screen(start_after=False), COLORS['accent']),
             ("🏆 HALL OF FAME", self.show_ranking, '#f1c40f'),
+            ("🎬 REPETICIONES", self.show_replays, COLORS['primary']),
             ("❓ GUÍA DEL SISTEMA", self.show_help, COLORS['container_bg2']),
             ("🚪 SALIR", self.game.root.quit, COLORS['secondary'])
         ]
+        # Partida interrumpida (cierre o vuelta al menú): se puede continuar
+        if self.game.autosave.exists():
+            menu_buttons.insert(0, ("💾 CONTINUAR PARTIDA", self.game.resume_game, COLORS['accent']))
         
         for text, command, color in menu_buttons:
             btn = tk.Button(
@@ -354,6 +373,42 @@ class GameScreens:
         name_entry.pack(side='left', padx=20, pady=15)
         name_entry.focus()
         
+        # Modo de juego: por turnos (por defecto) o carrera en tiempo real
+        mode_check = tk.Checkbutton(
+            main_frame,
+            text="⏱️ MODO CARRERA EN TIEMPO REAL (las IAs no esperan tu turno)",
+            font=self.game.normal_font,
+            bg=COLORS['bg'],
+            fg=COLORS['text'],
+            activebackground=COLORS['bg'],
+            selectcolor=COLORS['primary'],
+            variable=self.game.realtime_mode
+        )
+        mode_check.pack(pady=5)
+        
+        # Nivel de las IAs rivales: clásico (por personaje) o una dificultad que planifica
+        rivals_frame = tk.Frame(main_frame, bg=COLORS['bg'])
+        rivals_frame.pack(pady=5)
+        tk.Label(
+            rivals_frame,
+            text="🤖 RIVALES:",
+            font=self.game.normal_font,
+            bg=COLORS['bg'],
+            fg=COLORS['text']
+        ).pack(side='left', padx=10)
+        for level, label in RIVAL_LEVEL_LABELS.items():
+            tk.Radiobutton(
+                rivals_frame,
+                text=label,
+                value=level,
+                font=self.game.normal_font,
+                bg=COLORS['bg'],
+                fg=COLORS['text'],
+                activebackground=COLORS['bg'],
+                selectcolor=COLORS['primary'],
+                variable=self.game.rival_level
+            ).pack(side='left', padx=5)
+        
         # Frame de personajes
         characters_frame = tk.Frame(main_frame, bg=COLORS['bg'])
         characters_frame.pack(pady=20, expand=True, fill='both')
@@ -538,8 +593,7 @@ class GameScreens:
         preview_frame = tk.Frame(main_frame, bg=COLORS['modal'], relief='groove', bd=3)
         preview_frame.pack(pady=20)
         
-        char_data = next((c for c in CharacterDatabase.get_all_characters() 
-                         if c['type'] == self.game.selected_character), None)
+        char_data = CharacterDatabase.get_character(self.game.selected_character)
         
         if char_data:
             preview_icon = tk.Label(
@@ -657,10 +711,9 @@ class GameScreens:
         header_frame = tk.Frame(main_frame, bg=COLORS['header_bg'])
         header_frame.pack(fill='x', pady=(0, 10))
         
-        info_text = f"👤 {self.game.player_name.get()} | 🎭 {self.game.selected_character.title()} | ⏱️ {self.game.get_elapsed_time()}s | ❌ Errores: {self.game.player_errors}"
         info_label = tk.Label(
             header_frame,
-            text=info_text,
+            text=self._header_text(),
             font=self.game.small_font,
             bg=COLORS['header_bg'],
             fg=COLORS['text']
@@ -669,10 +722,14 @@ class GameScreens:
 
         # Botón para volver al menú siempre visible en la cabecera
         def _confirm_back_to_menu():
-            if messagebox.askyesno("Volver al menú", "¿Seguro que quieres volver al menú? Se perderá el progreso actual."):
+            self.game.pause_realtime()
+            if messagebox.askyesno("Volver al menú", "¿Seguro que quieres volver al menú? Podrás continuar la partida desde el menú."):
                 # Indicar al game que el usuario pidió el menú y mostrarlo
                 setattr(self.game, '_user_requested_menu', False)
+                self.game.abandon_match()
                 self.game.screens.show_main_menu()
+            else:
+                self.game.resume_realtime()
 
         menu_btn = tk.Button(
             header_frame,
@@ -695,6 +752,9 @@ class GameScreens:
         left_frame.pack_propagate(False)
         
         self.create_character_visualization_panel(left_frame)
+        # Referencias para refrescar en tiempo real sin reconstruir la pantalla
+        self._live_header = info_label
+        self._live_agents = left_frame
         
         # COLUMNA DERECHA: Historia y opciones
         right_frame = tk.Frame(content_frame, bg=COLORS['bg'])
@@ -729,20 +789,10 @@ class GameScreens:
             )
         
         # Eventos globales
-        if self.game.global_events:
-            events_frame = tk.Frame(right_frame, bg=COLORS['secondary'], relief='raised', bd=2)
-            events_frame.pack(fill='x', padx=20, pady=10)
-            
-            latest_event = self.game.global_events[-1]
-            event_label = tk.Label(
-                events_frame,
-                text=f"🌍 {latest_event['description']}\n{latest_event['effect']}",
-                font=self.game.small_font,
-                bg=COLORS['secondary'],
-                fg='white',
-                justify='center'
-            )
-            event_label.pack(pady=10)
+        events_slot = tk.Frame(right_frame, bg=COLORS['bg'])
+        events_slot.pack(fill='x')
+        self._live_events = events_slot
+        self.create_latest_event_banner(events_slot)
         
         # Área de historia
         story_frame = tk.Frame(right_frame, bg=COLORS['modal'], relief='groove', bd=2)
@@ -757,6 +807,18 @@ class GameScreens:
         )
         stage_label.pack(pady=15)
         
+        min_left, max_left = self.game.engine.remaining_stages()
+        remaining_text = (f"🧭 Quedan {min_left} etapas en esta rama" if min_left == max_left
+                          else f"🧭 Quedan entre {min_left} y {max_left} etapas según tu camino")
+        remaining_label = tk.Label(
+            story_frame,
+            text=remaining_text,
+            font=self.game.small_font,
+            bg=COLORS['modal'],
+            fg=COLORS['text_secondary']
+        )
+        remaining_label.pack()
+        
         desc_label = tk.Label(
             story_frame,
             text=stage['description'],
@@ -791,6 +853,11 @@ class GameScreens:
         options_container = tk.Frame(story_frame, bg=COLORS['modal'])
         options_container.pack(pady=10, padx=30, fill='both', expand=True)
         
+        # La probabilidad de victoria se calcula en segundo plano y se añade
+        # a cada botón cuando está lista
+        odds_future = self.game.engine.request_option_odds()
+        option_buttons = []
+        
         for i, option in enumerate(stage['options']):
             opt_frame = tk.Frame(
                 options_container,
@@ -806,6 +873,13 @@ class GameScreens:
             risk_color = risk_colors.get(option['risk'], COLORS['text_secondary'])
             
             info_text = f"⏱️ {option['time']}min | 🎲 Éxito: {option['success']}% | ⚠️ Riesgo: {option['risk'].upper()}"
+            after_min, after_max = self.game.engine.option_outlook(i)
+            if after_max == 0:
+                info_text += " | 🏁 Última etapa"
+            elif after_min == after_max:
+                info_text += f" | 🧭 Luego: {after_min} etapas"
+            else:
+                info_text += f" | 🧭 Luego: {after_min}-{after_max} etapas"
             
             opt_btn = tk.Button(
                 opt_frame,
@@ -824,6 +898,57 @@ class GameScreens:
                 relief='flat'
             )
             opt_btn.pack(fill='x')
+            option_buttons.append(opt_btn)
+        
+        self._show_option_odds(odds_future, option_buttons)
+    
+    def _show_option_odds(self, future, buttons):
+        """Completa los botones de opción con la probabilidad de victoria al terminar el cálculo"""
+        if not buttons or not buttons[0].winfo_exists():
+            return
+        if not future.done():
+            self.game.root.after(ODDS_POLL_MS, self._show_option_odds, future, buttons)
+            return
+        if future.exception() is not None:
+            return
+        for button, odds in zip(buttons, future.result()):
+            button.config(text=f"{button.cget('text')} | 🏆 Victoria si eliges: {odds:.0%}")
+    
+    def _header_text(self) -> str:
+        text = f"👤 {self.game.player_name.get()} | 🎭 {self.game.selected_character.title()} | ⏱️ {self.game.get_elapsed_time()}s | ❌ Errores: {self.game.player_errors}"
+        if self.game.engine.recorder is None:
+            text += " | 🎬 Sin repetición"
+        return text
+    
+    def create_latest_event_banner(self, parent, events=None):
+        """Muestra el último evento global (si hubo alguno)"""
+        events = self.game.global_events if events is None else events
+        if events:
+            events_frame = tk.Frame(parent, bg=COLORS['secondary'], relief='raised', bd=2)
+            events_frame.pack(fill='x', padx=20, pady=10)
+            
+            latest_event = events[-1]
+            event_label = tk.Label(
+                events_frame,
+                text=f"🌍 {latest_event.description}\n{latest_event.effect}",
+                font=self.game.small_font,
+                bg=COLORS['secondary'],
+                fg='white',
+                justify='center'
+            )
+            event_label.pack(pady=10)
+    
+    def refresh_live_panels(self):
+        """Redibuja la cabecera, los agentes y el último evento (modo en tiempo real)"""
+        header = getattr(self, '_live_header', None)
+        if header is None or not header.winfo_exists():
+            return
+        header.config(text=self._header_text())
+        for panel, draw in ((self._live_agents, self.create_character_visualization_panel),
+                            (self._live_events, self.create_latest_event_banner)):
+            for widget in panel.winfo_children():
+                widget.destroy()
+            draw(panel)
     
     def create_character_visualization_panel(self, parent):
         """Panel de visualización de personajes"""
@@ -841,7 +966,7 @@ class GameScreens:
             parent,
             self.game.selected_character,
             self.game.player_progress,
-            self.game.character_states[self.game.selected_character],
+            self.game.engine.get_player_state(),
             is_player=True
         )
         
@@ -858,15 +983,30 @@ class GameScreens:
         )
         ai_label.pack(pady=10)
         
-        for ai in self.game.ai_players:
+        # Solo se dibujan los asientos más avanzados; el resto se resume
+        visible_ais = heapq.nlargest(VISIBLE_AI_SEATS, self.game.ai_players,
+                                     key=lambda ai: ai.progress)
+        for ai in visible_ais:
             self.create_character_display(
                 parent,
                 ai.character_type,
                 ai.progress,
-                self.game.character_states[ai.character_type],
+                self.game.character_states[ai.seat],
                 is_player=False,
-                completed=ai.completed
+                completed=ai.completed,
+                label=ai.name
+            )
+        
+        hidden = len(self.game.ai_players) - len(visible_ais)
+        if hidden > 0:
+            hidden_label = tk.Label(
+                parent,
+                text=f"... y {hidden} competidores más",
+                font=self.game.tiny_font,
+                bg=COLORS['modal'],
+                fg=COLORS['text_secondary']
             )
+            hidden_label.pack(pady=5)
         
         # Efectos activos
         if self.game.active_effects:
@@ -882,20 +1022,23 @@ class GameScreens:
             )
             effects_title.pack(pady=5)
             
-            for effect in self.game.active_effects:
+            for effect, remaining in self.game.active_effects:
+                if self.game.realtime is not None:
+                    time_left = f"~{self.game.realtime.effect_seconds(remaining)}s"
+                else:
+                    time_left = f"{remaining} turnos"
                 effect_label = tk.Label(
                     effects_frame,
-                    text=f"{effect['description']} ({effect['duration']} turnos)",
+                    text=f"{effect.description} ({time_left})",
                     font=self.game.tiny_font,
                     bg=COLORS['secondary'],
                     fg='white'
                 )
                 effect_label.pack(pady=2)
     
-    def create_character_display(self, parent, char_type, progress, state, is_player=False, completed=False):
+    def create_character_display(self, parent, char_type, progress, state, is_player=False, completed=False, label=None):
         """Crea la visualización de un personaje"""
-        char_data = next((c for c in CharacterDatabase.get_all_characters() 
-                         if c['type'] == char_type), None)
+        char_data = CharacterDatabase.get_character(char_type)
         
         if not char_data:
             return
@@ -939,7 +1082,7 @@ class GameScreens:
         
         name_label = tk.Label(
             info_frame,
-            text=char_data['name'].upper() + (" (TÚ)" if is_player else ""),
+            text=char_data['name'].upper() + (" (TÚ)" if is_player else f" · {label}" if label else ""),
             font=self.game.normal_font if is_player else self.game.small_font,
             bg=info_frame['bg'],
             fg=char_data['color']
@@ -1057,8 +1200,7 @@ class GameScreens:
             dialog_frame = tk.Frame(result_window, bg=COLORS['container_bg2'], relief='groove', bd=2)
             dialog_frame.pack(pady=15, padx=40, fill='x')
             
-            char_data = next((c for c in CharacterDatabase.get_all_characters() 
-                             if c['type'] == self.game.selected_character), None)
+            char_data = CharacterDatabase.get_character(self.game.selected_character)
             
             if char_data:
                 dialog_header = tk.Label(
@@ -1134,10 +1276,10 @@ class GameScreens:
             )
             effects_label.pack(pady=5)
             
-            for effect in self.game.active_effects[-2:]:
+            for effect, _ in self.game.active_effects[-2:]:
                 effect_text = tk.Label(
                     effects_frame,
-                    text=effect['description'],
+                    text=effect.description,
                     font=self.game.tiny_font,
                     bg=COLORS['secondary'],
                     fg='white'
@@ -1275,7 +1417,7 @@ class GameScreens:
             ("⏱️ Tiempo total", f"{elapsed_time} segundos"),
             ("❌ Errores cometidos", str(self.game.player_errors)),
             ("📈 Progreso final", f"{self.game.player_progress}%"),
-            ("🎯 Etapas completadas", f"{self.game.current_stage}/{len(self.game.current_story['stages'])}"),
+            ("🎯 Etapas completadas", f"{len(self.game.engine.stage_path)}/{self.game.current_story['graph'].num_layers}"),
             ("🔄 Turnos jugados", str(self.game.turn_count))
         ]
 
@@ -1332,18 +1474,16 @@ class GameScreens:
         )
         final_states_title.pack(pady=10)
 
-        # Mostrar estados finales
-        all_chars = [self.game.selected_character] + [ai.character_type for ai in self.game.ai_players]
-        for char_type in all_chars:
-            state = self.game.character_states[char_type]
-            is_player = (char_type == self.game.selected_character)
-
+        # Mostrar estados finales: jugador y los competidores más avanzados
+        top_ais = heapq.nlargest(VISIBLE_AI_SEATS, self.game.ai_players, key=lambda ai: ai.progress)
+        rows = [(self.game.selected_character.title() + " (TÚ)", self.game.player_progress,
+                 self.game.engine.get_player_state())]
+        rows += [(ai.character_type.title() + (f" {ai.name}" if ai.name else "") + " (IA)", ai.progress,
+                  self.game.character_states[ai.seat]) for ai in top_ais]
+        for char_name, progress, state in rows:
             char_state_frame = tk.Frame(final_states_frame, bg=COLORS['container_bg2'])
             char_state_frame.pack(pady=3, padx=20, fill='x')
 
-            char_name = char_type.title() + (" (TÚ)" if is_player else " (IA)")
-            progress = self.game.player_progress if is_player else next((ai.progress for ai in self.game.ai_players if ai.character_type == char_type), 0)
-
             state_text = f"{char_name}: {progress}% | 💚 {state['health']}% | 🚨 {state['detection']}%"
 
             state_label = tk.Label(
@@ -1546,6 +1686,316 @@ class GameScreens:
             messagebox.showinfo("✅ Completado", "Ranking limpiado exitosamente")
             self.show_ranking()
     
+    # ========================================================================
+    # REPETICIONES
+    # ========================================================================
+    
+    def _replay_outcome_text(self, header: dict) -> str:
+        """Resumen corto del desenlace guardado en una repetición"""
+        if header.get('completed'):
+            return "🏆 Victoria"
+        winner = header.get('winner')
+        outcomes = {
+            'system_failure': "💔 Sistema caído",
+            'detected': "🚨 Detectado",
+            'time_out': "⏱️ Sin tiempo",
+            'abandoned': "🏠 Abandonada"
+        }
+        if winner in outcomes:
+            return outcomes[winner]
+        return f"🤖 Ganó {winner.title()}" if winner else "❌ Fallida"
+    
+    def show_replays(self):
+        """Lista de repeticiones guardadas, de la más reciente a la más antigua"""
+        self._stop_replay_playback()
+        self.game.clear_screen()
+        
+        main_frame = tk.Frame(self.game.root, bg=COLORS['bg'])
+        main_frame.pack(expand=True, fill='both', padx=20, pady=20)
+        
+        title_label = tk.Label(
+            main_frame,
+            text="🎬 REPETICIONES",
+            font=self.game.title_font,
+            bg=COLORS['bg'],
+            fg=COLORS['accent']
+        )
+        title_label.pack(pady=20)
+        
+        list_container = tk.Frame(main_frame, bg=COLORS['modal'], relief='groove', bd=3)
+        list_container.pack(fill='both', expand=True, padx=50, pady=10)
+        rows_frame, _ = self._create_scrollable_container(list_container, bg=COLORS['modal'])
+        
+        replays = list_replays()
+        if not replays:
+            no_data_label = tk.Label(
+                rows_frame,
+                text="🔭 Aún no hay repeticiones\n\nCada partida que juegues se guarda automáticamente",
+                font=self.game.header_font,
+                bg=COLORS['modal'],
+                fg=COLORS['text_secondary'],
+                justify='center'
+            )
+            no_data_label.pack(pady=80)
+        
+        for path, header in replays:
+            row = tk.Frame(rows_frame, bg=COLORS['container_bg2'], relief='raised', bd=2)
+            row.pack(fill='x', padx=15, pady=5)
+            
+            mode = "⏱️ Tiempo real" if header.get('realtime') else "🎲 Por turnos"
+            info_label = tk.Label(
+                row,
+                text=(f"{header['date']} | 👤 {header['player']} | 🎭 {header['character'].title()} | "
+                      f"{mode} | {self._replay_outcome_text(header)}\n📖 {header.get('scenario', '')}"),
+                font=self.game.small_font,
+                bg=COLORS['container_bg2'],
+                fg=COLORS['text'],
+                justify='left',
+                anchor='w'
+            )
+            info_label.pack(side='left', fill='x', expand=True, padx=10, pady=8)
+            
+            watch_btn = tk.Button(
+                row,
+                text="▶ VER",
+                font=self.game.small_font,
+                bg=COLORS['primary'],
+                fg=COLORS['text_secondary'],
+                command=lambda p=path: self.show_replay_viewer(p),
+                cursor='hand2',
+                width=8
+            )
+            watch_btn.pack(side='right', padx=10, pady=8)
+        
+        back_btn = tk.Button(
+            main_frame,
+            text="⬅️ VOLVER",
+            font=self.game.normal_font,
+            bg=COLORS['container_bg2'],
+            fg=COLORS['text_secondary'],
+            command=self.show_main_menu,
+            cursor='hand2',
+            width=15,
+            height=2
+        )
+        back_btn.pack(pady=20)
+    
+    def show_replay_viewer(self, path: str):
+        """Reproduce una repetición con avance a 1x, 10x o instantáneo y salto por turnos"""
+        try:
+            replay = read_replay(path)
+            player = ReplayPlayer(replay, self.game.story_generator,
+                                  event_describer=self.game.dialog_engine.describe_event)
+        except (OSError, ValueError, KeyError) as e:
+            messagebox.showerror("⚠️ Repetición", f"No se pudo abrir la repetición:\n{e}")
+            return
+        
+        self._stop_replay_playback()
+        self._replay = player
+        self._replay_speed = None
+        self.game.clear_screen()
+        
+        main_frame = tk.Frame(self.game.root, bg=COLORS['bg'])
+        main_frame.pack(expand=True, fill='both')
+        header = replay.header
+        
+        header_frame = tk.Frame(main_frame, bg=COLORS['header_bg'])
+        header_frame.pack(fill='x', pady=(0, 10))
+        header_label = tk.Label(
+            header_frame,
+            text=(f"🎬 {header['player']} | 🎭 {header['character'].title()} | 📖 {header.get('scenario', '')} | "
+                  f"{header['date']} | {self._replay_outcome_text(header)}"),
+            font=self.game.small_font,
+            bg=COLORS['header_bg'],
+            fg=COLORS['text']
+        )
+        header_label.pack(pady=10)
+        
+        # Controles de reproducción
+        controls = tk.Frame(main_frame, bg=COLORS['bg'])
+        controls.pack(fill='x', padx=20)
+        
+        buttons = [
+            ("⏮", lambda: self._replay_seek_turn(0)),
+            ("◀ TURNO", lambda: self._replay_seek_turn(self._replay.turn - 1)),
+            ("▶ 1x", lambda: self._replay_play(1)),
+            ("⏩ 10x", lambda: self._replay_play(10)),
+            ("⚡ FINAL", lambda: self._replay_seek(len(self._replay.steps))),
+            ("⏸ PAUSA", self._replay_pause),
+            ("TURNO ▶", lambda: self._replay_seek_turn(self._replay.turn + 1)),
+            ("⬅️ VOLVER", self.show_replays)
+        ]
+        for text, command in buttons:
+            btn = tk.Button(
+                controls,
+                text=text,
+                font=self.game.small_font,
+                bg=COLORS['container_bg2'],
+                fg=COLORS['text_secondary'],
+                command=command,
+                cursor='hand2',
+                width=9
+            )
+            btn.pack(side='left', padx=4, pady=5)
+        
+        # La barra salta al soltarla para no re-simular en cada movimiento
+        self._replay_scale = tk.Scale(
+            main_frame,
+            from_=0,
+            to=player.total_turns,
+            orient='horizontal',
+            label="Turno",
+            font=self.game.tiny_font,
+            bg=COLORS['bg'],
+            fg=COLORS['text'],
+            highlightthickness=0,
+            troughcolor=COLORS['modal']
+        )
+        self._replay_scale.pack(fill='x', padx=20, pady=(0, 10))
+        self._replay_scale.bind('<ButtonRelease-1>',
+                                lambda e: self._replay_seek_turn(self._replay_scale.get()))
+        
+        self._replay_body = tk.Frame(main_frame, bg=COLORS['bg'])
+        self._replay_body.pack(expand=True, fill='both', padx=20, pady=(0, 10))
+        self._draw_replay_frame()
+    
+    def _draw_replay_frame(self):
+        """Dibuja el estado de la repetición en la posición actual"""
+        body = self._replay_body
+        if not body.winfo_exists():
+            return
+        for widget in body.winfo_children():
+            widget.destroy()
+        player = self._replay
+        engine = player.engine
+        self._replay_scale.set(player.turn)
+        
+        agents_frame = tk.Frame(body, bg=COLORS['modal'], relief='groove', bd=3)
+        agents_frame.pack(side='left', fill='both', expand=True, padx=(0, 10))
+        agents, _ = self._create_scrollable_container(agents_frame, bg=COLORS['modal'])
+        self.create_character_display(agents, engine.selected_character, engine.player_progress,
+                                      engine.get_player_state(), is_player=True)
+        for ai in heapq.nlargest(VISIBLE_AI_SEATS, engine.ai_players, key=lambda ai: ai.progress):
+            self.create_character_display(agents, ai.character_type, ai.progress,
+                                          engine.character_states[ai.seat], completed=ai.completed,
+                                          label=ai.name)
+        
+        info_frame = tk.Frame(body, bg=COLORS['modal'], relief='groove', bd=3)
+        info_frame.pack(side='right', fill='both', expand=True)
+        
+        stages = engine.current_story['stages']
+        if engine.current_stage < len(stages):
+            stage = stages[engine.current_stage]
+            stage_text = f"📍 ETAPA {stage['stage']}: {stage['location']}\n\n{stage['description']}"
+        else:
+            stage_text = "📍 Sin etapas restantes"
+        stage_label = tk.Label(
+            info_frame,
+            text=stage_text,
+            font=self.game.normal_font,
+            bg=COLORS['modal'],
+            fg=COLORS['text'],
+            wraplength=520,
+            justify='left'
+        )
+        stage_label.pack(padx=15, pady=15, anchor='w')
+        
+        status = (f"🎯 Turno {player.turn}/{player.total_turns} | Paso {player.position}/{len(player.steps)} | "
+                  f"Progreso {engine.player_progress}% | ❌ Errores {engine.player_errors}")
+        if self._replay_speed:
+            status += f" | ▶ {self._replay_speed}x"
+        status_label = tk.Label(
+            info_frame,
+            text=status,
+            font=self.game.small_font,
+            bg=COLORS['modal'],
+            fg=COLORS['accent']
+        )
+        status_label.pack(padx=15, anchor='w')
+        
+        if player.desync_at is not None:
+            desync_label = tk.Label(
+                info_frame,
+                text=f"⚠️ La repetición se desincronizó en el paso {player.desync_at + 1}",
+                font=self.game.small_font,
+                bg=COLORS['modal'],
+                fg=COLORS['secondary']
+            )
+            desync_label.pack(padx=15, pady=5, anchor='w')
+        
+        self.create_latest_event_banner(info_frame, engine.global_events)
+        
+        # Últimos pasos aplicados
+        for step in player.steps[max(0, player.position - REPLAY_LOG_LINES):player.position]:
+            step_label = tk.Label(
+                info_frame,
+                text=self._describe_replay_step(engine, step),
+                font=self.game.tiny_font,
+                bg=COLORS['modal'],
+                fg=COLORS['text_secondary']
+            )
+            step_label.pack(padx=15, anchor='w')
+    
+    def _describe_replay_step(self, engine, step) -> str:
+        kind, ms, data, _ = step
+        clock = f"[{ms // 60000:02d}:{ms // 1000 % 60:02d}]"
+        if kind == REPLAY_TURN:
+            option, decisions = data
+            return f"{clock} 🎮 Opción {option + 1} del jugador" + (
+                f" · {len(decisions)} IAs decidieron" if decisions else "")
+        if kind == REPLAY_AI_STEP:
+            seat, option = data
+            ai = engine.ai_players[seat]
+            name = ai.character_type.title() + (f" · {ai.name}" if ai.name else "")
+            return f"{clock} 🤖 {name} elige la opción {option + 1}"
+        if kind == REPLAY_EFFECT_TICK:
+            return f"{clock} ⏳ Avanzan los efectos activos"
+        return f"{clock} 🌍 Evento global"
+    
+    def _replay_seek(self, position: int):
+        self._stop_replay_playback()
+        self._replay.seek(position)
+        self._draw_replay_frame()
+    
+    def _replay_seek_turn(self, turn: int):
+        self._stop_replay_playback()
+        self._replay.seek_turn(turn)
+        self._draw_replay_frame()
+    
+    def _replay_play(self, speed: int):
+        """Reproduce respetando los tiempos grabados (divididos por speed)"""
+        self._stop_replay_playback()
+        self._replay_speed = speed
+        self._schedule_replay_step()
+    
+    def _schedule_replay_step(self):
+        player = self._replay
+        if player.finished:
+            self._replay_speed = None
+            self._draw_replay_frame()
+            return
+        delay = min(player.next_gap_ms(), REPLAY_MAX_GAP_MS) // self._replay_speed
+        self._replay_job = self.game.root.after(max(1, delay), self._replay_tick)
+    
+    def _replay_tick(self):
+        self._replay_job = None
+        if not self._replay_body.winfo_exists():
+            return
+        self._replay.step()
+        self._draw_replay_frame()
+        self._schedule_replay_step()
+    
+    def _replay_pause(self):
+        self._stop_replay_playback()
+        self._draw_replay_frame()
+    
+    def _stop_replay_playback(self):
+        job = getattr(self, '_replay_job', None)
+        if job is not None:
+            self.game.root.after_cancel(job)
+            self._replay_job = None
+        self._replay_speed = None
+    
     # ========================================================================
     # AYUDA
     # ========================================================================
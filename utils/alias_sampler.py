@@ -0,0 +1,82 @@
+# ============================================================================
+# ARCHIVO: utils/alias_sampler.py
+# DESCRIPCIÓN: Muestreo ponderado en O(1) con tablas de alias (método de Vose).
+#              La tabla se construye una vez por conjunto de contenido en O(n)
+#              y cada extracción usa dos números aleatorios sin importar n.
+# ============================================================================
+
+import random
+from typing import Any, Iterable, List, Sequence, Tuple
+
+
+class AliasTable:
+    """Tabla de alias para elegir elementos según su peso"""
+
+    __slots__ = ('items', '_prob', '_alias', '_n')
+
+    def __init__(self, items: Sequence[Any], weights: Iterable[float] = None):
+        self.items = tuple(items)
+        n = len(self.items)
+        if n == 0:
+            raise ValueError("AliasTable necesita al menos un elemento")
+        weights = [1.0] * n if weights is None else [float(w) for w in weights]
+        if len(weights) != n:
+            raise ValueError("items y weights deben tener la misma longitud")
+        if any(w < 0 for w in weights):
+            raise ValueError("los pesos no pueden ser negativos")
+        total = sum(weights)
+        if total <= 0:
+            raise ValueError("la suma de pesos debe ser positiva")
+
+        self._n = n
+        self._prob, self._alias = self._build(weights, total)
+
+    @staticmethod
+    def _build(weights: List[float], total: float) -> Tuple[List[float], List[int]]:
+        n = len(weights)
+        scaled = [w * n / total for w in weights]
+        prob = [1.0] * n
+        alias = list(range(n))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+
+        while small and large:
+            low, high = small.pop(), large.pop()
+            prob[low] = scaled[low]
+            alias[low] = high
+            scaled[high] -= 1.0 - scaled[low]
+            (small if scaled[high] < 1.0 else large).append(high)
+
+        # Lo que queda tiene probabilidad 1 (salvo errores de redondeo)
+        for i in small + large:
+            prob[i] = 1.0
+        return prob, alias
+
+    def sample_index(self, rng=None) -> int:
+        rng = rng or random
+        i = int(rng.random() * self._n)
+        return i if rng.random() < self._prob[i] else self._alias[i]
+
+    def sample(self, rng=None) -> Any:
+        """Elige un elemento con probabilidad proporcional a su peso"""
+        return self.items[self.sample_index(rng)]
+
+    def __len__(self):
+        return self._n
+
+
+def weighted_entries(entries: Iterable, key: str = 'text') -> Tuple[List, List[float]]:
+    """Separa entradas de contenido en (valores, pesos).
+
+    Cada entrada puede ser un valor simple (peso 1) o un diccionario con
+    'weight' y el valor en la clave indicada.
+    """
+    values, weights = [], []
+    for entry in entries:
+        if isinstance(entry, dict) and key in entry:
+            values.append(entry[key])
+            weights.append(entry.get('weight', 1))
+        else:
+            values.append(entry)
+            weights.append(1)
+    return values, weights
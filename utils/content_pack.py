@@ -0,0 +1,176 @@
+# ============================================================================
+# ARCHIVO: utils/content_pack.py
+# DESCRIPCIÓN: Paquetes de contenido (escenarios, eventos, opciones, diálogos)
+#              escritos en JSON o YAML y compilados una vez a un caché binario
+#              indexado. El caché se identifica por el hash del paquete y cada
+#              sección se lee y decodifica solo cuando alguien la pide.
+# ============================================================================
+
+import hashlib
+import json
+import os
+import struct
+import zlib
+from functools import lru_cache
+from typing import Dict, Iterator, List, Mapping
+
+from config.constants import CONTENT_PACK, CONTENT_CACHE_DIR
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Formato del caché:
+#   cabecera  : MAGIC, versión (u16), número de secciones (u32)
+#   índice    : por sección -> largo de clave (u16), clave UTF-8, offset (u64), largo (u32)
+#   datos     : bloques JSON comprimidos con zlib, uno por sección
+MAGIC = b'CQPK'
+FORMAT_VERSION = 1
+_HEADER = struct.Struct('<4sHI')
+_KEY_LEN = struct.Struct('<H')
+_ENTRY = struct.Struct('<QI')
+
+# Secciones que se dividen en una subsección por elemento, para cargar solo
+# el escenario o el personaje que la partida necesita
+_PER_ITEM_SECTIONS = ('options', 'dialogs')
+
+
+def _read_source(path: str) -> bytes:
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def _parse_source(path: str, raw: bytes) -> Dict:
+    if path.endswith(('.yaml', '.yml')):
+        try:
+            import yaml
+        except ImportError:
+            raise ImportError("Los paquetes YAML necesitan PyYAML. Instalar con: pip install pyyaml")
+        return yaml.safe_load(raw.decode('utf-8'))
+    return json.loads(raw.decode('utf-8'))
+
+
+def split_sections(pack: Dict) -> Dict[str, object]:
+    """Divide un paquete en las secciones indexadas del caché"""
+    sections = {}
+    for key, value in pack.items():
+        if key == 'scenarios':
+            # Índice liviano (nombre y peso) más una sección por escenario
+            sections['scenarios'] = [{'name': sc['name'], 'weight': sc.get('weight', 1)} for sc in value]
+            for i, scenario in enumerate(value):
+                sections[f'scenario/{i}'] = scenario
+        elif key in _PER_ITEM_SECTIONS:
+            sections[key] = sorted(value)
+            for item, content in value.items():
+                sections[f'{key}/{item}'] = content
+        else:
+            sections[key] = value
+    return sections
+
+
+def compile_pack(sections: Dict[str, object], cache_path: str):
+    """Escribe las secciones en el formato binario indexado"""
+    keys = list(sections)
+    blobs = [zlib.compress(json.dumps(sections[key], ensure_ascii=False,
+                                      separators=(',', ':')).encode('utf-8')) for key in keys]
+    encoded_keys = [key.encode('utf-8') for key in keys]
+
+    index_size = sum(_KEY_LEN.size + len(k) + _ENTRY.size for k in encoded_keys)
+    offset = _HEADER.size + index_size
+    index = bytearray(_HEADER.pack(MAGIC, FORMAT_VERSION, len(keys)))
+    for key, blob in zip(encoded_keys, blobs):
+        index += _KEY_LEN.pack(len(key)) + key + _ENTRY.pack(offset, len(blob))
+        offset += len(blob)
+
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(index)
+        for blob in blobs:
+            f.write(blob)
+    os.replace(tmp_path, cache_path)
+
+
+class ContentPack:
+    """Paquete de contenido respaldado por el caché binario compilado"""
+
+    def __init__(self, source_path: str, cache_dir: str = None):
+        self.source_path = source_path
+        raw = _read_source(source_path)
+        self.content_hash = hashlib.sha256(raw).hexdigest()
+        stem = os.path.splitext(os.path.basename(source_path))[0]
+        cache_dir = cache_dir or os.path.join(ROOT_DIR, CONTENT_CACHE_DIR)
+        self.cache_path = os.path.join(cache_dir, f"{stem}-{self.content_hash[:16]}.cqpk")
+
+        if not os.path.exists(self.cache_path):
+            compile_pack(split_sections(_parse_source(source_path, raw)), self.cache_path)
+            print(f"📦 Paquete de contenido compilado: {self.cache_path}")
+
+        self._index = self._read_index()
+        self._loaded = {}
+
+    def _read_index(self) -> Dict[str, tuple]:
+        with open(self.cache_path, 'rb') as f:
+            magic, version, count = _HEADER.unpack(f.read(_HEADER.size))
+            if magic != MAGIC or version != FORMAT_VERSION:
+                raise ValueError(f"Caché de contenido inválido: {self.cache_path}")
+            index = {}
+            for _ in range(count):
+                (key_len,) = _KEY_LEN.unpack(f.read(_KEY_LEN.size))
+                key = f.read(key_len).decode('utf-8')
+                index[key] = _ENTRY.unpack(f.read(_ENTRY.size))
+        return index
+
+    def section(self, key: str):
+        """Carga (una sola vez) y retorna una sección del paquete"""
+        try:
+            return self._loaded[key]
+        except KeyError:
+            pass
+        offset, length = self._index[key]
+        with open(self.cache_path, 'rb') as f:
+            f.seek(offset)
+            value = json.loads(zlib.decompress(f.read(length)).decode('utf-8'))
+        self._loaded[key] = value
+        return value
+
+    def get(self, key: str, default=None):
+        return self.section(key) if key in self._index else default
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._index
+
+    def keys(self) -> List[str]:
+        return list(self._index)
+
+    def loaded_sections(self) -> List[str]:
+        """Secciones ya decodificadas (útil para medir qué usa una partida)"""
+        return list(self._loaded)
+
+    def items_of(self, section: str) -> 'LazySection':
+        """Vista tipo diccionario de una sección dividida por elemento"""
+        return LazySection(self, section)
+
+
+class LazySection(Mapping):
+    """Mapeo elemento -> contenido que carga cada subsección al accederla"""
+
+    def __init__(self, pack: ContentPack, section: str):
+        self._pack = pack
+        self._section = section
+
+    def __getitem__(self, item: str):
+        key = f'{self._section}/{item}'
+        if key not in self._pack:
+            raise KeyError(item)
+        return self._pack.section(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._pack.section(self._section))
+
+    def __len__(self):
+        return len(self._pack.section(self._section))
+
+
+@lru_cache(maxsize=None)
+def default_pack() -> ContentPack:
+    """Paquete de contenido base del juego (compilado al primer uso)"""
+    return ContentPack(os.path.join(ROOT_DIR, CONTENT_PACK))
@@ -1,7 +1,74 @@
 # customization_system.py
 import json
 import os
-from typing import Dict, List
+from typing import Dict, Iterable, List, Tuple
+
+# Catálogo de accesorios por personaje (se construye una sola vez)
+ACCESSORIES = {
+    'usuario': [
+        {'id': 'shield', 'name': 'Escudo Digital', 'icon': '🛡️', 'effect': 'reduce_errors'},
+        {'id': 'analyzer', 'name': 'Analizador', 'icon': '🔍', 'effect': 'increase_success'}
+    ],
+    'hacker': [
+        {'id': 'toolkit', 'name': 'Kit Herramientas', 'icon': '🔧', 'effect': 'boost_progress'},
+        {'id': 'cloak', 'name': 'Capa Digital', 'icon': '👻', 'effect': 'reduce_detection'}
+    ],
+    'cyberdelincuente': [
+        {'id': 'mask', 'name': 'Máscara Anónima', 'icon': '🎭', 'effect': 'hide_identity'},
+        {'id': 'virus', 'name': 'Virus Controlado', 'icon': '🦠', 'effect': 'sabotage_ai'}
+    ]
+}
+ACCESSORY_EFFECTS_BY_ID = {acc['id']: acc['effect'] for accs in ACCESSORIES.values() for acc in accs}
+
+# Modificadores que aporta cada efecto de accesorio:
+#   success          -> éxito del jugador
+#   progress         -> progreso extra por resultado (fallo, éxito)
+#   state            -> cambios de estado por resultado: ((campo, delta), ...) para (fallo, éxito)
+#   ai_success       -> éxito de las IAs rivales
+ACCESSORY_MODIFIERS = {
+    'reduce_errors': {'state': ((('health', 5),), ())},           # Reducción de daño
+    'increase_success': {'state': ((), (('resources', 5),))},     # Bonus de recursos
+    'boost_progress': {'progress': (0, 3)},
+    'reduce_detection': {'state': ((('detection', -5),), (('detection', -5),))},
+    'hide_identity': {'success': 5},
+    'sabotage_ai': {'ai_success': -5}
+}
+
+
+class AccessoryModifiers:
+    """Vector de modificadores de accesorios compilado al iniciar la partida"""
+
+    __slots__ = ('success', 'progress', 'state', 'ai_success')
+
+    def __init__(self, success: int = 0, progress: Tuple = (0, 0),
+                 state: Tuple = ((), ()), ai_success: int = 0):
+        self.success = success
+        self.progress = progress
+        self.state = state
+        self.ai_success = ai_success
+
+
+NO_ACCESSORIES = AccessoryModifiers()
+
+
+def compile_accessory_modifiers(accessory_ids: Iterable[str]) -> AccessoryModifiers:
+    """Suma los efectos de los accesorios equipados en un único vector"""
+    success = ai_success = 0
+    progress = [0, 0]
+    state = ({}, {})
+    for acc_id in accessory_ids or ():
+        mods = ACCESSORY_MODIFIERS.get(ACCESSORY_EFFECTS_BY_ID.get(acc_id), {})
+        success += mods.get('success', 0)
+        ai_success += mods.get('ai_success', 0)
+        for outcome, bonus in enumerate(mods.get('progress', (0, 0))):
+            progress[outcome] += bonus
+        for outcome, deltas in enumerate(mods.get('state', ((), ()))):
+            for field, delta in deltas:
+                state[outcome][field] = state[outcome].get(field, 0) + delta
+    return AccessoryModifiers(success, tuple(progress),
+                              tuple(tuple(d for d in deltas.items() if d[1]) for deltas in state),
+                              ai_success)
+
 
 class CustomizationSystem:
     """Sistema de personalización de personajes"""
@@ -47,18 +114,4 @@ class CustomizationSystem:
     
     def get_available_accessories(self, character_type: str) -> List[Dict]:
         """Obtiene accesorios disponibles para el personaje"""
-        accessories = {
-            'usuario': [
-                {'id': 'shield', 'name': 'Escudo Digital', 'icon': '🛡️', 'effect': 'reduce_errors'},
-                {'id': 'analyzer', 'name': 'Analizador', 'icon': '🔍', 'effect': 'increase_success'}
-            ],
-            'hacker': [
-                {'id': 'toolkit', 'name': 'Kit Herramientas', 'icon': '🔧', 'effect': 'boost_progress'},
-                {'id': 'cloak', 'name': 'Capa Digital', 'icon': '👻', 'effect': 'reduce_detection'}
-            ],
-            'cyberdelincuente': [
-                {'id': 'mask', 'name': 'Máscara Anónima', 'icon': '🎭', 'effect': 'hide_identity'},
-                {'id': 'virus', 'name': 'Virus Controlado', 'icon': '🦠', 'effect': 'sabotage_ai'}
-            ]
-        }
-        return accessories.get(character_type, [])
\ No newline at end of file
+        return ACCESSORIES.get(character_type, [])
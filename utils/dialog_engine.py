@@ -3,12 +3,16 @@ import random
 from typing import Dict, List
 import os
 
+from utils.content_pack import ContentPack, default_pack
+
 class DialogEngine:
     """Motor de diálogos mejorado con más contenido y mejor integración"""
     
-    def __init__(self):
+    def __init__(self, content: ContentPack = None):
+        self.content = content or default_pack()
         self.gemini_enabled = False
         self.model = None
+        self._event_descriptions = {}
         self._initialize_gemini()
     
     def _initialize_gemini(self):
@@ -123,219 +127,6 @@ Tu diálogo:"""
     
     def _get_enhanced_dialog(self, character_type: str, situation: str, emotion: str) -> str:
         """Diálogos mejorados locales como fallback - CONTENIDO EXPANDIDO"""
-        dialogs = {
-            'usuario': {
-                'neutral': [
-                    "El sistema parece estable... por ahora.", 
-                    "Verificando protocolos de seguridad.",
-                    "Todo en orden, procediendo con cautela.",
-                    "Monitoreando actividad del sistema.",
-                    "Revisando integridad de los datos.",
-                    "Espero que esto funcione...",
-                    "Debo mantener la calma y pensar con claridad.",
-                    "Mi información personal está en riesgo.",
-                    "Cada paso debe ser calculado.",
-                    "No puedo permitir errores ahora.",
-                    "La interfaz responde adecuadamente.",
-                    "Sigo los procedimientos establecidos.",
-                    "Confirmando que todo esté en orden.",
-                    "La seguridad es mi prioridad absoluta.",
-                    "Avanzando con precaución necesaria."
-                ],
-                'stressed': [
-                    "¡La presión aumenta! Necesito mantener la calma...",
-                    "El sistema se está volviendo impredecible.",
-                    "¡Algo no anda bien! Debo actuar con cuidado.",
-                    "Las defensas se están activando, ¡cuidado!",
-                    "¡La situación se complica! Buscando salida...",
-                    "¡Detectaron actividad sospechosa!",
-                    "No puedo permitir que accedan a mis datos.",
-                    "Esto es más peligroso de lo que pensaba...",
-                    "El tiempo se agota rápidamente.",
-                    "¡Necesito una solución ya!",
-                    "¡Las alertas no cesan! Esto es serio.",
-                    "Mi corazón late al ritmo de las alarmas.",
-                    "¿Dónde está la salida? Necesito escapar.",
-                    "Los sistemas fallan uno tras otro.",
-                    "¡No puedo fallar ahora, demasiado en juego!"
-                ],
-                'victory': [
-                    "¡Lo logré! El sistema es seguro nuevamente.",
-                    "Victoria para los usuarios comunes. ¡Éxito!",
-                    "Protección activada. Mis datos están a salvo.",
-                    "¡Operación completada! Sistema estabilizado.",
-                    "¡Crisis evitada! Todo bajo control.",
-                    "Finalmente puedo respirar tranquilo.",
-                    "Sabía que podía hacerlo si me concentraba.",
-                    "Mi información está protegida al fin.",
-                    "¡Superé todos los obstáculos!",
-                    "La perseverancia rindió frutos.",
-                    "¡Increíble! Todo salió mejor de lo esperado.",
-                    "La seguridad ha sido restaurada por completo.",
-                    "Mis datos están a salvo, misión cumplida.",
-                    "¡Éxito total! Aprendí mucho en el proceso.",
-                    "El sistema respira aliviado, y yo también."
-                ],
-                'action': [
-                    "Ejecutando protocolo de seguridad...",
-                    "Activando medidas defensivas.",
-                    "Analizando posibles amenazas...",
-                    "Implementando contramedidas.",
-                    "Reforzando protecciones del sistema.",
-                    "Tomando acción para protegerme.",
-                    "Debo ser estratégico en este momento.",
-                    "Cada segundo cuenta ahora.",
-                    "Aplicando solución rápida.",
-                    "Iniciando secuencia de defensa.",
-                    "Configurando parámetros de emergencia.",
-                    "Ejecutando procedimiento crítico.",
-                    "Activando todos los protocolos.",
-                    "No hay tiempo que perder, acción inmediata.",
-                    "Implementando plan de contingencia."
-                ]
-            },
-            'hacker': {
-                'neutral': [
-                    "Analizando vectores de ataque... Firewalls detectados.",
-                    "Escaneando vulnerabilidades del sistema.",
-                    "Monitoreando tráfico de red sospechoso.",
-                    "Preparando herramientas de análisis.",
-                    "Evaluando puntos de entrada potenciales.",
-                    "El código revela sus secretos...",
-                    "Arquitectura del sistema mapeada.",
-                    "Buscando exploits conocidos en la base de datos.",
-                    "Analizando patrones de seguridad.",
-                    "Recopilando información crítica.",
-                    "Descompilando módulos sospechosos.",
-                    "Trazando rutas de acceso alternativas.",
-                    "Verificando integridad del kernel.",
-                    "Monitorizando procesos en segundo plano.",
-                    "Evaluando superficie de ataque disponible."
-                ],
-                'stressed': [
-                    "¡Contramedidas activadas! El sistema se defiende...",
-                    "Alerta: Múltiples amenazas detectadas.",
-                    "¡Casi me detectan! Activando evasión...",
-                    "La resistencia del sistema es mayor de lo esperado.",
-                    "¡Firewalls reforzados! Necesito otra estrategia.",
-                    "IDS activo, cambiando de táctica.",
-                    "El honeypot casi me atrapa.",
-                    "Sistema de defensa más robusto de lo anticipado.",
-                    "¡Rastreadores en mi cola!",
-                    "Necesito replantear mi enfoque.",
-                    "¡El sistema contraataca! Defensas automáticas activas.",
-                    "Múltiples capas de seguridad, esto se complica.",
-                    "¡Alerta! He sido marcado como amenaza.",
-                    "Los protocolos de defensa son agresivos.",
-                    "¡Código de evasión fallando! Plan B necesario."
-                ],
-                'victory': [
-                    "¡Sistemas expuestos! Justicia digital servida.",
-                    "La verdad sale a la luz. Misión cumplida.",
-                    "Vulnerabilidades parchadas. Sistema seguro.",
-                    "¡Éxito! Los datos están protegidos.",
-                    "Amenaza neutralizada. Trabajo completado.",
-                    "Exploit ejecutado perfectamente.",
-                    "El sistema está ahora fortificado.",
-                    "Objetivo alcanzado sin dejar rastros.",
-                    "La seguridad ha sido restaurada.",
-                    "Protocolo de protección implementado.",
-                    "¡Brecha sellada! El sistema respira aliviado.",
-                    "Código malicioso eliminado por completo.",
-                    "Infraestructura asegurada, trabajo impecable.",
-                    "¡Victoria técnica! Todos los sistemas verdes.",
-                    "El enemigo digital ha sido derrotado."
-                ],
-                'action': [
-                    "Desplegando exploits...",
-                    "Infiltrando sistemas de seguridad.",
-                    "Ejecutando scripts de penetración.",
-                    "Analizando código fuente en busca de fallos.",
-                    "Probando vectores de ataque alternativos.",
-                    "Bypasseando autenticación...",
-                    "Inyectando payload personalizado.",
-                    "Escalando privilegios en el sistema.",
-                    "Ejecutando exploit de día cero.",
-                    "Aplicando técnicas de ingeniería inversa.",
-                    "Compilando código de acceso forzado.",
-                    "Ejecutando ataque de diccionario optimizado.",
-                    "Inyectando SQL en puntos vulnerables.",
-                    "Desactivando sistemas de monitoreo.",
-                    "Activando puertas traseras estratégicas."
-                ]
-            },
-            'cyberdelincuente': {
-                'neutral': [
-                    "Operando en las sombras... Rastreo evadido.",
-                    "Movimientos sigilosos activados.",
-                    "Navegando por los canales oscuros.",
-                    "Preparando el próximo movimiento.",
-                    "Evaluando riesgos y recompensas.",
-                    "Las sombras digitales me protegen.",
-                    "Invisibilidad garantizada por ahora.",
-                    "El anonimato es mi mejor arma.",
-                    "Sin rastros, sin pruebas.",
-                    "El fantasma digital continúa su obra.",
-                    "Deslizándome entre los bits sin dejar huella.",
-                    "El silencio digital es mi aliado.",
-                    "Observando desde la oscuridad.",
-                    "Preparando el siguiente asalto silencioso.",
-                    "La red es mi territorio de caza."
-                ],
-                'stressed': [
-                    "¡Casi me detectan! Activando protocolos de escape...",
-                    "Las defensas son más fuertes de lo esperado.",
-                    "¡Alerta! Rastreadores activados en el sector.",
-                    "Necesito cubrir mis huellas rápidamente.",
-                    "¡Situación crítica! Plan B activado.",
-                    "El cerco se cierra, debo ser más astuto.",
-                    "Sistemas de rastreo a full capacidad.",
-                    "Momento de desaparecer del radar.",
-                    "La cacería ha comenzado.",
-                    "Necesito una ruta de escape inmediata.",
-                    "¡Marcado! Todos los sistemas me buscan.",
-                    "La red se cierra a mi alrededor.",
-                    "¡Trampas digitales por todas partes!",
-                    "El sistema huele mi presencia.",
-                    "¡Alerta máxima! Modo evasión total."
-                ],
-                'victory': [
-                    "¡El botín es mío! Operación completada con éxito.",
-                    "Objetivo alcanzado. Recursos obtenidos.",
-                    "¡Éxito total! Sin dejar rastros.",
-                    "Misión cumplida. Retirándose del área.",
-                    "¡Tesoro adquirido! Operación impecable.",
-                    "Payload entregado, extracción exitosa.",
-                    "El fantasma digital golpea de nuevo.",
-                    "Perfecto. Como si nunca hubiera estado aquí.",
-                    "Otro trabajo limpio para mi registro.",
-                    "Las sombras celebran mi victoria.",
-                    "¡Recompensa obtenida! Desapareciendo en la noche.",
-                    "Objetivo cumplido, identidad intacta.",
-                    "La red olvidará mi paso pronto.",
-                    "¡Éxito silencioso! Nadie supo que estuve aquí.",
-                    "Tesoro digital seguro, misión terminada."
-                ],
-                'action': [
-                    "Ejecutando procedimientos de infiltración...",
-                    "Instalando backdoors silenciosos.",
-                    "Exfiltrando datos sensibles...",
-                    "Activando medidas de evasión avanzadas.",
-                    "Manipulando sistemas de registro.",
-                    "Borrando huellas digitales...",
-                    "Estableciendo punto de acceso persistente.",
-                    "Operación fantasma en progreso.",
-                    "Despliegue de malware personalizado.",
-                    "Ejecutando protocolo de extracción.",
-                    "Silenciando alarmas del sistema.",
-                    "Creando identidades digitales falsas.",
-                    "Envenenando caché del sistema.",
-                    "Redirigiendo tráfico de vigilancia.",
-                    "Activando cortinas de humo digitales."
-                ]
-            }
-        }
-        
         # Mapeo inteligente de emociones mejorado
         situation_lower = situation.lower()
         if any(word in situation_lower for word in ['éxito', 'exito', 'victoria', 'completado', 'logrado', 'ganado', 'triunfo']):
@@ -347,12 +138,20 @@ Tu diálogo:"""
         else:
             emotion_key = emotion if emotion in ['neutral', 'stressed', 'victory', 'action'] else 'neutral'
         
-        # Obtener diálogos disponibles
-        character_dialogs = dialogs.get(character_type, dialogs['usuario'])
+        # Obtener diálogos disponibles (solo se carga la sección del personaje)
+        dialogs = self.content.items_of('dialogs')
+        character_dialogs = dialogs[character_type] if character_type in dialogs else dialogs['usuario']
         available_dialogs = character_dialogs.get(emotion_key, character_dialogs['neutral'])
         
         return random.choice(available_dialogs)
     
+    def describe_event(self, event_type: str) -> str:
+        """Descripción de un evento global, generada una sola vez por tipo"""
+        description = self._event_descriptions.get(event_type)
+        if description is None:
+            description = self._event_descriptions[event_type] = self.generate_event_description(event_type)
+        return description
+    
     def generate_event_description(self, event_type: str) -> str:
         """Genera descripciones narrativas para eventos globales - MEJORADO"""
         if self.gemini_enabled:
@@ -373,15 +172,7 @@ Tu descripción:"""
                 pass
         
         # Fallback local mejorado
-        descriptions = {
-            'security_alert': '🚨 ALERTA CRÍTICA: Sistemas de defensa activados en toda la red',
-            'system_vulnerability': '🔓 VULNERABILIDAD CRÍTICA: Brecha de seguridad masiva detectada',
-            'data_corruption': '💾 COLAPSO DE DATOS: Corrupción sistémica afectando núcleos',
-            'network_boost': '📡 OPTIMIZACIÓN GLOBAL: Ancho de banda aumentado significativamente',
-            'virus_outbreak': '🦠 BROTE VIRAL: Malware de propagación rápida detectado',
-            'firewall_breach': '🛡️ BRECHA DEFENSIVA: Sistemas de protección comprometidos',
-            'encryption_failure': '🔒 FALLO ENCRIPTACIÓN: Protocolos de seguridad colapsados'
-        }
+        descriptions = self.content.section('event_descriptions')
         return descriptions.get(event_type, 'Evento desconocido en el sistema')
     
     def generate_ending_dialog(self, character_type: str, won: bool, stats: dict) -> str:
@@ -409,17 +200,5 @@ Tu diálogo:"""
                 pass
         
         # Fallback local mejorado
-        if won:
-            endings = {
-                'usuario': "Lo logré... mi información está segura. Nunca más subestimaré la importancia de la privacidad digital.",
-                'hacker': "Misión cumplida. El sistema está más seguro ahora. La justicia digital prevalece una vez más.",
-                'cyberdelincuente': "Objetivo completado sin rastros. Otro trabajo perfecto en las sombras digitales. Hasta la próxima."
-            }
-        else:
-            endings = {
-                'usuario': "No pude proteger mis datos... pero aprendí una lección valiosa sobre seguridad en la red.",
-                'hacker': "El sistema era más robusto de lo esperado. Regresaré con mejores herramientas y más conocimiento.",
-                'cyberdelincuente': "Me detectaron esta vez... pero un fantasma siempre encuentra otra sombra donde esconderse."
-            }
-        
+        endings = self.content.section('endings')['won' if won else 'lost']
         return endings.get(character_type, "La batalla en el ciberespacio continúa...")
\ No newline at end of file
@@ -1,57 +1,161 @@
 # effects_system.py
-import random
-from typing import Dict, List
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, FrozenSet, Iterable, List, Mapping, Tuple
+
+from utils.content_pack import default_pack
+
+# Canales del vector de modificadores que agrega el registro por objetivo.
+# Solo 'success' tiene efecto en las reglas; agregar un canal exige aplicarlo
+# en game/rules.py (y en los modelos de game/odds.py y ai/)
+MODIFIER_FIELDS = ('success',)
+MODIFIER_INDEX = {field: i for i, field in enumerate(MODIFIER_FIELDS)}
+
+
+class EffectDefinition:
+    """Tipo de efecto: duración, descripción y modificadores que aporta"""
+
+    __slots__ = ('type', 'duration', 'description', 'modifiers')
+
+    def __init__(self, effect_type: str, duration: int, description: str, success: int = 0):
+        self.type = effect_type
+        self.duration = duration
+        self.description = description
+        self.modifiers = (success,)
+
+    def __repr__(self):
+        return f"EffectDefinition({self.type!r}, duration={self.duration})"
+
+
+class _TargetEffects:
+    """Efectos de un objetivo: activos, vencimientos por turno y totales"""
+
+    __slots__ = ('turn', 'active', 'expiring', 'totals', 'next_id')
 
-class EffectsSystem:
-    """Sistema de efectos visuales y de juego"""
-    
     def __init__(self):
-        self.active_effects = {}
-        self.character_states = {}
-    
-    def apply_effect(self, player_id: str, effect_type: str, duration: int = 3):
-        """Aplica un efecto al jugador"""
-        self.active_effects[player_id] = {
-            'type': effect_type,
-            'duration': duration,
-            'applied_at': 0  # Se actualizará con el tiempo del juego
-        }
+        self.turn = 0
+        self.active = {}     # id -> (definición, turno de vencimiento)
+        self.expiring = {}   # turno -> [ids que vencen]
+        self.totals = [0] * len(MODIFIER_FIELDS)
+        self.next_id = 0
+
+
+class EffectRegistry:
+    """Registro único de efectos activos por objetivo (jugador o asiento de IA).
+
+    Cada objetivo lleva su propio contador de turnos. Un efecto de duración d
+    aplicado en el turno t sigue activo en las d + 1 resoluciones siguientes y
+    vence en el tick t + d + 1. Los totales de modificadores se actualizan al
+    aplicar y al vencer, así que leerlos es O(1).
+    """
+
+    def __init__(self, definitions: Dict[str, EffectDefinition]):
+        self.definitions = definitions
+        self._targets = {}
+
+    def _target(self, target: str) -> _TargetEffects:
+        effects = self._targets.get(target)
+        if effects is None:
+            effects = self._targets[target] = _TargetEffects()
+        return effects
+
+    def reset(self):
+        """Elimina todos los efectos de todos los objetivos"""
+        self._targets.clear()
+
+    def apply(self, target: str, effect_type: str) -> EffectDefinition:
+        """Aplica un efecto al objetivo y suma sus modificadores"""
+        definition = self.definitions[effect_type]
+        effects = self._target(target)
+        expires_at = effects.turn + definition.duration + 1
+        effect_id = effects.next_id
+        effects.next_id += 1
+        effects.active[effect_id] = (definition, expires_at)
+        effects.expiring.setdefault(expires_at, []).append(effect_id)
+        totals = effects.totals
+        for i, value in enumerate(definition.modifiers):
+            totals[i] += value
+        return definition
+
+    def tick(self, target: str):
+        """Avanza un turno del objetivo y retira los efectos que vencen"""
+        effects = self._target(target)
+        effects.turn += 1
+        totals = effects.totals
+        for effect_id in effects.expiring.pop(effects.turn, ()):
+            definition, _ = effects.active.pop(effect_id)
+            for i, value in enumerate(definition.modifiers):
+                totals[i] -= value
+
+    def modifier(self, target: str, field: str) -> int:
+        """Modificador agregado actual del objetivo para un canal"""
+        effects = self._targets.get(target)
+        return effects.totals[MODIFIER_INDEX[field]] if effects else 0
+
+    def active(self, target: str) -> List[Tuple[EffectDefinition, int]]:
+        """Efectos activos del objetivo como (definición, turnos restantes)"""
+        effects = self._targets.get(target)
+        if not effects:
+            return []
+        return [(definition, expires_at - effects.turn - 1)
+                for definition, expires_at in effects.active.values()]
+
+    def active_types(self, target: str) -> List[str]:
+        effects = self._targets.get(target)
+        return [definition.type for definition, _ in effects.active.values()] if effects else []
+
+    def snapshot(self) -> List[Tuple[str, int, int, List[Tuple[int, str, int]]]]:
+        """Estado serializable: (objetivo, turno, próximo id, [(id, tipo, vencimiento)])"""
+        return [(target, effects.turn, effects.next_id,
+                 [(effect_id, definition.type, expires_at)
+                  for effect_id, (definition, expires_at) in effects.active.items()])
+                for target, effects in self._targets.items()]
+
+    def restore(self, snapshot: Iterable[Tuple[str, int, int, Iterable[Tuple[int, str, int]]]]):
+        """Reemplaza todos los efectos por los de una instantánea de snapshot()"""
+        self._targets.clear()
+        for target, turn, next_id, active in snapshot:
+            effects = self._target(target)
+            effects.turn = turn
+            effects.next_id = next_id
+            for effect_id, effect_type, expires_at in active:
+                definition = self.definitions[effect_type]
+                effects.active[effect_id] = (definition, expires_at)
+                effects.expiring.setdefault(expires_at, []).append(effect_id)
+                for i, value in enumerate(definition.modifiers):
+                    effects.totals[i] += value
+
+
+# Apariencia base por personaje y cambios por efecto, en orden de precedencia
+BASE_APPEARANCES = MappingProxyType({
+    'usuario': MappingProxyType({'icon': '👤', 'color': '#00b894', 'posture': 'normal'}),
+    'hacker': MappingProxyType({'icon': '💻', 'color': '#3498db', 'posture': 'focused'}),
+    'cyberdelincuente': MappingProxyType({'icon': '🎭', 'color': '#e74c3c', 'posture': 'stealth'})
+})
+APPEARANCE_OVERRIDES = (
+    ('virus', {'icon': '🤢', 'color': '#541170', 'posture': 'infected'}),
+    ('firewall_blocked', {'icon': '🚫', 'posture': 'blocked'}),
+    ('success', {'icon': '⚡', 'posture': 'empowered'}),
+    ('detected', {'icon': '🚨', 'posture': 'alert'})
+)
+
+
+@lru_cache(maxsize=None)
+def _appearance(character_type: str, effects: FrozenSet[str]) -> Mapping:
+    appearance = dict(BASE_APPEARANCES.get(character_type, BASE_APPEARANCES['usuario']))
+    for effect, changes in APPEARANCE_OVERRIDES:
+        if effect in effects:
+            appearance.update(changes)
+    return MappingProxyType(appearance)
+
+
+class EffectsSystem:
+    """Sistema de efectos visuales del personaje"""
     
-    def get_character_appearance(self, character_type: str, effects: List[str]) -> Dict:
-        """Obtiene la apariencia del personaje basada en efectos"""
-        base_appearances = {
-            'usuario': {'icon': '👤', 'color': '#00b894', 'posture': 'normal'},
-            'hacker': {'icon': '💻', 'color': '#3498db', 'posture': 'focused'},
-            'cyberdelincuente': {'icon': '🎭', 'color': '#e74c3c', 'posture': 'stealth'}
-        }
-        
-        appearance = base_appearances.get(character_type, base_appearances['usuario']).copy()
-        
-        # Modificar apariencia basada en efectos
-        for effect in effects:
-            if effect == 'virus':
-                appearance['icon'] = '🤢'
-                appearance['color'] = '#541170'
-                appearance['posture'] = 'infected'
-            elif effect == 'firewall_blocked':
-                appearance['icon'] = '🚫'
-                appearance['posture'] = 'blocked'
-            elif effect == 'success':
-                appearance['icon'] = '⚡'
-                appearance['posture'] = 'empowered'
-            elif effect == 'detected':
-                appearance['icon'] = '🚨'
-                appearance['posture'] = 'alert'
-        
-        return appearance
+    def get_character_appearance(self, character_type: str, effects: Iterable[str]) -> Mapping:
+        """Obtiene la apariencia (de solo lectura) del personaje según sus efectos"""
+        return _appearance(character_type, frozenset(effects))
     
     def get_effect_description(self, effect_type: str) -> str:
         """Obtiene descripción del efecto"""
-        descriptions = {
-            'virus': "🔴 VIRUS DETECTADO - Velocidad reducida 30%",
-            'firewall_blocked': "🛡️ FIREWALL - Acciones bloqueadas temporalmente",
-            'data_breach': "💾 BRECHA DE DATOS - Información expuesta",
-            'system_override': "⚡ SOBRECARGA - Habilidades mejoradas",
-            'encryption': "🔒 ENCRIPTADO - Defensas fortalecidas"
-        }
-        return descriptions.get(effect_type, "Efecto desconocido")
\ No newline at end of file
+        return default_pack().section('effect_descriptions').get(effect_type, "Efecto desconocido")
@@ -13,7 +13,9 @@ class GameUtils:
         multipliers = {
             'facil': 0.8,
             'medio': 1.0,
-            'dificil': 1.3
+            'dificil': 1.3,
+            'maestro': 1.5,
+            'experto': 1.4
         }
         return multipliers.get(difficulty, 1.0)
     
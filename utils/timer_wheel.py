@@ -0,0 +1,141 @@
+# ============================================================================
+# ARCHIVO: utils/timer_wheel.py
+# DESCRIPCIÓN: Rueda de temporizadores jerárquica (Varghese y Lauck). Todos
+#              los temporizadores del juego viven en una sola estructura que
+#              avanza desde un único tick externo: programar y cancelar son
+#              O(1) y cada tick solo toca la ranura que vence.
+# ============================================================================
+
+from typing import Callable, List
+
+
+class Timer:
+    """Temporizador programado; se cancela con TimerWheel.cancel()"""
+
+    __slots__ = ('expires', 'callback', 'args', 'cancelled')
+
+    def __init__(self, expires: int, callback: Callable, args: tuple):
+        self.expires = expires
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+    def __repr__(self):
+        return f"Timer(expires={self.expires}, cancelled={self.cancelled})"
+
+
+class TimerWheel:
+    """Rueda jerárquica de levels niveles con slots ranuras cada uno.
+
+    El nivel 0 tiene una ranura por tick; cada ranura del nivel k cubre
+    slots**k ticks. Un temporizador se guarda en el nivel más bajo que
+    alcanza su vencimiento y baja de nivel (cascada) cuando el nivel inferior
+    da la vuelta, así que nunca se recorren temporizadores que no vencen.
+    Con los valores por defecto (50 ms, 64 ranuras, 4 niveles) el alcance es
+    de más de nueve días; lo que quede más lejos espera en el último nivel.
+    """
+
+    def __init__(self, tick_ms: int = 50, slots: int = 64, levels: int = 4):
+        if slots < 2 or slots & (slots - 1):
+            raise ValueError("slots debe ser una potencia de 2")
+        if levels < 1:
+            raise ValueError("levels debe ser al menos 1")
+        self.tick_ms = tick_ms
+        self.slots = slots
+        self.levels = levels
+        self._bits = slots.bit_length() - 1
+        self._mask = slots - 1
+        self._wheels = [[[] for _ in range(slots)] for _ in range(levels)]
+        # Próximo tick por procesar y temporizadores pendientes (sin cancelar)
+        self._tick = 0
+        self._pending = 0
+
+    def __len__(self):
+        return self._pending
+
+    @property
+    def now_ms(self) -> int:
+        """Tiempo de la rueda: inicio del próximo tick por procesar"""
+        return self._tick * self.tick_ms
+
+    def schedule(self, delay_ms: float, callback: Callable, *args) -> Timer:
+        """Programa callback(*args) dentro de delay_ms (redondeado al tick siguiente)"""
+        ticks = -(-int(delay_ms) // self.tick_ms) if delay_ms > 0 else 0
+        timer = Timer(self._tick + ticks, callback, args)
+        self._place(timer)
+        self._pending += 1
+        return timer
+
+    def cancel(self, timer: Timer):
+        """Cancela el temporizador; se descarta cuando su ranura vence"""
+        if timer is not None and not timer.cancelled:
+            timer.cancelled = True
+            self._pending -= 1
+
+    def remaining_ms(self, timer: Timer) -> int:
+        """Milisegundos que faltan para que venza el temporizador"""
+        return max(0, timer.expires - self._tick) * self.tick_ms
+
+    def clear(self):
+        """Cancela todos los temporizadores sin reiniciar el tiempo"""
+        for wheel in self._wheels:
+            for slot in wheel:
+                for timer in slot:
+                    timer.cancelled = True
+                slot.clear()
+        self._pending = 0
+
+    def advance(self, now_ms: float) -> int:
+        """Procesa todos los ticks hasta now_ms; retorna cuántos temporizadores vencieron"""
+        target = int(now_ms // self.tick_ms)
+        fired = 0
+        bits, mask = self._bits, self._mask
+        level0 = self._wheels[0]
+        while self._tick <= target:
+            tick = self._tick
+            # Al dar la vuelta un nivel, bajar la ranura que toca del nivel superior
+            level = 1
+            while level < self.levels and (tick >> (bits * (level - 1))) & mask == 0 and tick:
+                self._cascade(level, (tick >> (bits * level)) & mask)
+                level += 1
+            slot = level0[tick & mask]
+            # Lo que programen los callbacks con retardo 0 vence en el tick siguiente
+            self._tick = tick + 1
+            if not slot:
+                continue
+            due = slot[:]
+            slot.clear()
+            for timer in due:
+                if timer.cancelled:
+                    continue
+                timer.cancelled = True
+                self._pending -= 1
+                fired += 1
+                timer.callback(*timer.args)
+        return fired
+
+    # ------------------------------------------------------------------------
+    # Colocación
+    # ------------------------------------------------------------------------
+
+    def _place(self, timer: Timer):
+        expires = timer.expires if timer.expires > self._tick else self._tick
+        delta = expires - self._tick
+        bits = self._bits
+        for level in range(self.levels):
+            if delta < 1 << (bits * (level + 1)) or level == self.levels - 1:
+                break
+        if delta >= 1 << (bits * self.levels):
+            # Fuera del alcance: esperar en la última ranura del nivel superior
+            expires = self._tick + (1 << (bits * self.levels)) - 1
+        self._wheels[level][(expires >> (bits * level)) & self._mask].append(timer)
+
+    def _cascade(self, level: int, index: int):
+        slot = self._wheels[level][index]
+        if not slot:
+            return
+        timers: List[Timer] = slot[:]
+        slot.clear()
+        for timer in timers:
+            if not timer.cancelled:
+                self._place(timer)